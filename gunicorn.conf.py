@@ -0,0 +1,72 @@
+"""
+Конфигурация для запуска приложения в несколько процессов.
+
+Запуск: gunicorn -c gunicorn.conf.py src.main:app
+Плавный перезапуск всех процессов по очереди: kill -HUP <pid мастер-процесса>.
+
+Мастер-процесс не импортирует src.config: воркеры наследуют его модули,
+и настройки, созданные в мастере, не увидели бы переданное им SERVER_WORKERS.
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/find_team_metrics")  # noqa: S108
+
+_ENV_FILE = dotenv_values(".env")
+
+
+def _setting(name: str, default: int) -> int:
+    """Числовая настройка c тем же приоритетом, что и в src.config: окружение, затем .env."""
+    value = os.environ.get(name, _ENV_FILE.get(name))
+    return int(value) if value not in (None, "") else default
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _check_workers(number: int) -> None:
+    if number > DB_MAX_CONNECTIONS:
+        raise ValueError(f"{number} workers do not fit into DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}")
+
+
+DB_MAX_CONNECTIONS = _setting("DB_MAX_CONNECTIONS", 90)
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = _setting("SERVER_WORKERS", 0) or _available_cpus()
+_check_workers(workers)
+os.environ["SERVER_WORKERS"] = str(workers)
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+max_requests = _setting("SERVER_MAX_REQUESTS", 0)
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server) -> None:  # noqa: ANN001
+    """Проверка числа процессов и очистка метрик прошлого запуска."""
+    if "src.config" in sys.modules:
+        raise RuntimeError("src.config is imported by the master process, workers would not see SERVER_WORKERS")
+    _check_workers(server.num_workers)
+    metrics_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    metrics_dir.mkdir(parents=True)
+
+
+def pre_fork(server, worker) -> None:  # noqa: ANN001
+    """Передача воркеру числа процессов, c учетом -w и изменений через TTIN/TTOU."""
+    os.environ["SERVER_WORKERS"] = str(server.num_workers)
+
+
+def child_exit(server, worker) -> None:  # noqa: ANN001
+    """Удаление метрик завершившегося процесса."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -7,8 +7,11 @@ from alembic import context
 
 from src.config import settings
 from src.auth.models import AuthUser # noqa
-from src.team.models import Team, TeamTags # noqa
+from src.team.models import Team, TeamArchive, TeamTags, TeamTagsArchive # noqa
+from src.find.models import TeamPreview # noqa
 from src.user_profile.models import UserProfile, UserContacts, UserHobbies # noqa
+from src.notifications.models import Notification # noqa
+from src.chat.models import ChatMessage # noqa
 from src.database import Base
 
 config = context.config
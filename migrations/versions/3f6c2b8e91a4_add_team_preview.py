@@ -0,0 +1,162 @@
+"""add_team_preview
+
+Revision ID: 3f6c2b8e91a4
+Revises: 9d20747d33e6
+Create Date: 2026-10-19 12:10:41.215034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2b8e91a4"
+down_revision: Union[str, None] = "9d20747d33e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "team_preview",
+        sa.Column("team_id", sa.Uuid(), nullable=False),
+        sa.Column("owner", sa.Uuid(), nullable=False),
+        sa.Column("owner_username", sa.String(length=50), nullable=False),
+        sa.Column("title", sa.String(length=50), nullable=False),
+        sa.Column("type_team", sa.String(), nullable=False),
+        sa.Column("team_city", sa.String(), nullable=False),
+        sa.Column("number_of_members", sa.Integer(), nullable=False),
+        sa.Column("team_deadline_at", sa.Date(), nullable=False),
+        sa.Column(
+            "tags", postgresql.ARRAY(sa.String(length=50)), nullable=False
+        ),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["team_id"], ["team.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("team_id"),
+    )
+    op.create_index(
+        op.f("ix_team_preview_owner"), "team_preview", ["owner"], unique=False
+    )
+    op.create_index(
+        "ix_team_preview_deadline",
+        "team_preview",
+        ["team_deadline_at", "team_id"],
+        unique=False,
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION team_preview_sync_team() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO team_preview (team_id, owner, owner_username, title, type_team, team_city,
+                                      number_of_members, team_deadline_at, tags, member_count)
+            VALUES (NEW.id, NEW.owner, (SELECT username FROM auth_user WHERE id = NEW.owner), NEW.title,
+                    NEW.type_team, NEW.team_city, NEW.number_of_members, NEW.team_deadline_at, '{}', 0)
+            ON CONFLICT (team_id) DO UPDATE SET
+                owner = EXCLUDED.owner,
+                owner_username = EXCLUDED.owner_username,
+                title = EXCLUDED.title,
+                type_team = EXCLUDED.type_team,
+                team_city = EXCLUDED.team_city,
+                number_of_members = EXCLUDED.number_of_members,
+                team_deadline_at = EXCLUDED.team_deadline_at;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER team_preview_sync_team
+        AFTER INSERT OR UPDATE ON team
+        FOR EACH ROW EXECUTE FUNCTION team_preview_sync_team()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION team_preview_sync_tags() RETURNS trigger AS $$
+        BEGIN
+            UPDATE team_preview
+            SET tags = ARRAY[NEW.tag1, NEW.tag2, NEW.tag3, NEW.tag4, NEW.tag5, NEW.tag6, NEW.tag7]
+            WHERE team_id = NEW.team_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER team_preview_sync_tags
+        AFTER INSERT OR UPDATE ON team_tags
+        FOR EACH ROW EXECUTE FUNCTION team_preview_sync_tags()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION team_preview_sync_members() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE team_preview SET member_count = member_count + 1 WHERE team_id = NEW.team_id;
+            ELSE
+                UPDATE team_preview SET member_count = member_count - 1 WHERE team_id = OLD.team_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER team_preview_sync_members
+        AFTER INSERT OR DELETE ON team_members
+        FOR EACH ROW EXECUTE FUNCTION team_preview_sync_members()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION team_preview_sync_owner() RETURNS trigger AS $$
+        BEGIN
+            UPDATE team_preview SET owner_username = NEW.username WHERE owner = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER team_preview_sync_owner
+        AFTER UPDATE OF username ON auth_user
+        FOR EACH ROW WHEN (OLD.username IS DISTINCT FROM NEW.username)
+        EXECUTE FUNCTION team_preview_sync_owner()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO team_preview (team_id, owner, owner_username, title, type_team, team_city,
+                                  number_of_members, team_deadline_at, tags, member_count)
+        SELECT team.id, team.owner, auth_user.username, team.title, team.type_team, team.team_city,
+               team.number_of_members, team.team_deadline_at,
+               COALESCE(ARRAY[team_tags.tag1, team_tags.tag2, team_tags.tag3, team_tags.tag4,
+                              team_tags.tag5, team_tags.tag6, team_tags.tag7], '{}'),
+               (SELECT count(*) FROM team_members WHERE team_members.team_id = team.id)
+        FROM team
+        JOIN auth_user ON auth_user.id = team.owner
+        LEFT JOIN team_tags ON team_tags.team_id = team.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS team_preview_sync_owner ON auth_user")
+    op.execute("DROP TRIGGER IF EXISTS team_preview_sync_members ON team_members")
+    op.execute("DROP TRIGGER IF EXISTS team_preview_sync_tags ON team_tags")
+    op.execute("DROP TRIGGER IF EXISTS team_preview_sync_team ON team")
+    op.execute("DROP FUNCTION IF EXISTS team_preview_sync_owner()")
+    op.execute("DROP FUNCTION IF EXISTS team_preview_sync_members()")
+    op.execute("DROP FUNCTION IF EXISTS team_preview_sync_tags()")
+    op.execute("DROP FUNCTION IF EXISTS team_preview_sync_team()")
+    op.drop_index("ix_team_preview_deadline", table_name="team_preview")
+    op.drop_index(op.f("ix_team_preview_owner"), table_name="team_preview")
+    op.drop_table("team_preview")
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 
 from fastapi import HTTPException, status
@@ -5,11 +6,16 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.admin.schemas import MainInfoOfTeamSchema, MainInfoOfUserSchema
+from src.admin.schemas import AccountDeletionSchema, MainInfoOfTeamSchema, MainInfoOfUserSchema, SlowQuerySchema
 from src.auth import crud as auth_crud
+from src.auth.auth_handler import AuthHandler
+from src.auth.deletion import account_deleter
 from src.auth.models import AuthUser
 from src.auth.schemas import ResponseSchema, UserSchema
 from src.find.crud import get_team_data
+from src.loaders import get_loaders
+from src.redis_client import redis_manager
+from src.slow_queries import slow_query_log
 from src.team.models import Team, TeamTags
 from src.team.schemas import TeamSchema, TeamTagsSchema
 from src.user_profile.crud import get_user_profile
@@ -105,8 +111,11 @@ async def search_team_data(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="there is no such team",
         ) from None
-    query_tags = (select(TeamTags).where(TeamTags.team_id == team_id))
-    result_tags = (await session.execute(query_tags)).unique().scalar_one_or_none()
+    loaders = get_loaders(session)
+    result_tags, result_owner_name = await asyncio.gather(
+        loaders.team_tags.load(result_team_data.id),
+        loaders.users.load(result_team_data.owner),
+    )
     tags = TeamTagsSchema(
         tag1=result_tags.tag1,
         tag2=result_tags.tag2,
@@ -116,8 +125,6 @@ async def search_team_data(
         tag6=result_tags.tag6,
         tag7=result_tags.tag7,
     )
-    query_owner_name = (select(AuthUser).where(AuthUser.id == result_team_data.owner))
-    result_owner_name = (await session.execute(query_owner_name)).unique().scalar_one_or_none()
     return TeamSchema(
         id=result_team_data.id,
         owner=result_team_data.owner,
@@ -150,16 +157,38 @@ async def delete_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="you cannot delete your profile",
         )
-    stmt_user = delete(AuthUser).where(AuthUser.id == user_id)
-    await session.execute(stmt_user)
-    await session.commit()
+    await auth_crud.schedule_user_deletion(user_id, session)
+    await AuthHandler.revoke_all_refresh_tokens(user_id)
+    account_deleter.wake()
 
     return ResponseSchema(
-        status_code=status.HTTP_200_OK,
-        detail="user and his profile deleted",
+        status_code=status.HTTP_202_ACCEPTED,
+        detail="user deletion scheduled",
     )
 
 
+async def get_account_deletions(
+    session: AsyncSession,
+) -> list[AccountDeletionSchema]:
+    """Аккаунты, данные которых еще удаляются, c ходом удаления из Redis."""
+    users = await auth_crud.get_users_pending_deletion(session)
+    async with redis_manager.client.pipeline(transaction=False) as pipe:
+        for user in users:
+            pipe.hgetall(account_deleter.progress_key(user.id))
+        progress = await pipe.execute()
+    return [
+        AccountDeletionSchema(
+            user_id=user.id,
+            username=user.username,
+            email=user.email,
+            deleted_at=user.deleted_at,
+            step=user_progress.get("step"),
+            deleted_rows=int(user_progress.get("deleted_rows", 0)),
+        )
+        for user, user_progress in zip(users, progress, strict=True)
+    ]
+
+
 async def delete_team(
     team_id: str | uuid.UUID,
     session: AsyncSession,
@@ -176,3 +205,10 @@ async def delete_team(
         status_code=status.HTTP_200_OK,
         detail="team deleted",
     )
+
+
+async def get_slow_queries(
+    limit: int,
+) -> list[SlowQuerySchema]:
+    """Последние медленные запросы к БД, для части из них c планом выполнения."""
+    return [SlowQuerySchema(**entry) for entry in await slow_query_log.recent(limit)]
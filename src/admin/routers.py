@@ -1,15 +1,16 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.admin import crud, utils
-from src.admin.schemas import MainInfoOfTeamSchema, MainInfoOfUserSchema
+from src.admin.schemas import AccountDeletionSchema, MainInfoOfTeamSchema, MainInfoOfUserSchema, SlowQuerySchema
 from src.auth.auth_handler import current_user
 from src.auth.schemas import ResponseSchema, UserSchema
 from src.config import settings
 from src.database import get_async_session
+from src.deadlines import RouteDeadline
 from src.team.schemas import TeamSchema
 
 """
@@ -23,13 +24,16 @@ from src.team.schemas import TeamSchema
 - поиск пользователя по id, username или email;
 - поиск команды по ее id;
 - ручку удаления команды и ручку удаления пользователя,
-  доступ к которой будет для определенного числа пользователей - админов.
+  доступ к которой будет для определенного числа пользователей - админов;
+- ход фонового удаления аккаунтов;
+- журнал медленных запросов к БД.
 """
 
 
 admin_router = APIRouter(
     prefix=f"/admin/{settings.SECRET_PATH}",
     tags=["Admin"],
+    dependencies=[Depends(RouteDeadline(settings.DEADLINE_ADMIN_SECONDS))],
 )
 
 
@@ -96,7 +100,7 @@ async def search_team(
 
 @admin_router.delete(
     "/delete_user",
-    status_code=status.HTTP_200_OK,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def delete_user(
     user_id: str | uuid.UUID,
@@ -109,6 +113,36 @@ async def delete_user(
     return None
 
 
+@admin_router.get(
+    "/account_deletions",
+    response_model=list[AccountDeletionSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_account_deletions(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    user: Annotated[UserSchema, Depends(current_user)],
+) -> list[AccountDeletionSchema] | None:
+    """Аккаунты, данные которых еще удаляются фоновой задачей, и ход удаления."""
+    if utils.check_admin(user.username):
+        return await crud.get_account_deletions(session)
+    return None
+
+
+@admin_router.get(
+    "/slow_queries",
+    response_model=list[SlowQuerySchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_slow_queries(
+    user: Annotated[UserSchema, Depends(current_user)],
+    limit: Annotated[int, Query(ge=1, le=settings.SLOW_QUERY_LOG_SIZE)] = 50,
+) -> list[SlowQuerySchema] | None:
+    """Последние запросы к БД дольше SLOW_QUERY_THRESHOLD_MS: маршрут, типы параметров, длительность и план."""
+    if utils.check_admin(user.username):
+        return await crud.get_slow_queries(limit)
+    return None
+
+
 @admin_router.delete(
     "/delete_team",
     status_code=status.HTTP_200_OK,
@@ -1,4 +1,6 @@
+import datetime
 import uuid
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -28,3 +30,21 @@ class MainInfoOfUserSchema(BaseModel):
     link_user_telegram: str | None
     link_user_discord: str | None
     link_user_other: str | None
+
+
+class AccountDeletionSchema(BaseModel):
+    user_id: uuid.UUID
+    username: str
+    email: str
+    deleted_at: datetime.datetime
+    step: str | None
+    deleted_rows: int
+
+
+class SlowQuerySchema(BaseModel):
+    statement: str
+    route: str | None
+    parameters: Any
+    duration_ms: float
+    recorded_at: datetime.datetime
+    plan: Any
@@ -1,10 +1,10 @@
+import time
 import uuid
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, Response, status
+from fastapi import Depends, HTTPException, Response, WebSocket, WebSocketException, status
 from fastapi.security import APIKeyCookie
 from jwt import InvalidTokenError
-from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import utils as auth_utils
@@ -14,6 +14,33 @@ from src.auth.schemas import CreateUserSchema, LoginUserSchema, PasswordChangeSc
 from src.config import settings
 from src.database import get_async_session
 from src.email_settings import send_email
+from src.redis_client import redis_manager
+
+"""
+Проверка refresh token в Redis за один запрос.
+KEYS[1] - отозванное семейство токенов, KEYS[2] - уже использованный jti,
+KEYS[3] - время в микросекундах, до которого отозваны все токены пользователя
+(записанное в секундах до перехода на микросекунды покрывает всю свою секунду).
+ARGV[1] - время жизни записей в секундах, ARGV[2] - время выпуска токена в микросекундах.
+Возвращает 1 - токен действителен, 0 - токен отозван, -1 - повторное использование.
+"""
+REFRESH_FAMILY_CHECK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local revoked_before = tonumber(redis.call('GET', KEYS[3]))
+if revoked_before and revoked_before < 1e12 then
+    revoked_before = (revoked_before + 1) * 1e6 - 1
+end
+if revoked_before and tonumber(ARGV[2]) <= revoked_before then
+    return 0
+end
+if not redis.call('SET', KEYS[2], 1, 'NX', 'EX', ARGV[1]) then
+    redis.call('SET', KEYS[1], 1, 'EX', ARGV[1])
+    return -1
+end
+return 1
+"""
 
 
 class AuthHandler:
@@ -45,7 +72,7 @@ class AuthHandler:
         user_password: str | bytes,
         custom_exception: HTTPException,
     ) -> None:
-        if not user:
+        if not user or user.deleted_at is not None:
             raise custom_exception
         if not auth_utils.validate_password(
             password=user_password,
@@ -80,24 +107,114 @@ class AuthHandler:
                 detail="invalid token error",
             ) from None
 
+    @classmethod
+    async def get_websocket_user(
+        cls,
+        websocket: WebSocket,
+        session: AsyncSession,
+    ) -> UserSchema:
+        """
+        Получение пользователя WebSocket-соединения по access token из cookies.
+        Сессия передается явно, чтобы не держать соединение c БД все время жизни сокета.
+        """
+        try:
+            payload = auth_utils.decode_jwt(
+                token=websocket.cookies.get(settings.COOKIE_ACCESS_TOKEN_KEY, ""),
+            )
+            return await cls._check_token_data(payload, session)
+        except (InvalidTokenError, HTTPException):
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION) from None
+
     @classmethod
     async def check_user_refresh_token(
         cls,
         refresh_token: Annotated[str, Depends(cookies_refresh_scheme)],
         session: Annotated[AsyncSession, Depends(get_async_session)],
-    ) -> AuthUser:
-        """Проверка refresh token на подлинность."""
+    ) -> tuple[AuthUser, str]:
+        """
+        Проверка refresh token на подлинность.
+        Каждый refresh token одноразовый: повторное предъявление уже
+        использованного токена отзывает все семейство токенов.
+        """
+        refresh_exception = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="could not refresh access token",
+        )
         try:
             payload = auth_utils.decode_jwt(
                 token=refresh_token,
             )
-            user = await cls._check_token_data(payload, session)
         except InvalidTokenError:
+            raise refresh_exception from None
+        if (payload.get("type") != settings.COOKIE_REFRESH_TOKEN_KEY
+                or not all(payload.get(key) for key in ("sub", "jti", "fam"))):
+            raise refresh_exception
+        result = await redis_manager.script(REFRESH_FAMILY_CHECK_SCRIPT)(
+            keys=[
+                cls._revoked_family_key(payload["fam"]),
+                cls._used_refresh_token_key(payload["jti"]),
+                cls._revoked_user_key(payload["sub"]),
+            ],
+            args=[settings.REFRESH_TOKEN_EXPIRES_IN * 60, payload.get("iat_us", payload["iat"] * 1_000_000)],
+        )
+        if result == -1:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="could not refresh access token",
-            ) from None
-        return user
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="refresh token reuse detected",
+            )
+        if result != 1:
+            raise refresh_exception
+        user = await cls._check_token_data(payload, session)
+        return user, payload["fam"]
+
+    @staticmethod
+    def _revoked_family_key(family: str) -> str:
+        return f"refresh:revoked_family:{family}"
+
+    @staticmethod
+    def _used_refresh_token_key(jti: str) -> str:
+        return f"refresh:used:{jti}"
+
+    @staticmethod
+    def _revoked_user_key(user_id: str | uuid.UUID) -> str:
+        return f"refresh:revoked_user:{user_id}"
+
+    @classmethod
+    async def revoke_refresh_token(
+        cls,
+        refresh_token: str | None,
+    ) -> None:
+        """Отзыв семейства, к которому принадлежит refresh token."""
+        if not refresh_token:
+            return
+        try:
+            payload = auth_utils.decode_jwt(
+                token=refresh_token,
+            )
+        except InvalidTokenError:
+            return
+        if family := payload.get("fam"):
+            await redis_manager.client.set(
+                cls._revoked_family_key(family),
+                1,
+                ex=settings.REFRESH_TOKEN_EXPIRES_IN * 60,
+            )
+
+    @classmethod
+    async def revoke_all_refresh_tokens(
+        cls,
+        user_id: str | uuid.UUID,
+    ) -> None:
+        """
+        Отзыв всех выданных ранее refresh token пользователя.
+        Время хранится в микросекундах, как iat_us в токене, чтобы токен,
+        выданный в ту же секунду после отзыва, оставался действительным.
+        """
+        await redis_manager.client.set(
+            cls._revoked_user_key(user_id),
+            time.time_ns() // 1000,
+            ex=settings.REFRESH_TOKEN_EXPIRES_IN * 60,
+        )
 
     @staticmethod
     async def _check_token_data(
@@ -111,7 +228,7 @@ class AuthHandler:
                 detail="could not refresh access token",
             ) from None
         user_id: str = payload.get("sub")
-        if not (user := await get_user_by_id(user_id, session)):
+        if not (user := await get_user_by_id(user_id, session)) or user.deleted_at is not None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="the user no longer exists",
@@ -129,11 +246,13 @@ class AuthHandler:
         type_token: str,
         expires_time: int,
         data: UserSchema,
+        extra_payload: dict | None = None,
     ) -> str:
         """Функция создания токена по заданным параметрам."""
         jwt_payload = {
             "sub": str(data.id),
             "type": type_token,
+            **(extra_payload or {}),
         }
         token = auth_utils.encode_jwt(jwt_payload, expire_minutes=expires_time)
         response.set_cookie(type_token, token, httponly=True, secure=False)
@@ -158,13 +277,23 @@ class AuthHandler:
         cls,
         response: Response,
         user_data: Annotated[UserSchema, Depends(validate_auth_user)],
-    ) -> dict:
-        """Создание refresh_token."""
+        family: str | None = None,
+    ) -> str:
+        """
+        Создание refresh_token.
+        Токен получает уникальный jti, id семейства и время выпуска в микросекундах:
+        при входе создается новое семейство, при обновлении токена семейство сохраняется.
+        """
         return cls._create_token(
             response=response,
             type_token=settings.COOKIE_REFRESH_TOKEN_KEY,
             expires_time=settings.REFRESH_TOKEN_EXPIRES_IN,
             data=user_data,
+            extra_payload={
+                "jti": uuid.uuid4().hex,
+                "fam": family or uuid.uuid4().hex,
+                "iat_us": time.time_ns() // 1000,
+            },
         )
 
     @classmethod
@@ -172,10 +301,11 @@ class AuthHandler:
         cls,
         response: Response,
         user: AuthUser,
-    ) -> None:
+        family: str | None = None,
+    ) -> dict:
         """Создание всех токенов пользователя."""
         access_token = cls.create_access_token(response, user)
-        refresh_token = cls.create_refresh_token(response, user)
+        refresh_token = cls.create_refresh_token(response, user, family)
         return {"access_token": access_token, "refresh_token": refresh_token, "user": UserSchema(**user.__dict__)}
 
     @staticmethod
@@ -228,7 +358,7 @@ class AuthHandler:
     async def generate_email_token(user_id: str | uuid.UUID):
         token = uuid.uuid4().hex
         redis_key = str(token)
-        await redis_client.set(redis_key, str(user_id), ex=900)
+        await redis_manager.client.set(redis_key, str(user_id), ex=900)
         return redis_key
 
     @staticmethod
@@ -236,7 +366,7 @@ class AuthHandler:
         token: str,
         session: AsyncSession,
     ) -> AuthUser:
-        if not (user_id := await redis_client.get(token)):
+        if not (user_id := await redis_manager.consume(token)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="invalid data",
@@ -244,7 +374,6 @@ class AuthHandler:
 
         user = await get_user_by_id(user_id, session)
         await verify_user_data(user_id, session)
-        await redis_client.delete(token)
         return user
 
     @classmethod
@@ -277,19 +406,18 @@ class AuthHandler:
         password_data: PasswordChangeSchema,
         session: AsyncSession,
     ) -> None:
-        if not (user_id := await redis_client.get(token)):
+        if not password_data.hashed_password == password_data.confirmed_password:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="passwords are different",
+            )
+        if not (user_id := await redis_manager.consume(token)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="invalid data",
             )
         await change_password(user_id, password_data, session)
-        await redis_client.delete(token)
+        await AuthHandler.revoke_all_refresh_tokens(user_id)
 
 
 current_user = AuthHandler.get_auth_user
-
-redis_client = AsyncRedis.from_url(
-    url=settings.db_url_redis,
-    db=0,
-    decode_responses=True,
-)
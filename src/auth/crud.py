@@ -1,12 +1,25 @@
+import datetime
 import uuid
 
 from fastapi import HTTPException, status
-from sqlalchemy import insert, select, update
+from sqlalchemy import ColumnElement, Table, delete, insert, literal_column, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth import utils as auth_utils
 from src.auth.models import AuthUser
 from src.auth.schemas import CreateUserSchema, PasswordChangeSchema, UserSchema
+from src.chat.models import ChatMessage
+from src.loaders import as_uuid, get_loaders
+from src.notifications.models import Notification
+from src.team.models import (
+    Team,
+    TeamArchive,
+    application_to_join_archive_table,
+    application_to_join_table,
+    team_members_archive_table,
+    team_members_table,
+)
+from src.user_profile.models import UserContacts, UserHobbies, UserProfile
 
 
 async def get_user(
@@ -25,13 +38,11 @@ async def get_user(
 
 
 async def get_user_by_id(
-    user_id: uuid.UUID,
+    user_id: uuid.UUID | str,
     session: AsyncSession,
 ) -> AuthUser | None:
     """Получение данных о пользователе из БД по id."""
-    query = select(AuthUser).where(AuthUser.id == user_id)
-    result = await session.execute(query)
-    return result.scalar_one_or_none()
+    return await get_loaders(session).users.load(as_uuid(user_id))
 
 
 async def create_user(
@@ -95,3 +106,84 @@ async def change_password(
     }).where(AuthUser.id == user_id)
     await session.execute(stmt)
     await session.commit()
+
+
+async def schedule_user_deletion(
+    user_id: uuid.UUID | str,
+    session: AsyncSession,
+) -> bool:
+    """
+    Пометка пользователя удаленным: вход и токены перестают работать сразу,
+    a данные удаляет фоновая задача. Возвращает False, если удаление уже запланировано.
+    """
+    stmt = (
+        update(AuthUser)
+        .where(AuthUser.id == user_id, AuthUser.deleted_at.is_(None))
+        .values(deleted_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None))
+        .returning(AuthUser.id)
+    )
+    scheduled = (await session.execute(stmt)).scalar_one_or_none() is not None
+    await session.commit()
+    return scheduled
+
+
+async def get_users_pending_deletion(
+    session: AsyncSession,
+) -> list[AuthUser]:
+    """Пользователи, удаление данных которых еще не завершено, в порядке запроса удаления."""
+    query = select(AuthUser).where(AuthUser.deleted_at.is_not(None)).order_by(AuthUser.deleted_at)
+    return list((await session.execute(query)).scalars())
+
+
+def user_deletion_steps(
+    user_id: uuid.UUID,
+) -> list[tuple[Table, ColumnElement[bool]]]:
+    """
+    Порядок удаления данных пользователя.
+    Сначала строки, которые иначе удалил бы каскад от его команд (сообщения, заявки, участники),
+    затем сами команды, архив, профиль и в конце пользователь - каскаду остается по одной строке на команду.
+    """
+    owned_teams = select(Team.id).where(Team.owner == user_id)
+    owned_archive = select(TeamArchive.id).where(TeamArchive.owner == user_id)
+    return [
+        (ChatMessage.__table__, or_(ChatMessage.team_id.in_(owned_teams), ChatMessage.user_id == user_id)),
+        (application_to_join_table, or_(
+            application_to_join_table.c.team_id.in_(owned_teams),
+            application_to_join_table.c.user_id == user_id,
+        )),
+        (team_members_table, or_(
+            team_members_table.c.team_id.in_(owned_teams),
+            team_members_table.c.user_id == user_id,
+        )),
+        (Team.__table__, Team.owner == user_id),
+        (application_to_join_archive_table, or_(
+            application_to_join_archive_table.c.team_id.in_(owned_archive),
+            application_to_join_archive_table.c.user_id == user_id,
+        )),
+        (team_members_archive_table, or_(
+            team_members_archive_table.c.team_id.in_(owned_archive),
+            team_members_archive_table.c.user_id == user_id,
+        )),
+        (TeamArchive.__table__, TeamArchive.owner == user_id),
+        (Notification.__table__, Notification.recipient_id == user_id),
+        (UserContacts.__table__, UserContacts.user_id == user_id),
+        (UserHobbies.__table__, UserHobbies.user_id == user_id),
+        (UserProfile.__table__, UserProfile.user_id == user_id),
+        (AuthUser.__table__, AuthUser.id == user_id),
+    ]
+
+
+async def delete_rows_batch(
+    table: Table,
+    condition: ColumnElement[bool],
+    session: AsyncSession,
+    batch_size: int,
+) -> int:
+    """
+    Удаление не больше batch_size строк таблицы по условию, возвращает число удаленных строк.
+    Строки, заблокированные другими транзакциями, пропускаются до следующей пачки.
+    """
+    ctid = literal_column("ctid")
+    batch = select(ctid).select_from(table).where(condition).limit(batch_size).with_for_update(skip_locked=True)
+    result = await session.execute(delete(table).where(ctid.in_(batch.scalar_subquery())))
+    return result.rowcount
@@ -0,0 +1,117 @@
+import asyncio
+import contextlib
+import logging
+import os
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import crud
+from src.config import settings
+from src.database import async_session_maker
+from src.redis_client import EXTEND_LOCK_SCRIPT, RELEASE_LOCK_SCRIPT, redis_manager
+
+logger = logging.getLogger(__name__)
+
+
+class LockLostError(Exception):
+    """Блокировка удаления истекла и могла быть захвачена другим процессом."""
+
+
+class AccountDeleter:
+    """
+    Фоновое удаление данных пользователей, запросивших удаление аккаунта.
+    Данные удаляются пачками по batch_size строк, каждая пачка - отдельная
+    короткая транзакция, поэтому удаление пользователя c большими командами
+    не блокирует много строк сразу. Ход удаления хранится в Redis для админов.
+    Блокировка в Redis продлевается после каждой пачки, поэтому долгое удаление
+    не выполняется двумя процессами одновременно.
+    """
+
+    LOCK_KEY = "account-deletion:lock"
+
+    def __init__(self, interval: int, batch_size: int, pause: float) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._lock_token: str | None = None
+
+    @staticmethod
+    def progress_key(user_id: uuid.UUID | str) -> str:
+        return f"account-deletion:progress:{user_id}"
+
+    async def purge_user(self, user_id: uuid.UUID, session: AsyncSession) -> int:
+        """Удаление всех данных пользователя пачками, возвращает число удаленных строк."""
+        deleted = 0
+        key = self.progress_key(user_id)
+        for table, condition in crud.user_deletion_steps(user_id):
+            while count := await crud.delete_rows_batch(table, condition, session, self.batch_size):
+                await session.commit()
+                deleted += count
+                await redis_manager.client.hset(key, mapping={"step": table.name, "deleted_rows": deleted})
+                await self._extend_lock()
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause)
+            await session.commit()
+        await redis_manager.client.delete(key)
+        return deleted
+
+    async def _extend_lock(self) -> None:
+        if self._lock_token is None:
+            return
+        extend = redis_manager.script(EXTEND_LOCK_SCRIPT)
+        if not await extend(keys=[self.LOCK_KEY], args=[self._lock_token, self.interval]):
+            raise LockLostError
+
+    async def run_once(self) -> int:
+        """Удаление данных всех помеченных пользователей, возвращает число удаленных аккаунтов."""
+        token = f"{os.getpid()}:{uuid.uuid4()}"
+        if not await redis_manager.client.set(self.LOCK_KEY, token, nx=True, ex=self.interval):
+            return 0
+        self._lock_token = token
+        purged = 0
+        try:
+            async with async_session_maker() as session:
+                user_ids = [user.id for user in await crud.get_users_pending_deletion(session)]
+                await session.commit()
+                for user_id in user_ids:
+                    deleted = await self.purge_user(user_id, session)
+                    logger.info("account %s deleted, %d rows removed", user_id, deleted)
+                    purged += 1
+        finally:
+            self._lock_token = None
+            await redis_manager.script(RELEASE_LOCK_SCRIPT)(keys=[self.LOCK_KEY], args=[token])
+        return purged
+
+    def wake(self) -> None:
+        """Запуск удаления без ожидания следующего интервала."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:  # noqa: BLE001
+                logger.warning("account deletion failed", exc_info=True)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            self._wakeup.clear()
+
+    async def start(self) -> None:
+        if self.interval:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+account_deleter = AccountDeleter(
+    settings.ACCOUNT_DELETION_INTERVAL,
+    settings.ACCOUNT_DELETION_BATCH_SIZE,
+    settings.ACCOUNT_DELETION_BATCH_PAUSE,
+)
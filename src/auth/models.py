@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -29,6 +29,7 @@ class AuthUser(Base):
     verified: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(default=datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Mapped[datetime] = mapped_column(default=datetime.now(timezone.utc).replace(tzinfo=None))
+    deleted_at: Mapped[datetime | None] = mapped_column(nullable=True, default=None)
 
     teams = relationship(
         "Team",
@@ -41,3 +42,11 @@ class AuthUser(Base):
         back_populates="applications_from",
         secondary=application_to_join_table,
     )
+
+    __table_args__ = (
+        Index(
+            "ix_auth_user_deleted",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
@@ -3,13 +3,14 @@ from typing import Annotated
 from fastapi import (
     APIRouter,
     Depends,
+    Request,
     Response,
     status,
 )
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.auth_handler import AuthHandler
+from src.auth.auth_handler import AuthHandler, current_user
 from src.auth.schemas import (
     CreateUserSchema,
     LoginUserSchema,
@@ -19,6 +20,7 @@ from src.auth.schemas import (
 )
 from src.config import settings
 from src.database import get_async_session
+from src.idempotency import IdempotentRequest, idempotency
 from src.user_profile.crud import create_user_profile
 
 auth_router = APIRouter(
@@ -35,18 +37,19 @@ auth_router = APIRouter(
 async def register(
     user_data: CreateUserSchema,
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    idempotent: Annotated[IdempotentRequest, Depends(idempotency)],
 ):
     """Регистрация нового пользователя c отправкой ему сообщению для подтверждения почты."""
     if await AuthHandler.check_register_user(user_data, session):
-        return ResponseSchema(
+        return await idempotent.save(ResponseSchema(
             status_code=status.HTTP_200_OK,
             detail="message was sent again",
-        )
+        ))
     await AuthHandler.register_user(user_data, session)
-    return ResponseSchema(
+    return await idempotent.save(ResponseSchema(
         status_code=status.HTTP_201_CREATED,
         detail="to complete the registration, confirm your email",
-    )
+    ))
 
 
 @auth_router.post(
@@ -68,10 +71,15 @@ async def login(
 )
 async def refresh_token(
     response: Response,
-    user: Annotated[UserSchema, Depends(AuthHandler.check_user_refresh_token)],
+    token_data: Annotated[tuple[UserSchema, str], Depends(AuthHandler.check_user_refresh_token)],
 ) -> dict:
-    """Обновление access_token при наличии действующего refresh_token."""
-    return AuthHandler.create_all_tokens(response, user)
+    """
+    Обновление access_token при наличии действующего refresh_token.
+    Вместе c access_token выдается новый refresh_token того же семейства,
+    старый refresh_token становится недействительным.
+    """
+    user, family = token_data
+    return AuthHandler.create_all_tokens(response, user, family)
 
 
 @auth_router.get(
@@ -79,9 +87,24 @@ async def refresh_token(
     status_code=status.HTTP_204_NO_CONTENT,
 )
 async def logout(
+    request: Request,
+    response: Response,
+) -> None:
+    """Выход пользователя c отзывом refresh_token и удалением файлов куки из браузера."""
+    await AuthHandler.revoke_refresh_token(request.cookies.get(settings.COOKIE_REFRESH_TOKEN_KEY))
+    AuthHandler.delete_all_tokens(response)
+
+
+@auth_router.get(
+    "/logout_all",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def logout_all(
     response: Response,
+    user: Annotated[UserSchema, Depends(current_user)],
 ) -> None:
-    """Выход пользователя c удалением файлов куки из браузера."""
+    """Выход пользователя на всех устройствах c отзывом всех его refresh_token."""
+    await AuthHandler.revoke_all_refresh_tokens(user.id)
     AuthHandler.delete_all_tokens(response)
 
 
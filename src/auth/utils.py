@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
 
 import bcrypt
 import jwt
@@ -6,9 +8,24 @@ import jwt
 from src.config import settings
 
 
+@lru_cache
+def get_private_key() -> Any:
+    """
+    Ключ для подписи JWT.
+    Файл читается и разбирается один раз, при первом обращении или при старте приложения.
+    """
+    return jwt.get_algorithm_by_name(settings.ALGORITHM).prepare_key(settings.PRIVATE_KEY_PATH.read_text())
+
+
+@lru_cache
+def get_public_key() -> Any:
+    """Ключ для проверки подписи JWT."""
+    return jwt.get_algorithm_by_name(settings.ALGORITHM).prepare_key(settings.PUBLIC_KEY_PATH.read_text())
+
+
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.PRIVATE_KEY_PATH.read_text(),
+    private_key: Any = None,
     algorithm: str = settings.ALGORITHM,
     expire_minutes: int = settings.ACCESS_TOKEN_EXPIRES_IN,
 ) -> str:
@@ -22,20 +39,20 @@ def encode_jwt(
     )
     return jwt.encode(
         to_encode,
-        private_key,
+        private_key or get_private_key(),
         algorithm=algorithm,
     )
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.PUBLIC_KEY_PATH.read_text(),
+    public_key: Any = None,
     algorithm: str = settings.ALGORITHM,
 ) -> dict:
     """Декодировка JWT токена в данные."""
     return jwt.decode(
         token,
-        public_key,
+        public_key or get_public_key(),
         algorithms=[algorithm],
     )
 
@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import and_, exists, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import AuthUser
+from src.chat.models import ChatMessage
+from src.chat.schemas import ChatMessageSchema
+from src.team.models import Team, team_members_table
+
+
+async def is_team_member(
+    team_id: uuid.UUID,
+    user_id: uuid.UUID,
+    session: AsyncSession,
+) -> bool:
+    """Проверка, что пользователь - владелец или участник команды."""
+    query = select(Team.id).where(and_(
+        Team.id == team_id,
+        or_(
+            Team.owner == user_id,
+            exists().where(and_(
+                team_members_table.c.team_id == Team.id,
+                team_members_table.c.user_id == user_id,
+            )),
+        ),
+    ))
+    return (await session.execute(query)).scalar_one_or_none() is not None
+
+
+async def save_messages(
+    messages: list[ChatMessageSchema],
+    session: AsyncSession,
+) -> None:
+    """
+    Запись пачки сообщений одним запросом.
+    Повторно доставленные из Redis сообщения пропускаются.
+    """
+    stmt = insert(ChatMessage).values([
+        message.model_dump(exclude={"username"}) for message in messages
+    ]).on_conflict_do_nothing(index_elements=[ChatMessage.id])
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def get_messages(
+    team_id: uuid.UUID,
+    session: AsyncSession,
+    before_id: uuid.UUID | None = None,
+    limit: int = 50,
+) -> list[ChatMessageSchema]:
+    """Получение сообщений команды от новых к старым, страница начинается после сообщения before_id."""
+    query = (
+        select(ChatMessage, AuthUser.username)
+        .join(AuthUser, AuthUser.id == ChatMessage.user_id)
+        .where(ChatMessage.team_id == team_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        cursor = select(ChatMessage.created_at).where(ChatMessage.id == before_id).scalar_subquery()
+        query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(cursor, before_id))
+    result = await session.execute(query)
+    return [
+        ChatMessageSchema(
+            id=message.id,
+            team_id=message.team_id,
+            user_id=message.user_id,
+            username=username,
+            text=message.text,
+            created_at=message.created_at,
+        )
+        for message, username in result
+    ]
@@ -0,0 +1,32 @@
+import datetime
+import uuid
+
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class ChatMessage(Base):
+    """
+    Модель сообщения в чате команды.
+    Чат есть только у активных команд: при переносе команды в архив
+    ее сообщения удаляются каскадно вместе c командой.
+    """
+    __tablename__ = "chat_message"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    team_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("team.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("auth_user.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    text: Mapped[str] = mapped_column(String(length=2000), nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        Index("ix_chat_message_team_created", "team_id", "created_at", "id"),
+    )
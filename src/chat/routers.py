@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, WebSocketException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.auth_handler import AuthHandler, current_user
+from src.auth.schemas import UserSchema
+from src.chat import crud
+from src.chat.schemas import ChatMessageSchema
+from src.chat.utils import chat_hub, publish_message
+from src.config import settings
+from src.database import async_session_maker, get_read_async_session
+
+chat_router = APIRouter(
+    prefix="/chat",
+    tags=["Chat"],
+)
+
+"""
+Чат команды.
+
+Писать и читать чат могут владелец и участники команды.
+"""
+
+
+async def _send_messages(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    """Отправка сообщений из очереди соединения; закрытое клиентом соединение завершает задачу."""
+    with contextlib.suppress(Exception):
+        while True:
+            await websocket.send_text(await queue.get())
+
+
+@chat_router.websocket("/{team_id}/ws")
+async def team_chat(
+    websocket: WebSocket,
+    team_id: uuid.UUID,
+) -> None:
+    """
+    Соединение c чатом команды.
+    Пользователь и членство в команде проверяются один раз при подключении,
+    соединение c БД освобождается до начала переписки.
+    """
+    async with async_session_maker() as session:
+        user = await AuthHandler.get_websocket_user(websocket, session)
+        if not await crud.is_team_member(team_id, user.id, session):
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    user = UserSchema(id=user.id, username=user.username, email=user.email, verified=user.verified)
+
+    await websocket.accept()
+    queue = chat_hub.join(team_id)
+    sender = asyncio.create_task(_send_messages(websocket, queue))
+    try:
+        while True:
+            if text := (await websocket.receive_text()).strip():
+                await publish_message(team_id, user, text[:settings.CHAT_MESSAGE_MAX_LENGTH])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        chat_hub.leave(team_id, queue)
+
+
+@chat_router.get(
+    "/{team_id}/history",
+    response_model=list[ChatMessageSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_history(
+    team_id: uuid.UUID,
+    user: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    before_id: uuid.UUID | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+) -> list[ChatMessageSchema]:
+    """
+    История чата от новых сообщений к старым.
+    Следующая страница запрашивается c before_id, равным id последнего полученного сообщения.
+    """
+    if not await crud.is_team_member(team_id, user.id, session):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="no access",
+        )
+    return await crud.get_messages(team_id, session, before_id, limit)
@@ -0,0 +1,13 @@
+import datetime
+import uuid
+
+from pydantic import BaseModel
+
+
+class ChatMessageSchema(BaseModel):
+    id: uuid.UUID
+    team_id: uuid.UUID
+    user_id: uuid.UUID
+    username: str
+    text: str
+    created_at: datetime.datetime
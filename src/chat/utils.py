@@ -0,0 +1,258 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+
+from pydantic import ValidationError
+from redis.exceptions import ResponseError
+from sqlalchemy.exc import DataError, IntegrityError
+
+from src.auth.schemas import UserSchema
+from src.chat import crud
+from src.chat.schemas import ChatMessageSchema
+from src.config import settings
+from src.database import async_session_maker
+from src.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+"""Общий поток сообщений всех чатов: из него читают процессы для рассылки и группа для записи в БД."""
+CHAT_STREAM_KEY = "chat:messages"
+CHAT_PERSIST_GROUP = "chat-persist"
+
+
+async def publish_message(
+    team_id: uuid.UUID,
+    user: UserSchema,
+    text: str,
+) -> None:
+    """Добавление сообщения в поток Redis."""
+    message = ChatMessageSchema(
+        id=uuid.uuid4(),
+        team_id=team_id,
+        user_id=user.id,
+        username=user.username,
+        text=text,
+        created_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+    )
+    await redis_manager.client.xadd(
+        CHAT_STREAM_KEY,
+        {"team_id": str(team_id), "data": message.model_dump_json()},
+        maxlen=settings.CHAT_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+class ChatHub:
+    """
+    Рассылка сообщений чатов подключенным к процессу клиентам.
+
+    Процесс читает общий поток одной блокирующей командой XREAD и раскладывает
+    уже сериализованные сообщения по очередям соединений своих комнат,
+    поэтому число запросов к Redis не зависит от числа подключенных клиентов.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._rooms: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._reader_task: asyncio.Task | None = None
+
+    def join(self, team_id: uuid.UUID) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._rooms[str(team_id)].add(queue)
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._read())
+        return queue
+
+    def leave(self, team_id: uuid.UUID, queue: asyncio.Queue) -> None:
+        room = self._rooms[str(team_id)]
+        room.discard(queue)
+        if not room:
+            del self._rooms[str(team_id)]
+
+    async def _read(self) -> None:
+        last_id = "$"
+        while self._reader_task is not None:
+            try:
+                response = await redis_manager.client.xread(
+                    {CHAT_STREAM_KEY: last_id},
+                    count=settings.CHAT_READ_BATCH_SIZE,
+                    block=settings.CHAT_READ_BLOCK_MS,
+                )
+            except Exception:  # noqa: BLE001
+                logger.warning("chat stream read failed", exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    for queue in self._rooms.get(fields["team_id"], ()):
+                        try:
+                            queue.put_nowait(fields["data"])
+                        except asyncio.QueueFull:
+                            logger.warning("chat queue is full, message dropped")
+
+    async def stop(self) -> None:
+        if (reader_task := self._reader_task) is not None:
+            self._reader_task = None
+            reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reader_task
+        self._rooms.clear()
+
+
+class ChatPersister:
+    """
+    Запись сообщений из потока в БД пачками.
+
+    Процессы читают поток как участники одной группы, поэтому каждое сообщение
+    записывает ровно один процесс. Сообщение подтверждается (XACK) только после
+    записи в БД; при ошибке оно остается в списке ожидающих и перечитывается.
+    Каждый процесс - новый участник группы, поэтому сообщения, оставшиеся ожидающими
+    у упавшего или перезапущенного процесса, забирает себе (XAUTOCLAIM) другой процесс,
+    когда они пролежат claim_idle_ms, а участники без ожидающих сообщений, давно
+    не читавшие поток, удаляются из группы. Если пачка не записывается, сообщения записываются по одному:
+    непригодные (неверные данные, команда удалена или в архиве) и не записанные
+    за max_deliveries попыток подтверждаются и пишутся в лог, чтобы не остановить запись остальных.
+    """
+
+    def __init__(self, batch_size: int, max_deliveries: int, claim_idle_ms: int) -> None:
+        self.batch_size = batch_size
+        self.max_deliveries = max_deliveries
+        self.claim_idle_ms = claim_idle_ms
+        self.consumer = f"{os.uname().nodename}-{os.getpid()}"
+        self._task: asyncio.Task | None = None
+
+    async def _create_group(self) -> None:
+        try:
+            await redis_manager.client.xgroup_create(CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, id="0", mkstream=True)
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+
+    async def _read_batch(self, pending: bool) -> list[tuple[str, dict]]:
+        """
+        Новые сообщения или, при pending, ожидающие сообщения этого процесса,
+        а когда их нет - давно ожидающие сообщения других участников группы.
+        """
+        response = await redis_manager.client.xreadgroup(
+            CHAT_PERSIST_GROUP,
+            self.consumer,
+            {CHAT_STREAM_KEY: "0" if pending else ">"},
+            count=self.batch_size,
+            block=None if pending else settings.CHAT_READ_BLOCK_MS,
+        )
+        if (entries := [entry for _, entries in response for entry in entries]) or not pending:
+            return entries
+        _, claimed, *_ = await redis_manager.client.xautoclaim(
+            CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, self.consumer, self.claim_idle_ms, count=self.batch_size,
+        )
+        return claimed
+
+    async def remove_idle_consumers(self) -> list[str]:
+        """Удаление из группы участников без ожидающих сообщений, не читавших поток claim_idle_ms."""
+        removed = []
+        for consumer in await redis_manager.client.xinfo_consumers(CHAT_STREAM_KEY, CHAT_PERSIST_GROUP):
+            name = consumer["name"]
+            if name != self.consumer and consumer["pending"] == 0 and consumer["idle"] >= self.claim_idle_ms:
+                await redis_manager.client.xgroup_delconsumer(CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, name)
+                removed.append(name)
+        return removed
+
+    async def persist_batch(self, pending: bool = False) -> int:
+        """Запись одной пачки сообщений, возвращает число записанных сообщений."""
+        if not (entries := await self._read_batch(pending)):
+            return 0
+        """Записи, вытесненные из потока до подтверждения, приходят без полей."""
+        try:
+            if messages := [ChatMessageSchema.model_validate_json(fields["data"]) for _, fields in entries if fields]:
+                async with async_session_maker() as session:
+                    await crud.save_messages(messages, session)
+        except Exception:  # noqa: BLE001
+            logger.warning("chat batch persistence failed, saving messages one by one", exc_info=True)
+            return await self._persist_separately(entries)
+        await redis_manager.client.xack(CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, *(entry_id for entry_id, _ in entries))
+        return len(entries)
+
+    async def _persist_separately(self, entries: list[tuple[str, dict]]) -> int:
+        """
+        Запись сообщений пачки по одному.
+        Подтверждаются записанные и отброшенные сообщения, остальные остаются ожидающими:
+        если такие есть, поднимается ошибка, и пачка перечитывается после паузы.
+        """
+        deliveries = {
+            entry["message_id"]: entry["times_delivered"]
+            for entry in await redis_manager.client.xpending_range(
+                CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, entries[0][0], entries[-1][0], len(entries), self.consumer,
+            )
+        }
+        done, failed = [], []
+        for entry_id, fields in entries:
+            if fields and await self._persist_entry(entry_id, fields, deliveries.get(entry_id, 1)) is False:
+                failed.append(entry_id)
+            else:
+                done.append(entry_id)
+        if done:
+            await redis_manager.client.xack(CHAT_STREAM_KEY, CHAT_PERSIST_GROUP, *done)
+        if failed:
+            raise RuntimeError(f"{len(failed)} chat messages are not persisted")
+        return len(entries)
+
+    async def _persist_entry(self, entry_id: str, fields: dict, deliveries: int) -> bool | None:
+        """Запись одного сообщения: True - записано, None - отброшено, False - повторить позже."""
+        try:
+            message = ChatMessageSchema.model_validate_json(fields["data"])
+            async with async_session_maker() as session:
+                await crud.save_messages([message], session)
+        except (ValidationError, IntegrityError, DataError):
+            logger.exception("chat message %s dropped: %s", entry_id, fields)
+            return None
+        except Exception:
+            if deliveries < self.max_deliveries:
+                return False
+            logger.exception("chat message %s dropped after %d attempts: %s", entry_id, deliveries, fields)
+            return None
+        return True
+
+    async def _run(self) -> None:
+        pending = True
+        failures = 0
+        next_claim = 0.0
+        while self._task is not None:
+            try:
+                if pending:
+                    await self._create_group()
+                if await self.persist_batch(pending) == 0 and pending:
+                    await self.remove_idle_consumers()
+                    pending = False
+                    next_claim = time.monotonic() + self.claim_idle_ms / 1000
+                elif not pending and time.monotonic() >= next_claim:
+                    pending = True
+                failures = 0
+            except Exception:  # noqa: BLE001
+                logger.warning("chat messages persistence failed", exc_info=True)
+                pending = True
+                failures += 1
+                await asyncio.sleep(min(2 ** failures, 60))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if (task := self._task) is not None:
+            self._task = None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+chat_hub = ChatHub(settings.CHAT_QUEUE_SIZE)
+chat_persister = ChatPersister(
+    settings.CHAT_PERSIST_BATCH_SIZE,
+    settings.CHAT_PERSIST_MAX_DELIVERIES,
+    settings.CHAT_PERSIST_CLAIM_IDLE_MS,
+)
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+from collections import OrderedDict
+
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+"""Тела ответов больше этого размера сжимаются в отдельном потоке, чтобы не блокировать event loop."""
+THREAD_COMPRESSION_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Выбор кодировки по заголовку Accept-Encoding c учетом q-значений.
+    При равных весах предпочтение отдается brotli.
+    """
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+    wildcard = weights.get("*", 0.0)
+    quality, _, encoding = max(
+        (weights.get(encoding, wildcard), preference, encoding)
+        for preference, encoding in enumerate(("gzip", "br"))
+    )
+    return encoding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """
+    LRU-кэш уже сжатых тел ответов, ограниченный суммарным размером.
+    Ключ - кодировка и хэш несжатого тела: повторяющиеся ответы
+    (горячие списки команд) сжимаются один раз, дальше отдаются из кэша.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._items: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    @staticmethod
+    def make_key(body: bytes, encoding: str) -> tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        if (compressed := self._items.get(key)) is not None:
+            self._items.move_to_end(key)
+        return compressed
+
+    def set(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        if len(compressed) > self.max_size // 8 or key in self._items:
+            return
+        self._items[key] = compressed
+        self.size += len(compressed)
+        while self.size > self.max_size:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов gzip или brotli по заголовку Accept-Encoding.
+
+    Сжимаются только ответы c телом одним сообщением, не меньше minimum_size
+    и c текстовым или JSON содержимым. Потоковые ответы (SSE, файлы)
+    и ответы c уже заданным Content-Encoding передаются как есть.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        cache_size: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        initial_message: Message = {}
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal initial_message
+            if message["type"] == "http.response.start":
+                response_headers = Headers(raw=message["headers"])
+                if (
+                    "content-encoding" in response_headers
+                    or not response_headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+                ):
+                    await send(message)
+                else:
+                    initial_message = message
+                return
+            if message["type"] != "http.response.body":
+                # Расширения ASGI (zerocopysend, pathsend) заменяют тело: начало ответа уходит перед ними.
+                if initial_message:
+                    start_message, initial_message = initial_message, {}
+                    await send(start_message)
+                await send(message)
+                return
+            if initial_message:
+                start_message, initial_message = initial_message, {}
+                body = message.get("body", b"")
+                if not (message.get("more_body", False) or len(body) < self.minimum_size):
+                    compressed = await self._compress(body, encoding)
+                    response_headers = MutableHeaders(raw=start_message["headers"])
+                    response_headers["Content-Encoding"] = encoding
+                    response_headers["Content-Length"] = str(len(compressed))
+                    response_headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": compressed}
+                await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        key = self.cache.make_key(body, encoding)
+        if (compressed := self.cache.get(key)) is not None:
+            return compressed
+        if len(body) > THREAD_COMPRESSION_SIZE:
+            compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+        else:
+            compressed = compress(body, encoding)
+        self.cache.set(key, compressed)
+        return compressed
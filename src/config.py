@@ -17,15 +17,84 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 5.0
+    DB_PGBOUNCER: bool = False
+    DB_QUERY_CACHE_SIZE: int = 500
+    TEST_PGBOUNCER_HOST: str = ""
+    DEADLINE_FIND_SECONDS: float = 3.0
+    DEADLINE_ADMIN_SECONDS: float = 10.0
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 5000
+    SLOW_QUERY_LOG_SIZE: int = 500
+    DB_MAX_CONNECTIONS: int = 90
+    DB_REPLICA_HOSTS: str = ""
+    DB_REPLICA_MAX_LAG: float = 5.0
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 5.0
+    READ_YOUR_WRITES_SECONDS: int = 5
 
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_POOL_SIZE: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_CONNECT_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    WARMUP_DB_CONNECTIONS: int = 2
+    WARMUP_REDIS_CONNECTIONS: int = 2
+
+    TEAM_ARCHIVE_INTERVAL: int = 3600
+    TEAM_ARCHIVE_BATCH_SIZE: int = 500
+
+    ACCOUNT_DELETION_INTERVAL: int = 300
+    ACCOUNT_DELETION_BATCH_SIZE: int = 500
+    ACCOUNT_DELETION_BATCH_PAUSE: float = 0.05
+
+    NOTIFICATIONS_KEEPALIVE_SECONDS: float = 15.0
+    NOTIFICATIONS_QUEUE_SIZE: int = 100
+    NOTIFICATIONS_BATCH_SIZE: int = 500
+    NOTIFICATIONS_FLUSH_INTERVAL: float = 1.0
+    NOTIFICATIONS_UNREAD_TTL: int = 86400
+
+    CHAT_MESSAGE_MAX_LENGTH: int = 2000
+    CHAT_QUEUE_SIZE: int = 100
+    CHAT_STREAM_MAXLEN: int = 100000
+    CHAT_READ_BATCH_SIZE: int = 500
+    CHAT_READ_BLOCK_MS: int = 1000
+    CHAT_PERSIST_BATCH_SIZE: int = 500
+    CHAT_PERSIST_MAX_DELIVERIES: int = 10
+    CHAT_PERSIST_CLAIM_IDLE_MS: int = 300000
+
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TTL: int = 30
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+
+    BATCH_MAX_IDS: int = 100
+
+    GRAPHQL_MAX_DEPTH: int = 6
+    GRAPHQL_MAX_COMPLEXITY: int = 2000
+    GRAPHQL_LIST_COST: int = 10
+    GRAPHQL_PAGE_SIZE: int = 20
+    GRAPHQL_MAX_PAGE_SIZE: int = 100
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = 256
+    GRAPHQL_PERSISTED_QUERY_TTL: int = 7 * 86400
+
+    MEDIA_ROOT: Path = BASE_DIR / "media"
+    AVATAR_MAX_SIZE: int = 5 * 1024 * 1024
+    AVATAR_SIZES: str = "64,256"
+    AVATAR_PROCESS_WORKERS: int = 2
+    MEDIA_ACCEL_REDIRECT: str = ""
 
     PRIVATE_KEY_PATH: Path = BASE_DIR / "certs" / "jwt-private.pem"
     PUBLIC_KEY_PATH: Path = BASE_DIR / "certs" / "jwt-public.pem"
     ALGORITHM: str
     COOKIE_ACCESS_TOKEN_KEY: str
     COOKIE_REFRESH_TOKEN_KEY: str
+    COOKIE_READ_PRIMARY_KEY: str = "read-primary"
 
     ACCESS_TOKEN_EXPIRES_IN: int
     REFRESH_TOKEN_EXPIRES_IN: int
@@ -40,6 +109,13 @@ class Settings(BaseSettings):
 
     CLIENT_HOST: str
     SERVER_HOST: str
+    SERVER_WORKERS: int = 0
+    SERVER_MAX_REQUESTS: int = 0
+
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_SIZE: int = 32 * 1024 * 1024
 
     class Config:
         env_file = ".env"
@@ -59,6 +135,43 @@ class Settings(BaseSettings):
 
         return self.db_url_postgresql
 
+    @property
+    def db_replica_urls(self) -> list[str]:
+        """Создание url для реплик БД из списка хостов вида host:port через запятую."""
+        return [
+            (f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}"
+             f"@{host.strip()}/{self.DB_NAME}")
+            for host in self.DB_REPLICA_HOSTS.split(",") if host.strip()
+        ]
+
+    @property
+    def server_workers(self) -> int:
+        """
+        Число процессов, между которыми делится DB_MAX_CONNECTIONS.
+        gunicorn.conf.py выставляет SERVER_WORKERS в окружении до импорта настроек
+        воркерами, при запуске одним процессом (uvicorn, тесты, скрипты) - 1.
+        """
+        return self.SERVER_WORKERS or 1
+
+    @property
+    def db_pool_limits(self) -> tuple[int, int]:
+        """
+        Размер пула и переполнения для одного процесса.
+        Соединения всех процессов вместе не превышают DB_MAX_CONNECTIONS.
+        """
+        per_worker = self.DB_MAX_CONNECTIONS // self.server_workers
+        if per_worker < 1:
+            raise ValueError(
+                f"{self.server_workers} workers do not fit into DB_MAX_CONNECTIONS={self.DB_MAX_CONNECTIONS}",
+            )
+        pool_size = min(self.DB_POOL_SIZE, per_worker)
+        return pool_size, min(self.DB_MAX_OVERFLOW, per_worker - pool_size)
+
+    @property
+    def avatar_sizes(self) -> tuple[int, ...]:
+        """Размеры миниатюр аватара из списка через запятую, по возрастанию."""
+        return tuple(sorted(int(size) for size in self.AVATAR_SIZES.split(",") if size.strip()))
+
     @property
     def db_url_redis(self) -> str:
         """Product db url."""
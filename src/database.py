@@ -1,17 +1,69 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
 from collections.abc import AsyncGenerator
 
-from sqlalchemy import NullPool
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from fastapi import Request
+from sqlalchemy import Connection, NullPool, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.config import settings
+from src.deadlines import DeadlineExceededError, remaining_budget
+from src.slow_queries import slow_query_log
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(settings.db_url_postgresql, echo=False, poolclass=NullPool)
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def pgbouncer_connect_args() -> dict:
+    """
+    Параметры asyncpg для работы через PgBouncer в режиме пула транзакций.
+    Соседние транзакции могут попасть на разные соединения c сервером, поэтому
+    подготовленные запросы не кэшируются между ними и получают уникальные имена.
+    Кэш скомпилированных запросов SQLAlchemy (query_cache_size) при этом сохраняется.
+    """
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": _prepared_statement_name,
+    }
+
+
+def create_db_engine(url: str, pgbouncer: bool = settings.DB_PGBOUNCER) -> AsyncEngine:
+    options = {
+        "echo": False,
+        "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+        "connect_args": pgbouncer_connect_args() if pgbouncer else {},
+    }
+    if not settings.DB_POOL_SIZE:
+        db_engine = create_async_engine(url, poolclass=NullPool, **options)
+    else:
+        pool_size, max_overflow = settings.db_pool_limits
+        db_engine = create_async_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            **options,
+        )
+    slow_query_log.attach(db_engine)
+    return db_engine
+
+
+engine = create_db_engine(settings.db_url_postgresql)
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -19,6 +71,138 @@ async_session_maker = async_sessionmaker(
 )
 
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+def _limit_statements(session: AsyncSession, request: Request) -> None:
+    """
+    Ограничение запросов сессии бюджетом маршрута (RouteDeadline): в начале каждой
+    транзакции SET LOCAL statement_timeout по оставшемуся времени. SET LOCAL действует
+    до конца транзакции, поэтому совместим c пулом транзакций PgBouncer.
+    """
+    if remaining_budget(request) is None:
+        return
+
+    @event.listens_for(session.sync_session, "after_begin")
+    def set_statement_timeout(_session: Session, _transaction: SessionTransaction, connection: Connection) -> None:
+        if (remaining := remaining_budget(request)) <= 0:
+            raise DeadlineExceededError
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}")
+
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
+        _limit_statements(session, request)
         yield session
+
+
+"""Отставание реплики в секундах, 0 - если все полученные изменения уже применены."""
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END",
+)
+
+
+class ReplicaRouter:
+    """
+    Распределение читающих запросов по репликам БД.
+    Реплики выбираются по кругу среди здоровых; если здоровых нет
+    или реплики не настроены, запрос идет в основную БД.
+    """
+
+    def __init__(self, engines: list[AsyncEngine]) -> None:
+        self.engines = engines
+        self.healthy = list(engines)
+        self._counter = itertools.count()
+        self._health_task: asyncio.Task | None = None
+
+    def choose(self) -> AsyncEngine:
+        if not (healthy := self.healthy):
+            return engine
+        return healthy[next(self._counter) % len(healthy)]
+
+    @staticmethod
+    async def _get_lag(replica: AsyncEngine) -> float:
+        async with replica.connect() as connection:
+            return (await connection.execute(REPLICA_LAG_QUERY)).scalar_one()
+
+    async def _is_healthy(self, replica: AsyncEngine) -> bool:
+        try:
+            lag = await asyncio.wait_for(self._get_lag(replica), settings.DB_REPLICA_HEALTH_CHECK_INTERVAL)
+        except Exception:  # noqa: BLE001
+            logger.warning("replica %s is unavailable", replica.url.host, exc_info=True)
+            return False
+        if lag > settings.DB_REPLICA_MAX_LAG:
+            logger.warning("replica %s lags behind by %.1fs", replica.url.host, lag)
+            return False
+        return True
+
+    async def check_health(self) -> None:
+        results = await asyncio.gather(*(self._is_healthy(replica) for replica in self.engines))
+        self.healthy = [replica for replica, is_healthy in zip(self.engines, results) if is_healthy]
+
+    async def _run_health_checks(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_CHECK_INTERVAL)
+            await self.check_health()
+
+    async def start(self) -> None:
+        """Первичная проверка реплик и запуск периодических проверок."""
+        if not self.engines:
+            return
+        await self.check_health()
+        self._health_task = asyncio.create_task(self._run_health_checks())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replica_router = ReplicaRouter([create_db_engine(url) for url in settings.db_replica_urls])
+
+
+def _reads_from_primary(request: Request) -> bool:
+    """Пользователь недавно изменял данные и должен видеть свои изменения."""
+    try:
+        return float(request.cookies.get(settings.COOKIE_READ_PRIMARY_KEY, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для эндпоинтов, которые только читают данные."""
+    bind = engine if _reads_from_primary(request) else replica_router.choose()
+    async with async_session_maker(bind=bind) as session:
+        _limit_statements(session, request)
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """
+    После успешного изменяющего запроса ставит короткоживущую куку,
+    пока она действует - читающие запросы пользователя идут в основную БД.
+    """
+
+    MUTATING_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] not in self.MUTATING_METHODS
+                or not replica_router.engines):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(raw=message["headers"])
+                window = settings.READ_YOUR_WRITES_SECONDS
+                headers.append(
+                    "set-cookie",
+                    f"{settings.COOKIE_READ_PRIMARY_KEY}={int(time.time()) + window}; "
+                    f"Max-Age={window}; Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
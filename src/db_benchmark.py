@@ -0,0 +1,77 @@
+"""
+Сравнение пропускной способности БД напрямую и через PgBouncer.
+
+Запуск: python -m src.db_benchmark --pgbouncer localhost:6432 [--concurrency 50] [--seconds 10]
+В обоих режимах concurrency задач выполняют горячие запросы приложения,
+каждый в своей транзакции; выводится число транзакций в секунду и задержки.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.database import async_session_maker, create_db_engine
+from src.startup import HOT_QUERIES
+
+
+def _write(line: str = "") -> None:
+    sys.stdout.write(f"{line}\n")
+
+
+async def _worker(engine: AsyncEngine, deadline: float, latencies: list[float]) -> None:
+    index = 0
+    while time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        async with async_session_maker(bind=engine) as session:
+            await session.execute(HOT_QUERIES[index % len(HOT_QUERIES)])
+            await session.commit()
+        latencies.append(time.perf_counter() - started_at)
+        index += 1
+
+
+async def measure(name: str, engine: AsyncEngine, concurrency: int, seconds: float) -> None:
+    """Транзакции в секунду и задержки для одного способа подключения."""
+    latencies: list[float] = []
+    try:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(_worker(engine, deadline, latencies) for _ in range(concurrency)))
+    finally:
+        await engine.dispose()
+    quantiles = statistics.quantiles(latencies, n=100)
+    _write(
+        f"{name:>10}: {len(latencies) / seconds:>9.1f} tx/s, "
+        f"p50 {quantiles[49] * 1000:.2f} ms, p99 {quantiles[98] * 1000:.2f} ms",
+    )
+
+
+async def run(pgbouncer_host: str, concurrency: int, seconds: float) -> None:
+    host, _, port = pgbouncer_host.partition(":")
+    pooled_url = make_url(settings.db_url_postgresql).set(host=host, port=int(port or 6432))
+    _write(f"concurrency {concurrency}, {seconds} s per mode, pool size {settings.db_pool_limits}")
+    await measure("direct", create_db_engine(settings.db_url_postgresql, pgbouncer=False), concurrency, seconds)
+    await measure(
+        "pgbouncer",
+        create_db_engine(pooled_url.render_as_string(hide_password=False), pgbouncer=True),
+        concurrency,
+        seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение пропускной способности БД напрямую и через PgBouncer.")
+    parser.add_argument(
+        "--pgbouncer", default=settings.TEST_PGBOUNCER_HOST or "localhost:6432", help="адрес PgBouncer host:port",
+    )
+    parser.add_argument("--concurrency", type=int, default=50, help="число параллельных задач")
+    parser.add_argument("--seconds", type=float, default=10.0, help="длительность замера для каждого режима, c")
+    args = parser.parse_args()
+    asyncio.run(run(args.pgbouncer, args.concurrency, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
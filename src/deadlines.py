@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import AsyncGenerator
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+"""
+Бюджет времени запроса на работу c БД.
+
+Маршрут подключает RouteDeadline(seconds) в dependencies: сессии запроса в начале
+каждой транзакции получают statement_timeout по оставшемуся бюджету, a обработка
+запроса отменяется, когда бюджет исчерпан или клиент отключился, - вместе c ней
+asyncpg отменяет выполняющийся запрос на сервере.
+"""
+
+QUERY_CANCELED_SQLSTATE = "57014"
+CLIENT_CLOSED_REQUEST = 499
+
+
+class DeadlineExceededError(Exception):
+    """Бюджет времени запроса исчерпан до начала транзакции."""
+
+
+def remaining_budget(request: Request) -> float | None:
+    """Оставшийся бюджет запроса в секундах, None - если у маршрута нет бюджета."""
+    if (deadline := getattr(request.state, "db_deadline", None)) is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class _Canceller:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.reason: str | None = None
+
+    def __call__(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+            self.task.cancel()
+
+
+async def _cancel_on_disconnect(request: Request, cancel: _Canceller) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+    cancel("disconnect")
+
+
+class RouteDeadline:
+    """
+    Бюджет времени маршрута.
+    Только для маршрутов без тела запроса: отключение клиента отслеживается
+    чтением из receive, которое иначе забрало бы тело у эндпоинта.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    async def __call__(self, request: Request) -> AsyncGenerator[None, None]:
+        request.state.db_deadline = time.monotonic() + self.seconds
+        cancel = _Canceller(asyncio.current_task())
+        timer = asyncio.get_running_loop().call_later(self.seconds, cancel, "deadline")
+        watcher = asyncio.create_task(_cancel_on_disconnect(request, cancel))
+        try:
+            yield
+        except asyncio.CancelledError:
+            if cancel.reason is None:
+                raise
+            if sys.version_info >= (3, 11):
+                cancel.task.uncancel()
+            if cancel.reason == "deadline":
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="request deadline exceeded",
+                ) from None
+            logger.info("%s %s cancelled: client disconnected", request.method, request.url.path)
+            raise HTTPException(
+                status_code=CLIENT_CLOSED_REQUEST,
+                detail="client closed request",
+            ) from None
+        finally:
+            timer.cancel()
+            watcher.cancel()
+
+
+async def deadline_exceeded_handler(_: Request, __: DeadlineExceededError) -> JSONResponse:
+    return JSONResponse({"detail": "request deadline exceeded"}, status_code=status.HTTP_504_GATEWAY_TIMEOUT)
+
+
+async def query_canceled_handler(request: Request, exc: DBAPIError) -> JSONResponse:
+    """Запрос отменен сервером по statement_timeout - 504, остальные ошибки БД не обрабатываются."""
+    if getattr(exc.orig, "sqlstate", None) != QUERY_CANCELED_SQLSTATE:
+        raise exc
+    logger.warning("%s %s: statement timeout", request.method, request.url.path)
+    return JSONResponse({"detail": "request deadline exceeded"}, status_code=status.HTTP_504_GATEWAY_TIMEOUT)
+
+
+async def pool_timeout_handler(request: Request, _: PoolTimeoutError) -> JSONResponse:
+    """Нет свободного соединения c БД за DB_POOL_TIMEOUT - 503, клиент может повторить запрос."""
+    logger.warning("%s %s: database pool exhausted", request.method, request.url.path)
+    return JSONResponse(
+        {"detail": "database is busy"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
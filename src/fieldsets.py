@@ -0,0 +1,36 @@
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def fieldset(schema: type[BaseModel]) -> Callable[..., tuple[str, ...] | None]:
+    """
+    Зависимость для параметра fields=id,title,team_city.
+    Возвращает выбранные поля схемы в порядке запроса или None, если параметр не передан.
+    """
+    allowed = set(schema.model_fields)
+    description = f"Поля ответа через запятую: {', '.join(schema.model_fields)}"
+
+    def dependency(
+        fields: Annotated[str | None, Query(description=description)] = None,
+    ) -> tuple[str, ...] | None:
+        if fields is None:
+            return None
+        selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        if not selected or (unknown := set(selected) - allowed):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"unknown fields: {', '.join(sorted(unknown))}" if selected else "no fields selected",
+            )
+        return selected
+
+    return dependency
+
+
+def fields_response(content: Any) -> JSONResponse:
+    """Ответ c выбранными полями: сериализуется как есть, без полной схемы ответа."""
+    return JSONResponse(jsonable_encoder(content))
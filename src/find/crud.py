@@ -1,66 +1,80 @@
+import datetime
+import logging
 import uuid
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, delete, insert, select
+from sqlalchemy import Select, and_, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.auth.models import AuthUser
 from src.auth.schemas import ResponseSchema, UserSchema
-from src.find.schemas import JoinDataSchema
-from src.team.models import Team, TeamTags, application_to_join_table, team_members_table
+from src.find.models import TeamPreview
+from src.find.schemas import JoinDataSchema, TeamBatchSchema, TeamPreviewSchema
+from src.notifications.schemas import EventType
+from src.notifications.utils import publish_event
+from src.team.models import Team, application_to_join_table, team_members_table
 from src.team.schemas import TeamSchema, TeamTagsSchema
 
+logger = logging.getLogger(__name__)
 
-async def get_teams_list(
-    session: AsyncSession,
-) -> list[TeamSchema]:
-    """Получение списка всех имеющихся команд."""
-    query = (select(Team)
-             .options(selectinload(Team.members)))
-    result = await session.execute(query)
-    teams = result.scalars().all()
+"""Колонки для выборочных полей (fields=) списка и данных команд."""
+TEAM_PREVIEW_COLUMNS = {
+    "id": TeamPreview.team_id,
+    "owner": TeamPreview.owner,
+    "owner_name": TeamPreview.owner_username,
+    "title": TeamPreview.title,
+    "type_team": TeamPreview.type_team,
+    "team_city": TeamPreview.team_city,
+    "number_of_members": TeamPreview.number_of_members,
+    "member_count": TeamPreview.member_count,
+    "team_deadline_at": TeamPreview.team_deadline_at,
+    "tags": TeamPreview.tags,
+}
+TEAM_COLUMNS = {
+    "id": Team.id,
+    "owner": Team.owner,
+    "owner_name": TeamPreview.owner_username,
+    "title": Team.title,
+    "type_team": Team.type_team,
+    "number_of_members": Team.number_of_members,
+    "team_description": Team.team_description,
+    "team_deadline_at": Team.team_deadline_at,
+    "team_city": Team.team_city,
+    "created_at": Team.created_at,
+    "updated_at": Team.updated_at,
+    "tags": TeamPreview.tags,
+}
 
-    for team in teams:
-        query_for_tags = (
-            select(TeamTags)
-            .where(TeamTags.team_id == team.id)
-        )
-        res = await session.execute(query_for_tags)
-        team_tags = res.unique().scalar_one_or_none()
-        team.tags = team_tags
-    return teams
 
+def tags_from_array(tags: list[str | None]) -> TeamTagsSchema:
+    """Преобразование массива тегов из team_preview в схему тегов."""
+    tags_data = dict.fromkeys(TeamTagsSchema.model_fields)
+    tags_data.update(zip(TeamTagsSchema.model_fields, tags))
+    return TeamTagsSchema(**tags_data)
 
-async def get_team_data(
-    team_id: uuid.UUID,
-    session: AsyncSession,
-) -> TeamSchema | None:
-    """Получение данных команды."""
-    query_team = (
-        select(Team)
-        .options(selectinload(Team.members))
-        .where(Team.id == team_id)
-    )
-    result_team_data = (await session.execute(query_team)).unique().scalar_one_or_none()
-    if not result_team_data:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="there is no such team",
-        ) from None
-    query_tags = (select(TeamTags).where(TeamTags.team_id == team_id))
-    result_tags = (await session.execute(query_tags)).unique().scalar_one_or_none()
-    tags = TeamTagsSchema(
-        tag1=result_tags.tag1,
-        tag2=result_tags.tag2,
-        tag3=result_tags.tag3,
-        tag4=result_tags.tag4,
-        tag5=result_tags.tag5,
-        tag6=result_tags.tag6,
-        tag7=result_tags.tag7,
+
+def build_team_preview(preview: TeamPreview) -> TeamPreviewSchema:
+    return TeamPreviewSchema(
+        id=preview.team_id,
+        owner=preview.owner,
+        owner_name=preview.owner_username,
+        title=preview.title,
+        type_team=preview.type_team,
+        team_city=preview.team_city,
+        number_of_members=preview.number_of_members,
+        member_count=preview.member_count,
+        team_deadline_at=preview.team_deadline_at,
+        tags=tags_from_array(preview.tags),
     )
-    query_owner_name = (select(AuthUser).where(AuthUser.id == result_team_data.owner))
-    result_owner_name = (await session.execute(query_owner_name)).unique().scalar_one_or_none()
+
+
+def build_team(
+    result_team_data: Team,
+    owner_name: str,
+    tags: list[str | None],
+) -> TeamSchema:
+    """Сборка данных команды из строки запроса c именем владельца и тегами из team_preview."""
     members = []
     for user_auth_data in result_team_data.members:
         new_data = UserSchema(
@@ -73,7 +87,7 @@ async def get_team_data(
     return TeamSchema(
         id=result_team_data.id,
         owner=result_team_data.owner,
-        owner_name=result_owner_name.username,
+        owner_name=owner_name,
         title=result_team_data.title,
         type_team=result_team_data.type_team,
         number_of_members=result_team_data.number_of_members,
@@ -83,10 +97,139 @@ async def get_team_data(
         created_at=result_team_data.created_at,
         updated_at=result_team_data.updated_at,
         members=members,
-        tags=tags,
+        tags=tags_from_array(tags),
+    )
+
+
+async def get_teams_list(
+    session: AsyncSession,
+) -> list[TeamPreviewSchema]:
+    """Получение списка всех активных команд."""
+    query = (
+        select(TeamPreview)
+        .where(TeamPreview.team_deadline_at >= datetime.date.today())
+        .order_by(TeamPreview.team_deadline_at, TeamPreview.team_id)
+    )
+    result = await session.execute(query)
+    return [build_team_preview(preview) for preview in result.scalars()]
+
+
+def team_fields_row(fields: tuple[str, ...], row: tuple) -> dict:
+    """Строка запроса c выбранными колонками в виде словаря ответа."""
+    data = dict(zip(fields, row))
+    if "tags" in data:
+        data["tags"] = tags_from_array(data["tags"])
+    return data
+
+
+async def get_teams_list_fields(
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> list[dict]:
+    """Список активных команд только c выбранными полями: запрос читает только их колонки."""
+    query = (
+        select(*(TEAM_PREVIEW_COLUMNS[field] for field in fields))
+        .where(TeamPreview.team_deadline_at >= datetime.date.today())
+        .order_by(TeamPreview.team_deadline_at, TeamPreview.team_id)
+    )
+    result = await session.execute(query)
+    return [team_fields_row(fields, row) for row in result]
+
+
+def _teams_query(team_ids: list[uuid.UUID]) -> Select:
+    """Команды c участниками, именем владельца и тегами: два запроса при любом числе команд."""
+    return (
+        select(Team, TeamPreview.owner_username, TeamPreview.tags)
+        .join(TeamPreview, TeamPreview.team_id == Team.id)
+        .options(selectinload(Team.members))
+        .where(Team.id.in_(team_ids))
+    )
+
+
+async def get_team_data(
+    team_id: uuid.UUID,
+    session: AsyncSession,
+) -> TeamSchema | None:
+    """Получение данных команды."""
+    if not (row := (await session.execute(_teams_query([team_id]))).one_or_none()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="there is no such team",
+        ) from None
+    return build_team(*row)
+
+
+async def get_teams_data(
+    team_ids: list[uuid.UUID],
+    session: AsyncSession,
+) -> TeamBatchSchema:
+    """Получение данных нескольких команд, отсутствующие команды перечисляются в missing."""
+    result = await session.execute(_teams_query(team_ids))
+    teams = {team.id: team for team in (build_team(*row) for row in result)}
+    return TeamBatchSchema(
+        teams=[teams[team_id] for team_id in team_ids if team_id in teams],
+        missing=[team_id for team_id in team_ids if team_id not in teams],
     )
 
 
+async def _get_teams_fields(
+    team_ids: list[uuid.UUID],
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> dict[uuid.UUID, dict]:
+    """
+    Данные команд c выбранными полями.
+    team_preview присоединяется только для owner_name и tags,
+    участники читаются отдельным запросом только для members.
+    """
+    columns = tuple(field for field in fields if field != "members")
+    query = select(Team.id, *(TEAM_COLUMNS[field] for field in columns)).where(Team.id.in_(team_ids))
+    if {"owner_name", "tags"} & set(columns):
+        query = query.join(TeamPreview, TeamPreview.team_id == Team.id)
+    result = await session.execute(query)
+    teams = {row[0]: team_fields_row(columns, row[1:]) for row in result}
+    if "members" in fields and teams:
+        for team in teams.values():
+            team["members"] = []
+        query = (
+            select(team_members_table.c.team_id, AuthUser.id, AuthUser.username, AuthUser.email, AuthUser.verified)
+            .join(AuthUser, AuthUser.id == team_members_table.c.user_id)
+            .where(team_members_table.c.team_id.in_(teams))
+        )
+        for team_id, user_id, username, email, verified in await session.execute(query):
+            teams[team_id]["members"].append(
+                UserSchema(id=user_id, username=username, email=email, verified=verified),
+            )
+    return {team_id: {field: team[field] for field in fields} for team_id, team in teams.items()}
+
+
+async def get_team_data_fields(
+    team_id: uuid.UUID,
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> dict:
+    """Получение выбранных полей команды."""
+    if (team := (await _get_teams_fields([team_id], fields, session)).get(team_id)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="there is no such team",
+        ) from None
+    return team
+
+
+async def get_teams_data_fields(
+    team_ids: list[uuid.UUID],
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> dict:
+    """Получение выбранных полей нескольких команд, отсутствующие команды перечисляются в missing."""
+    teams = await _get_teams_fields(team_ids, fields, session)
+    return {
+        "teams": [teams[team_id] for team_id in team_ids if team_id in teams],
+        "missing": [team_id for team_id in team_ids if team_id not in teams],
+    }
+
+
 async def join_in_team(
     join_data: JoinDataSchema,
     user: UserSchema,
@@ -94,22 +237,30 @@ async def join_in_team(
 ) -> ResponseSchema:
     """Подать заявку на вступление в команду."""
     try:
+        team_id = uuid.UUID(str(join_data.team_id))
         stmt = insert(application_to_join_table).values(
             {"user_id": user.id,
-             "team_id": uuid.UUID(join_data.team_id),
+             "team_id": team_id,
              "cover_letter": join_data.cover_letter},
         )
         await session.execute(stmt)
         await session.commit()
-        return ResponseSchema(
-            status_code=status.HTTP_200_OK,
-            detail="your application has been submitted",
-        )
     except Exception:  # noqa: BLE001
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="invalid data",
         ) from None
+    """Заявка уже сохранена: ошибка уведомления владельца не должна менять ответ."""
+    try:
+        owner_id = (await session.execute(select(TeamPreview.owner).where(TeamPreview.team_id == team_id))).scalar_one()
+    except Exception:  # noqa: BLE001
+        logger.warning("could not find owner of team %s to notify", team_id, exc_info=True)
+    else:
+        await publish_event(owner_id, EventType.APPLICATION_CREATED, team_id, user.id)
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        detail="your application has been submitted",
+    )
 
 
 async def leave_team(
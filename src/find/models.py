@@ -0,0 +1,113 @@
+import datetime
+import uuid
+
+from sqlalchemy import DDL, ForeignKey, Index, String, event
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class TeamPreview(Base):
+    """
+    Денормализованная модель для списков команд.
+    Строки поддерживаются триггерами БД при изменении команды, ее тегов,
+    участников и имени владельца, поэтому список читается из одной узкой таблицы.
+    """
+    __tablename__ = "team_preview"
+
+    team_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("team.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    owner: Mapped[uuid.UUID] = mapped_column(nullable=False, index=True)
+    owner_username: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    title: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    type_team: Mapped[str] = mapped_column(nullable=False)
+    team_city: Mapped[str] = mapped_column(nullable=False)
+    number_of_members: Mapped[int] = mapped_column(nullable=False)
+    team_deadline_at: Mapped[datetime.date] = mapped_column(nullable=False)
+    tags: Mapped[list[str | None]] = mapped_column(ARRAY(String(length=50)), nullable=False, default=list)
+    member_count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_team_preview_deadline", "team_deadline_at", "team_id"),
+    )
+
+
+TEAM_PREVIEW_TRIGGERS = (
+    """
+    CREATE OR REPLACE FUNCTION team_preview_sync_team() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO team_preview (team_id, owner, owner_username, title, type_team, team_city,
+                                  number_of_members, team_deadline_at, tags, member_count)
+        VALUES (NEW.id, NEW.owner, (SELECT username FROM auth_user WHERE id = NEW.owner), NEW.title,
+                NEW.type_team, NEW.team_city, NEW.number_of_members, NEW.team_deadline_at, '{}', 0)
+        ON CONFLICT (team_id) DO UPDATE SET
+            owner = EXCLUDED.owner,
+            owner_username = EXCLUDED.owner_username,
+            title = EXCLUDED.title,
+            type_team = EXCLUDED.type_team,
+            team_city = EXCLUDED.team_city,
+            number_of_members = EXCLUDED.number_of_members,
+            team_deadline_at = EXCLUDED.team_deadline_at;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER team_preview_sync_team
+    AFTER INSERT OR UPDATE ON team
+    FOR EACH ROW EXECUTE FUNCTION team_preview_sync_team()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION team_preview_sync_tags() RETURNS trigger AS $$
+    BEGIN
+        UPDATE team_preview
+        SET tags = ARRAY[NEW.tag1, NEW.tag2, NEW.tag3, NEW.tag4, NEW.tag5, NEW.tag6, NEW.tag7]
+        WHERE team_id = NEW.team_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER team_preview_sync_tags
+    AFTER INSERT OR UPDATE ON team_tags
+    FOR EACH ROW EXECUTE FUNCTION team_preview_sync_tags()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION team_preview_sync_members() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE team_preview SET member_count = member_count + 1 WHERE team_id = NEW.team_id;
+        ELSE
+            UPDATE team_preview SET member_count = member_count - 1 WHERE team_id = OLD.team_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER team_preview_sync_members
+    AFTER INSERT OR DELETE ON team_members
+    FOR EACH ROW EXECUTE FUNCTION team_preview_sync_members()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION team_preview_sync_owner() RETURNS trigger AS $$
+    BEGIN
+        UPDATE team_preview SET owner_username = NEW.username WHERE owner = NEW.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER team_preview_sync_owner
+    AFTER UPDATE OF username ON auth_user
+    FOR EACH ROW WHEN (OLD.username IS DISTINCT FROM NEW.username)
+    EXECUTE FUNCTION team_preview_sync_owner()
+    """,
+)
+
+"""Триггеры создаются и при Base.metadata.create_all (тестовая БД), в рабочей БД - миграцией."""
+for statement in TEAM_PREVIEW_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(statement))
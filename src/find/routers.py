@@ -1,20 +1,26 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.auth_handler import current_user
 from src.auth.schemas import ResponseSchema, UserSchema
-from src.database import get_async_session
+from src.config import settings
+from src.database import get_async_session, get_read_async_session
+from src.deadlines import RouteDeadline
+from src.fieldsets import fields_response, fieldset
 from src.find import crud
-from src.find.schemas import JoinDataSchema, TeamPreviewSchema
+from src.find.schemas import JoinDataSchema, TeamBatchSchema, TeamPreviewSchema
+from src.idempotency import IdempotentRequest, idempotency
 from src.team.schemas import TeamSchema
 
 find_router = APIRouter(
     prefix="/find",
     tags=["Find"],
 )
+find_deadline = RouteDeadline(settings.DEADLINE_FIND_SECONDS)
 
 """
 Логика для пользователей.
@@ -26,25 +32,63 @@ a также взаимодействие пользователя c коман
 
 @find_router.get(
     "/teams_list",
+    dependencies=[Depends(find_deadline)],
+    response_model=list[TeamPreviewSchema],
     status_code=status.HTTP_200_OK,
 )
 async def get_all_teams(
-    session: Annotated[AsyncSession, Depends(get_async_session)],
-) -> list[TeamPreviewSchema]:
-    """Получить список всех доступных команд."""
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    fields: Annotated[tuple[str, ...] | None, Depends(fieldset(TeamPreviewSchema))],
+) -> list[TeamPreviewSchema] | JSONResponse:
+    """
+    Получить список всех доступных команд.
+    C fields=id,title,team_city возвращаются только перечисленные поля.
+    """
+    if fields:
+        return fields_response(await crud.get_teams_list_fields(fields, session))
     return await crud.get_teams_list(session)
 
 
+@find_router.get(
+    "/teams",
+    dependencies=[Depends(find_deadline)],
+    response_model=TeamBatchSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_teams(
+    _: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    fields: Annotated[tuple[str, ...] | None, Depends(fieldset(TeamSchema))],
+    ids: Annotated[list[uuid.UUID] | None, Query(max_length=settings.BATCH_MAX_IDS)] = None,
+) -> TeamBatchSchema | JSONResponse:
+    """
+    Данные нескольких команд за один запрос: /find/teams?ids=<id>&ids=<id>.
+    Команды, которых нет, перечисляются в missing.
+    """
+    team_ids = list(dict.fromkeys(ids or []))
+    if fields:
+        return fields_response(await crud.get_teams_data_fields(team_ids, fields, session))
+    return await crud.get_teams_data(team_ids, session)
+
+
 @find_router.get(
     "/team/{team_id}",
+    dependencies=[Depends(find_deadline)],
+    response_model=TeamSchema,
     status_code=status.HTTP_200_OK,
 )
 async def get_team(
     team_id: uuid.UUID,
     _: Annotated[UserSchema, Depends(current_user)],
-    session: Annotated[AsyncSession, Depends(get_async_session)],
-) -> TeamSchema:
-    """Посмотреть данные o команде подробнее."""
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    fields: Annotated[tuple[str, ...] | None, Depends(fieldset(TeamSchema))],
+) -> TeamSchema | JSONResponse:
+    """
+    Посмотреть данные o команде подробнее.
+    Участники (members) c их email читаются, только если они запрошены или fields не передан.
+    """
+    if fields:
+        return fields_response(await crud.get_team_data_fields(team_id, fields, session))
     return await crud.get_team_data(team_id, session)
 
 
@@ -57,9 +101,10 @@ async def join_team(
     join_data: JoinDataSchema,
     user: Annotated[UserSchema, Depends(current_user)],
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    idempotent: Annotated[IdempotentRequest, Depends(idempotency)],
 ) -> ResponseSchema:
     """Присоединиться к команде."""
-    return await crud.join_in_team(join_data, user, session)
+    return await idempotent.save(await crud.join_in_team(join_data, user, session))
 
 
 @find_router.post(
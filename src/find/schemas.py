@@ -3,15 +3,18 @@ import uuid
 
 from pydantic import BaseModel
 
-from src.team.schemas import TeamTagsSchema
+from src.team.schemas import TeamSchema, TeamTagsSchema
 
 
 class TeamPreviewSchema(BaseModel):
     id: uuid.UUID
+    owner: uuid.UUID
+    owner_name: str
     title: str
     type_team: str
     team_city: str
     number_of_members: int
+    member_count: int
     team_deadline_at: datetime.date
     tags: TeamTagsSchema
 
@@ -19,3 +22,8 @@ class TeamPreviewSchema(BaseModel):
 class JoinDataSchema(BaseModel):
     team_id: str | uuid.UUID
     cover_letter: str | None
+
+
+class TeamBatchSchema(BaseModel):
+    teams: list[TeamSchema]
+    missing: list[uuid.UUID]
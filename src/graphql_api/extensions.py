@@ -0,0 +1,90 @@
+from typing import Any
+
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+)
+
+from src.config import settings
+
+
+class QueryComplexityRule(ValidationRule):
+    """
+    Ограничение сложности запроса.
+    Каждое поле стоит 1, поле-список умножает стоимость своих вложенных полей
+    на GRAPHQL_LIST_COST, a список c аргументом first - на размер страницы:
+    так оценивается число строк, которые придется прочитать.
+    """
+
+    def enter_operation_definition(self, node: OperationDefinitionNode, *_: Any) -> None:
+        root_type = self.context.schema.get_root_type(node.operation)
+        fragments = {
+            definition.name.value: definition
+            for definition in self.context.document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        complexity = self._complexity(node.selection_set, root_type, fragments, frozenset())
+        if complexity > settings.GRAPHQL_MAX_COMPLEXITY:
+            self.report_error(GraphQLError(
+                f"Query complexity {complexity} exceeds maximum {settings.GRAPHQL_MAX_COMPLEXITY}",
+                node,
+            ))
+
+    def _complexity(
+        self,
+        selection_set: SelectionSetNode | None,
+        parent_type: Any,
+        fragments: dict[str, FragmentDefinitionNode],
+        visited: frozenset[str],
+    ) -> int:
+        if selection_set is None or parent_type is None:
+            return 0
+        total = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field = getattr(parent_type, "fields", {}).get(selection.name.value)
+                if field is None:
+                    continue
+                field_type, is_list = field.type, False
+                while isinstance(field_type, (GraphQLNonNull, GraphQLList)):
+                    is_list = is_list or isinstance(field_type, GraphQLList)
+                    field_type = field_type.of_type
+                nested = self._complexity(selection.selection_set, field_type, fragments, visited)
+                total += 1 + nested * (self._list_size(selection, field) if is_list else 1)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in visited or (fragment := fragments.get(name)) is None:
+                    continue
+                fragment_type = self.context.schema.get_type(fragment.type_condition.name.value)
+                total += self._complexity(fragment.selection_set, fragment_type, fragments, visited | {name})
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    self.context.schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition else parent_type
+                )
+                total += self._complexity(selection.selection_set, fragment_type, fragments, visited)
+        return total
+
+    @staticmethod
+    def _list_size(selection: FieldNode, field: GraphQLField) -> int:
+        """Размер страницы из аргумента first, для переменной - наибольший допустимый."""
+        if (first := field.args.get("first")) is None:
+            return settings.GRAPHQL_LIST_COST
+        for argument in selection.arguments:
+            if argument.name.value == "first":
+                if isinstance(argument.value, IntValueNode):
+                    return int(argument.value.value)
+                return settings.GRAPHQL_MAX_PAGE_SIZE
+        if isinstance(first.default_value, int):
+            return first.default_value
+        return settings.GRAPHQL_MAX_PAGE_SIZE
@@ -0,0 +1,75 @@
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import AuthUser
+from src.loaders import DataLoader, Loaders
+from src.team.models import Team, application_to_join_table, team_members_table
+from src.user_profile.models import UserContacts, UserHobbies, UserProfile
+
+
+class GraphQLLoaders(Loaders):
+    """
+    Загрузчики для резолверов GraphQL.
+    Кроме пользователей, команд и тегов загружают профили, участников,
+    заявки и команды пользователей - каждое поле запроса одним IN-запросом.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session)
+        self.profiles: DataLoader[uuid.UUID, UserProfile] = DataLoader(self._load_profiles)
+        self.contacts: DataLoader[uuid.UUID, UserContacts] = DataLoader(self._load_contacts)
+        self.hobbies: DataLoader[uuid.UUID, UserHobbies] = DataLoader(self._load_hobbies)
+        self.members: DataLoader[uuid.UUID, list[AuthUser]] = DataLoader(self._load_members)
+        self.applications: DataLoader[uuid.UUID, list] = DataLoader(self._load_applications)
+        self.owned_teams: DataLoader[uuid.UUID, list[Team]] = DataLoader(self._load_owned_teams)
+        self.member_teams: DataLoader[uuid.UUID, list[Team]] = DataLoader(self._load_member_teams)
+
+    async def _load_profiles(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, UserProfile]:
+        result = await self.execute(select(UserProfile).where(UserProfile.user_id.in_(user_ids)))
+        return {profile.user_id: profile for profile in result.scalars()}
+
+    async def _load_contacts(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, UserContacts]:
+        result = await self.execute(select(UserContacts).where(UserContacts.user_id.in_(user_ids)))
+        return {contacts.user_id: contacts for contacts in result.scalars()}
+
+    async def _load_hobbies(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, UserHobbies]:
+        result = await self.execute(select(UserHobbies).where(UserHobbies.user_id.in_(user_ids)))
+        return {hobbies.user_id: hobbies for hobbies in result.scalars()}
+
+    async def _load_members(self, team_ids: list[uuid.UUID]) -> dict[uuid.UUID, list[AuthUser]]:
+        query = (
+            select(team_members_table.c.team_id, AuthUser)
+            .join(AuthUser, AuthUser.id == team_members_table.c.user_id)
+            .where(team_members_table.c.team_id.in_(team_ids))
+        )
+        members = defaultdict(list)
+        for team_id, user in await self.execute(query):
+            members[team_id].append(user)
+        return members
+
+    async def _load_applications(self, team_ids: list[uuid.UUID]) -> dict[uuid.UUID, list]:
+        query = select(application_to_join_table).where(application_to_join_table.c.team_id.in_(team_ids))
+        applications = defaultdict(list)
+        for application in await self.execute(query):
+            applications[application.team_id].append(application)
+        return applications
+
+    async def _load_owned_teams(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, list[Team]]:
+        teams = defaultdict(list)
+        for team in (await self.execute(select(Team).where(Team.owner.in_(user_ids)))).scalars():
+            teams[team.owner].append(team)
+        return teams
+
+    async def _load_member_teams(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, list[Team]]:
+        query = (
+            select(team_members_table.c.user_id, Team)
+            .join(Team, Team.id == team_members_table.c.team_id)
+            .where(team_members_table.c.user_id.in_(user_ids))
+        )
+        teams = defaultdict(list)
+        for user_id, team in await self.execute(query):
+            teams[user_id].append(team)
+        return teams
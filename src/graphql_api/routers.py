@@ -0,0 +1,91 @@
+import hashlib
+from typing import Annotated, Any
+
+from fastapi import Depends
+from graphql import GraphQLError
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+
+from src.auth.auth_handler import current_user
+from src.auth.schemas import UserSchema
+from src.config import settings
+from src.database import get_read_async_session
+from src.graphql_api.loaders import GraphQLLoaders
+from src.graphql_api.schema import GraphQLContext, schema
+from src.redis_client import redis_manager
+
+"""
+Логика GraphQL.
+
+Один запрос отдает экрану ровно те данные, которые он перечислил.
+Поддерживаются сохраненные запросы (Automatic Persisted Queries): клиент
+передает только sha256 текста запроса, полный текст - один раз, если сервер его еще не знает.
+"""
+
+
+class PersistedQueryNotFoundError(Exception):
+    pass
+
+
+async def get_persisted_query(query: str | None, extensions: dict | None) -> str | None:
+    """Текст запроса по хэшу из extensions.persistedQuery, новый запрос сохраняется в Redis."""
+    if not (persisted := (extensions or {}).get("persistedQuery")):
+        return query
+    query_hash = persisted.get("sha256Hash", "")
+    key = f"graphql:persisted:{query_hash}"
+    if query is None:
+        if (query := await redis_manager.client.get(key)) is None:
+            raise PersistedQueryNotFoundError
+        await redis_manager.client.expire(key, settings.GRAPHQL_PERSISTED_QUERY_TTL)
+        return query
+    if hashlib.sha256(query.encode()).hexdigest() != query_hash:
+        raise HTTPException(400, "provided sha does not match query")
+    await redis_manager.client.set(key, query, ex=settings.GRAPHQL_PERSISTED_QUERY_TTL)
+    return query
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """Роутер GraphQL c поддержкой сохраненных запросов, без загрузки файлов и IDE."""
+
+    def should_render_graphql_ide(self, request: Any) -> bool:
+        return False
+
+    async def parse_http_body(self, request: Any) -> GraphQLRequestData:
+        if "application/json" in (request.content_type or ""):
+            data = self.parse_json(await request.get_body())
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+            if isinstance(data.get("extensions"), str):
+                data["extensions"] = self.parse_json(data["extensions"])
+        else:
+            raise HTTPException(400, "Unsupported content type")
+        return GraphQLRequestData(
+            query=await get_persisted_query(data.get("query"), data.get("extensions")),
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+        )
+
+    async def execute_operation(self, request: Any, context: Any, root_value: Any) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFoundError:
+            error = GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+            return ExecutionResult(data=None, errors=[error])
+
+
+async def get_context(
+    user: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+) -> GraphQLContext:
+    return GraphQLContext(user=user, loaders=GraphQLLoaders(session))
+
+
+graphql_router = PersistedQueryRouter(
+    schema,
+    path="/graphql",
+    graphql_ide=None,
+    context_getter=get_context,
+)
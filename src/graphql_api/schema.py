@@ -0,0 +1,228 @@
+import datetime
+import uuid
+
+import strawberry
+from graphql import GraphQLError
+from sqlalchemy import select, tuple_
+from strawberry.extensions import AddValidationRules, ParserCache, QueryDepthLimiter, ValidationCache
+from strawberry.fastapi import BaseContext
+from strawberry.types import Info
+
+from src.auth import models as auth_models
+from src.auth.schemas import UserSchema
+from src.config import settings
+from src.find.models import TeamPreview
+from src.graphql_api.extensions import QueryComplexityRule
+from src.graphql_api.loaders import GraphQLLoaders
+from src.team import models as team_models
+from src.team.schemas import TeamTagsSchema
+from src.user_profile.schemas import UserContactsSchema, UserHobbiesSchema
+
+"""
+Схема GraphQL только для чтения.
+
+Поля связей (профиль, участники, заявки, команды пользователя) загружаются
+через загрузчики запроса, поэтому каждое такое поле - один запрос к БД
+на весь ответ, сколько бы объектов его ни запрашивало.
+"""
+
+
+class GraphQLContext(BaseContext):
+    def __init__(self, user: UserSchema, loaders: GraphQLLoaders) -> None:
+        super().__init__()
+        self.user = user
+        self.loaders = loaders
+
+
+@strawberry.experimental.pydantic.type(model=TeamTagsSchema, all_fields=True)
+class Tags:
+    pass
+
+
+@strawberry.experimental.pydantic.type(model=UserContactsSchema, all_fields=True)
+class Contacts:
+    pass
+
+
+@strawberry.experimental.pydantic.type(model=UserHobbiesSchema, all_fields=True)
+class Hobbies:
+    pass
+
+
+@strawberry.type
+class Profile:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    image_path: str | None
+    description: str
+
+    @strawberry.field
+    async def contacts(self, info: Info[GraphQLContext, None]) -> Contacts | None:
+        if (contacts := await info.context.loaders.contacts.load(self.user_id)) is None:
+            return None
+        return Contacts(**{field: getattr(contacts, field) for field in UserContactsSchema.model_fields})
+
+    @strawberry.field
+    async def hobbies(self, info: Info[GraphQLContext, None]) -> Hobbies | None:
+        if (hobbies := await info.context.loaders.hobbies.load(self.user_id)) is None:
+            return None
+        return Hobbies(**{field: getattr(hobbies, field) for field in UserHobbiesSchema.model_fields})
+
+
+@strawberry.type
+class User:
+    id: uuid.UUID
+    username: str
+    email: str
+    verified: bool
+
+    @classmethod
+    def from_model(cls, user: auth_models.AuthUser) -> "User":
+        return cls(id=user.id, username=user.username, email=user.email, verified=user.verified)
+
+    @strawberry.field
+    async def profile(self, info: Info[GraphQLContext, None]) -> Profile | None:
+        if (profile := await info.context.loaders.profiles.load(self.id)) is None:
+            return None
+        return Profile(
+            id=profile.id,
+            user_id=profile.user_id,
+            image_path=profile.image_path,
+            description=profile.description,
+        )
+
+    @strawberry.field(description="Команды, созданные пользователем.")
+    async def owned_teams(self, info: Info[GraphQLContext, None]) -> list["Team"]:
+        return [Team.from_model(team) for team in await info.context.loaders.owned_teams.load(self.id) or []]
+
+    @strawberry.field(description="Команды, в которых пользователь состоит.")
+    async def teams(self, info: Info[GraphQLContext, None]) -> list["Team"]:
+        return [Team.from_model(team) for team in await info.context.loaders.member_teams.load(self.id) or []]
+
+
+@strawberry.type
+class Application:
+    team_id: uuid.UUID
+    user_id: uuid.UUID
+    cover_letter: str | None
+
+    @strawberry.field
+    async def user(self, info: Info[GraphQLContext, None]) -> User | None:
+        user = await info.context.loaders.users.load(self.user_id)
+        return User.from_model(user) if user else None
+
+
+@strawberry.type
+class Team:
+    id: uuid.UUID
+    owner_id: uuid.UUID
+    title: str
+    type_team: str
+    number_of_members: int
+    team_description: str
+    team_deadline_at: datetime.date
+    team_city: str
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    @classmethod
+    def from_model(cls, team: team_models.Team) -> "Team":
+        return cls(
+            id=team.id,
+            owner_id=team.owner,
+            title=team.title,
+            type_team=team.type_team,
+            number_of_members=team.number_of_members,
+            team_description=team.team_description,
+            team_deadline_at=team.team_deadline_at,
+            team_city=team.team_city,
+            created_at=team.created_at,
+            updated_at=team.updated_at,
+        )
+
+    @strawberry.field
+    async def owner(self, info: Info[GraphQLContext, None]) -> User | None:
+        user = await info.context.loaders.users.load(self.owner_id)
+        return User.from_model(user) if user else None
+
+    @strawberry.field
+    async def tags(self, info: Info[GraphQLContext, None]) -> Tags | None:
+        if (tags := await info.context.loaders.team_tags.load(self.id)) is None:
+            return None
+        return Tags(**{field: getattr(tags, field) for field in TeamTagsSchema.model_fields})
+
+    @strawberry.field
+    async def members(self, info: Info[GraphQLContext, None]) -> list[User]:
+        return [User.from_model(user) for user in await info.context.loaders.members.load(self.id) or []]
+
+    @strawberry.field(description="Заявки на вступление, доступны только владельцу команды.")
+    async def applications(self, info: Info[GraphQLContext, None]) -> list[Application] | None:
+        if self.owner_id != info.context.user.id:
+            return None
+        return [
+            Application(team_id=application.team_id, user_id=application.user_id, cover_letter=application.cover_letter)
+            for application in await info.context.loaders.applications.load(self.id) or []
+        ]
+
+
+@strawberry.type
+class Query:
+    @strawberry.field(description="Текущий пользователь.")
+    async def me(self, info: Info[GraphQLContext, None]) -> User | None:
+        user = await info.context.loaders.users.load(info.context.user.id)
+        return User.from_model(user) if user else None
+
+    @strawberry.field
+    async def user(self, info: Info[GraphQLContext, None], id: uuid.UUID) -> User | None:
+        user = await info.context.loaders.users.load(id)
+        return User.from_model(user) if user else None
+
+    @strawberry.field
+    async def team(self, info: Info[GraphQLContext, None], id: uuid.UUID) -> Team | None:
+        team = await info.context.loaders.teams.load(id)
+        return Team.from_model(team) if team else None
+
+    @strawberry.field(description=f"Команды по списку id, не больше {settings.BATCH_MAX_IDS}.")
+    async def teams(self, info: Info[GraphQLContext, None], ids: list[uuid.UUID]) -> list[Team]:
+        if len(ids) > settings.BATCH_MAX_IDS:
+            raise GraphQLError(f"ids must contain no more than {settings.BATCH_MAX_IDS} items")
+        teams = await info.context.loaders.teams.load_many(list(dict.fromkeys(ids)))
+        return [Team.from_model(team) for team in teams if team]
+
+    @strawberry.field(
+        description=(
+            f"Активные команды по сроку набора, не больше {settings.GRAPHQL_MAX_PAGE_SIZE} за запрос. "
+            "Следующая страница запрашивается c after, равным id последней полученной команды."
+        ),
+    )
+    async def teams_list(
+        self,
+        info: Info[GraphQLContext, None],
+        first: int = settings.GRAPHQL_PAGE_SIZE,
+        after: uuid.UUID | None = None,
+    ) -> list[Team]:
+        if not 1 <= first <= settings.GRAPHQL_MAX_PAGE_SIZE:
+            raise GraphQLError(f"first must be between 1 and {settings.GRAPHQL_MAX_PAGE_SIZE}")
+        query = (
+            select(team_models.Team)
+            .join(TeamPreview, TeamPreview.team_id == team_models.Team.id)
+            .where(TeamPreview.team_deadline_at >= datetime.date.today())
+            .order_by(TeamPreview.team_deadline_at, TeamPreview.team_id)
+            .limit(first)
+        )
+        if after is not None:
+            cursor = select(TeamPreview.team_deadline_at).where(TeamPreview.team_id == after).scalar_subquery()
+            query = query.where(tuple_(TeamPreview.team_deadline_at, TeamPreview.team_id) > tuple_(cursor, after))
+        result = await info.context.loaders.execute(query)
+        return [Team.from_model(team) for team in result.scalars()]
+
+
+schema = strawberry.Schema(
+    query=Query,
+    extensions=[
+        QueryDepthLimiter(max_depth=settings.GRAPHQL_MAX_DEPTH),
+        AddValidationRules([QueryComplexityRule]),
+        ParserCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+    ],
+)
@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import uuid
+from collections.abc import AsyncGenerator
+from typing import Annotated, Any
+
+from fastapi import Header, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from jwt import InvalidTokenError
+
+from src.auth import utils as auth_utils
+from src.config import settings
+from src.redis_client import EXTEND_LOCK_SCRIPT, RELEASE_LOCK_SCRIPT, redis_manager
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotentReplay(Exception):  # noqa: N818
+    """Повтор запроса, ответ на который уже сохранен."""
+
+    def __init__(self, status_code: int, content: Any) -> None:
+        self.status_code = status_code
+        self.content = content
+
+
+async def idempotent_replay_handler(_: Request, exc: IdempotentReplay) -> JSONResponse:
+    return JSONResponse(exc.content, status_code=exc.status_code, headers={"Idempotent-Replayed": "true"})
+
+
+class IdempotentRequest:
+    """
+    Запрос c заголовком Idempotency-Key.
+    Эндпоинт передает результат в save, чтобы повторы получили тот же ответ.
+    """
+
+    def __init__(
+        self,
+        key: str | None = None,
+        status_code: int = status.HTTP_200_OK,
+        fingerprint: str = "",
+        lock: str = "",
+    ) -> None:
+        self.key = key
+        self.status_code = status_code
+        self.fingerprint = fingerprint
+        self.lock = lock
+        self.saved = False
+
+    async def save(self, result: Any) -> Any:
+        if self.key is not None:
+            await self.store(self.status_code, jsonable_encoder(result))
+        return result
+
+    async def store(self, status_code: int, content: Any) -> None:
+        record = {"fingerprint": self.fingerprint, "status_code": status_code, "content": content}
+        await redis_manager.client.set(self.key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL)
+        self.saved = True
+
+    async def release(self) -> None:
+        await redis_manager.script(RELEASE_LOCK_SCRIPT)(keys=[self.key], args=[self.lock])
+
+    async def keep_lock(self) -> None:
+        """Продление блокировки, пока выполняется запрос, чтобы повтор не выполнил его второй раз."""
+        extend = redis_manager.script(EXTEND_LOCK_SCRIPT)
+        try:
+            while True:
+                await asyncio.sleep(settings.IDEMPOTENCY_LOCK_TTL / 3)
+                if not await extend(keys=[self.key], args=[self.lock, settings.IDEMPOTENCY_LOCK_TTL]):
+                    return
+        except Exception:  # noqa: BLE001
+            logger.warning("idempotency lock %s is not extended", self.key, exc_info=True)
+
+
+def _request_user(request: Request) -> str:
+    """Пользователь из access token: ключ не меняется после обновления токена; пустая строка - анонимный запрос."""
+    try:
+        return str(auth_utils.decode_jwt(request.cookies.get(settings.COOKIE_ACCESS_TOKEN_KEY, ""))["sub"])
+    except (InvalidTokenError, KeyError):
+        return ""
+
+
+async def _acquire(key: str, fingerprint: str) -> str:
+    """
+    Захват ключа для выполнения запроса, возвращает значение блокировки.
+    Если запрос c тем же ключом уже выполняется, ожидание его ответа, если ответ сохранен - его повтор.
+    """
+    lock = json.dumps({"fingerprint": fingerprint, "token": uuid.uuid4().hex})
+    deadline = asyncio.get_running_loop().time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while not await redis_manager.client.set(key, lock, nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL):
+        if record := json.loads(await redis_manager.client.get(key) or "null"):
+            if record["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="idempotency key was used with another request",
+                )
+            if "status_code" in record:
+                raise IdempotentReplay(record["status_code"], record["content"])
+        if asyncio.get_running_loop().time() > deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="request with this idempotency key is in progress",
+            )
+        await asyncio.sleep(0.1)
+    return lock
+
+
+async def idempotency(
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
+) -> AsyncGenerator[IdempotentRequest, None]:
+    """
+    Поддержка заголовка Idempotency-Key.
+    Ключ действует в пределах пользователя (sub из access token) или анонимных запросов.
+    Первый ответ хранится в Redis IDEMPOTENCY_TTL секунд и отдается повторам запроса,
+    одновременные повторы ждут завершения первого запроса, а не выполняют его заново:
+    блокировка продлевается, пока запрос выполняется.
+    Ошибки сервера не сохраняются, чтобы запрос можно было повторить.
+    """
+    if idempotency_key is None:
+        yield IdempotentRequest()
+        return
+    scope = "\n".join((request.url.path, _request_user(request), idempotency_key))
+    key = f"idempotency:{hashlib.sha256(scope.encode()).hexdigest()}"
+    fingerprint = hashlib.blake2b(request.url.query.encode() + await request.body(), digest_size=16).hexdigest()
+    lock = await _acquire(key, fingerprint)
+
+    idempotent = IdempotentRequest(key, request.scope["route"].status_code, fingerprint, lock)
+    keeper = asyncio.create_task(idempotent.keep_lock())
+    try:
+        yield idempotent
+    except HTTPException as error:
+        if error.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+            await idempotent.store(error.status_code, {"detail": error.detail})
+        else:
+            await idempotent.release()
+        raise
+    except Exception:
+        await idempotent.release()
+        raise
+    finally:
+        keeper.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await keeper
+    if not idempotent.saved:
+        await idempotent.release()
@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import AuthUser
+from src.team.models import Team, TeamTags
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Загрузчик, объединяющий запросы по ключам.
+
+    Все load, вызванные в одном проходе event loop, выполняются одним запросом
+    batch_load c уникальными ключами, результаты запоминаются до конца запроса.
+    Пока загрузчик выполняет запрос, сессию нельзя использовать параллельно,
+    поэтому обращения к БД внутри запроса нужно ждать через load/load_many.
+    """
+
+    def __init__(self, batch_load: Callable[[list[K]], Awaitable[dict[K, V]]]) -> None:
+        self._batch_load = batch_load
+        self._cache: dict[K, asyncio.Future] = {}
+        self._queue: list[K] = []
+
+    def load(self, key: K) -> Awaitable[V | None]:
+        if (future := self._cache.get(key)) is None:
+            loop = asyncio.get_running_loop()
+            future = self._cache[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def clear(self) -> None:
+        self._cache = {key: future for key, future in self._cache.items() if not future.done()}
+
+    def _schedule_dispatch(self) -> None:
+        asyncio.ensure_future(self._dispatch())  # noqa: RUF006
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        futures = [self._cache[key] for key in keys]
+        try:
+            values = await self._batch_load(keys)
+        except Exception as error:  # noqa: BLE001
+            for key, future in zip(keys, futures):
+                self._cache.pop(key, None)
+                future.set_exception(error)
+            return
+        for key, future in zip(keys, futures):
+            future.set_result(values.get(key))
+
+
+class Loaders:
+    """
+    Загрузчики пользователей, команд и тегов команд одной сессии (одного запроса).
+    Запросы разных загрузчиков выполняются по очереди: сессия не допускает параллельных операций.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._lock = asyncio.Lock()
+        self.users: DataLoader[uuid.UUID, AuthUser] = DataLoader(self._load_users)
+        self.teams: DataLoader[uuid.UUID, Team] = DataLoader(self._load_teams)
+        self.team_tags: DataLoader[uuid.UUID, TeamTags] = DataLoader(self._load_team_tags)
+
+    async def execute(self, query: Any) -> Any:
+        async with self._lock:
+            return await self.session.execute(query)
+
+    async def _load_users(self, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, AuthUser]:
+        result = await self.execute(select(AuthUser).where(AuthUser.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars()}
+
+    async def _load_teams(self, team_ids: list[uuid.UUID]) -> dict[uuid.UUID, Team]:
+        result = await self.execute(select(Team).where(Team.id.in_(team_ids)))
+        return {team.id: team for team in result.scalars()}
+
+    async def _load_team_tags(self, team_ids: list[uuid.UUID]) -> dict[uuid.UUID, TeamTags]:
+        result = await self.execute(select(TeamTags).where(TeamTags.team_id.in_(team_ids)))
+        return {tags.team_id: tags for tags in result.scalars()}
+
+    def clear(self, *_: Any) -> None:
+        self.users.clear()
+        self.teams.clear()
+        self.team_tags.clear()
+
+
+def get_loaders(session: AsyncSession) -> Loaders:
+    """
+    Загрузчики, привязанные к сессии.
+    Сессия живет один запрос, поэтому и кэш загрузчиков живет один запрос;
+    после commit кэш сбрасывается, чтобы не отдавать устаревшие данные,
+    a после rollback - чтобы не отдавать данные, которые так и не были записаны.
+    """
+    if (loaders := session.info.get("loaders")) is None:
+        loaders = session.info["loaders"] = Loaders(session)
+        for event_name in ("after_commit", "after_rollback", "after_soft_rollback"):
+            event.listen(session.sync_session, event_name, loaders.clear)
+    return loaders
+
+
+def as_uuid(value: str | uuid.UUID) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
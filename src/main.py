@@ -1,16 +1,67 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from starlette.middleware.cors import CORSMiddleware
 
 from src.admin.routers import admin_router
+from src.auth.deletion import account_deleter
 from src.auth.routers import auth_router
+from src.chat.routers import chat_router
+from src.chat.utils import chat_hub, chat_persister
+from src.compression import CompressionMiddleware
 from src.config import settings
+from src.database import ReadYourWritesMiddleware, engine, replica_router
+from src.deadlines import (
+    DeadlineExceededError,
+    deadline_exceeded_handler,
+    pool_timeout_handler,
+    query_canceled_handler,
+)
 from src.find.routers import find_router
+from src.graphql_api.routers import graphql_router
+from src.idempotency import IdempotentReplay, idempotent_replay_handler
+from src.media import media_router
+from src.metrics import metrics_router
+from src.notifications.routers import notifications_router
+from src.notifications.utils import notification_hub, notification_writer
+from src.redis_client import redis_manager
+from src.slow_queries import SlowQueryRouteMiddleware
+from src.startup import warm_up
+from src.team.archive import team_archiver
 from src.team.routers import team_router
+from src.user_profile.avatars import avatar_processor
 from src.user_profile.routers import profile_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """Открытие соединений при старте приложения и их закрытие при остановке."""
+    await redis_manager.connect()
+    await warm_up()
+    await replica_router.start()
+    await team_archiver.start()
+    await account_deleter.start()
+    await chat_persister.start()
+    yield
+    await chat_hub.stop()
+    await chat_persister.stop()
+    await avatar_processor.stop()
+    await team_archiver.stop()
+    await account_deleter.stop()
+    await notification_hub.stop()
+    await notification_writer.stop()
+    await replica_router.stop()
+    await redis_manager.close()
+    await engine.dispose()
+
+
 app = FastAPI(
     title="Find Team 2.0",
     docs_url=f"/{settings.SECRET_PATH}",
+    lifespan=lifespan,
 )
 
 
@@ -35,9 +86,35 @@ app.add_middleware(
                    "Access-Control-Allow-Origin", "Authorization"],
 )
 
+"""Чтение собственных изменений из основной БД"""
+app.add_middleware(ReadYourWritesMiddleware)
+
+"""Маршрут запроса для журнала медленных запросов"""
+app.add_middleware(SlowQueryRouteMiddleware)
+
+"""Сжатие ответов"""
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    cache_size=settings.COMPRESSION_CACHE_SIZE,
+)
+
+"""Повтор сохраненных ответов на запросы c Idempotency-Key"""
+app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
+
+"""Ответы при исчерпании бюджета времени запроса и нехватке соединений c БД"""
+app.add_exception_handler(DeadlineExceededError, deadline_exceeded_handler)
+app.add_exception_handler(DBAPIError, query_canceled_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
 """Запуск роутеров"""
 app.include_router(auth_router)
 app.include_router(profile_router)
 app.include_router(team_router)
 app.include_router(find_router)
+app.include_router(notifications_router)
+app.include_router(chat_router)
+app.include_router(graphql_router, tags=["GraphQL"])
+app.include_router(media_router)
 app.include_router(admin_router)
+app.include_router(metrics_router)
@@ -0,0 +1,140 @@
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+from src.config import settings
+
+media_router = APIRouter(
+    prefix="/media",
+    tags=["Media"],
+)
+
+"""
+Раздача загруженных файлов.
+
+Имя файла - sha256 его содержимого, поэтому по одному адресу всегда лежит
+один и тот же файл: ответ кэшируется навсегда, ETag - это сам хэш.
+"""
+
+MEDIA_PATH_PATTERN = re.compile(r"^[a-z]+/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.(?P<extension>webp|png|jpg)$")
+MEDIA_TYPES = {"webp": "image/webp", "png": "image/png", "jpg": "image/jpeg"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Разбор заголовка Range c одним диапазоном байт, возвращает (начало, конец включительно).
+    Несколько диапазонов и непонятный заголовок игнорируются - отдается весь файл.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    start, _, end = ranges.strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else size - 1
+        else:
+            first, last = max(size - int(end), 0), size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return first, min(last, size - 1)
+
+
+class MediaFileResponse(Response):
+    """
+    Ответ c частью файла без чтения всего файла в память.
+    Если сервер поддерживает расширение ASGI http.response.zerocopysend,
+    файл отдается через sendfile, иначе читается кусками по chunk_size.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: Path, offset: int, count: int, status_code: int, headers: dict, media_type: str) -> None:
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.headers["Content-Length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or not self.count:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with self.path.open("rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                })
+        else:
+            async with await anyio.open_file(self.path, "rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining = remaining - len(chunk) if chunk else 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+
+
+def _not_modified(request: Request, etag: str, modified_at: float) -> bool:
+    if (if_none_match := request.headers.get("if-none-match")) is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if if_modified_since := request.headers.get("if-modified-since"):
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= int(modified_at)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@media_router.api_route(
+    "/{path:path}",
+    methods=["GET", "HEAD"],
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+)
+async def get_media(path: str, request: Request) -> Response:
+    """Файл по адресу из image_path: /media/avatars/<xx>/<sha256>.webp, поддерживаются Range и If-None-Match."""
+    if not (match := MEDIA_PATH_PATTERN.match(path)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="file not found")
+    file_path = settings.MEDIA_ROOT / path
+    try:
+        stat = await anyio.Path(file_path).stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="file not found") from None
+    etag = f'"{match["digest"]}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    media_type = MEDIA_TYPES[match["extension"]]
+    if settings.MEDIA_ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT.rstrip('/')}/{path}"
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    if (range_header := request.headers.get("range")) and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(range_header, stat.st_size)
+    if byte_range is None:
+        return MediaFileResponse(file_path, 0, stat.st_size, status.HTTP_200_OK, headers, media_type)
+    first, last = byte_range
+    headers["Content-Range"] = f"bytes {first}-{last}/{stat.st_size}"
+    return MediaFileResponse(
+        file_path, first, last - first + 1, status.HTTP_206_PARTIAL_CONTENT, headers, media_type,
+    )
@@ -0,0 +1,35 @@
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+
+from src.config import settings
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Время выполнения команд Redis.",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+metrics_router = APIRouter(
+    prefix=f"/{settings.SECRET_PATH}",
+    tags=["Metrics"],
+)
+
+
+@metrics_router.get(
+    "/metrics",
+    include_in_schema=False,
+)
+async def get_metrics() -> Response:
+    """
+    Метрики приложения в формате Prometheus.
+    При запуске в несколько процессов (задан PROMETHEUS_MULTIPROC_DIR)
+    метрики собираются со всех процессов, a не только c ответившего.
+    """
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,80 @@
+import datetime
+import uuid
+
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.schemas import UserSchema
+from src.notifications.models import Notification
+from src.notifications.schemas import NotificationSchema
+
+
+async def save_notifications(
+    notifications: list[dict],
+    session: AsyncSession,
+) -> None:
+    """Запись пачки уведомлений одним запросом."""
+    await session.execute(insert(Notification), notifications)
+    await session.commit()
+
+
+async def get_notifications(
+    user: UserSchema,
+    session: AsyncSession,
+    before_id: int | None = None,
+    limit: int = 20,
+) -> list[NotificationSchema]:
+    """Получение уведомлений пользователя от новых к старым, страница начинается после before_id."""
+    query = (
+        select(Notification)
+        .where(Notification.recipient_id == user.id)
+        .order_by(Notification.id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        query = query.where(Notification.id < before_id)
+    result = await session.execute(query)
+    return [
+        NotificationSchema(
+            id=notification.id,
+            type=notification.type,
+            team_id=notification.team_id,
+            user_id=notification.user_id,
+            created_at=notification.created_at,
+            read_at=notification.read_at,
+        )
+        for notification in result.scalars()
+    ]
+
+
+async def mark_notifications_read(
+    user: UserSchema,
+    session: AsyncSession,
+    ids: list[int] | None = None,
+) -> int:
+    """Отметка уведомлений прочитанными (всех, если ids не переданы), возвращает число отмеченных."""
+    stmt = (
+        update(Notification)
+        .values(read_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None))
+        .where(and_(
+            Notification.recipient_id == user.id,
+            Notification.read_at.is_(None),
+        ))
+    )
+    if ids is not None:
+        stmt = stmt.where(Notification.id.in_(ids))
+    marked = (await session.execute(stmt)).rowcount
+    await session.commit()
+    return marked
+
+
+async def count_unread(
+    user_id: uuid.UUID,
+    session: AsyncSession,
+) -> int:
+    """Подсчет непрочитанных уведомлений в БД, когда счетчика нет в Redis."""
+    query = select(func.count()).select_from(Notification).where(and_(
+        Notification.recipient_id == user_id,
+        Notification.read_at.is_(None),
+    ))
+    return (await session.execute(query)).scalar_one()
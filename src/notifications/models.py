@@ -0,0 +1,32 @@
+import datetime
+import uuid
+
+from sqlalchemy import BigInteger, ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class Notification(Base):
+    """Модель уведомления пользователя"""
+    __tablename__ = "notification"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    recipient_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("auth_user.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    type: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    team_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    read_at: Mapped[datetime.datetime] = mapped_column(nullable=True, default=None)
+
+    __table_args__ = (
+        Index("ix_notification_recipient", "recipient_id", "id"),
+        Index(
+            "ix_notification_recipient_unread",
+            "recipient_id",
+            postgresql_where=text("read_at IS NULL"),
+        ),
+    )
@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.auth_handler import current_user
+from src.auth.schemas import ResponseSchema, UserSchema
+from src.config import settings
+from src.database import get_async_session, get_read_async_session
+from src.notifications import crud
+from src.notifications.schemas import MarkReadSchema, NotificationSchema, UnreadCountSchema
+from src.notifications.utils import (
+    begin_unread_changes,
+    change_unread_counters,
+    format_sse,
+    get_unread_count,
+    notification_hub,
+)
+
+notifications_router = APIRouter(
+    prefix="/notifications",
+    tags=["Notifications"],
+)
+
+
+async def _event_stream(user: UserSchema) -> AsyncGenerator[str, None]:
+    queue = await notification_hub.subscribe(user.id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.NOTIFICATIONS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        await notification_hub.unsubscribe(user.id, queue)
+
+
+@notifications_router.get(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+)
+async def stream_notifications(
+    user: Annotated[UserSchema, Depends(current_user)],
+) -> StreamingResponse:
+    """
+    Поток событий o заявках и участии в командах (Server-Sent Events).
+    Заменяет периодический опрос списков заявок и участников.
+    """
+    return StreamingResponse(
+        _event_stream(user),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@notifications_router.get(
+    "/inbox",
+    response_model=list[NotificationSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_notifications(
+    user: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    before_id: int | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> list[NotificationSchema]:
+    """
+    Уведомления пользователя от новых к старым.
+    Следующая страница запрашивается c before_id, равным id последнего полученного уведомления.
+    """
+    return await crud.get_notifications(user, session, before_id, limit)
+
+
+@notifications_router.get(
+    "/unread_count",
+    response_model=UnreadCountSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_notifications_unread_count(
+    user: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> UnreadCountSchema:
+    """Число непрочитанных уведомлений, при заполнении счетчика считается по основной БД."""
+    return UnreadCountSchema(count=await get_unread_count(user.id, session))
+
+
+@notifications_router.post(
+    "/read",
+    response_model=ResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def mark_notifications_read(
+    read_data: MarkReadSchema,
+    user: Annotated[UserSchema, Depends(current_user)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> ResponseSchema:
+    """Отметить уведомления прочитанными, без списка id - все уведомления."""
+    versions = await begin_unread_changes([user.id])
+    if marked := await crud.mark_notifications_read(user, session, read_data.ids):
+        await change_unread_counters({user.id: -marked}, versions)
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        detail="notifications are marked as read",
+    )
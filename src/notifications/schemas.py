@@ -0,0 +1,36 @@
+import datetime
+import uuid
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class EventType(str, Enum):
+    APPLICATION_CREATED = "application_created"
+    APPLICATION_ACCEPTED = "application_accepted"
+    APPLICATION_REJECTED = "application_rejected"
+    MEMBER_EXCLUDED = "member_excluded"
+
+
+class EventSchema(BaseModel):
+    type: EventType
+    team_id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime.datetime
+
+
+class NotificationSchema(BaseModel):
+    id: int
+    type: EventType
+    team_id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime.datetime
+    read_at: datetime.datetime | None
+
+
+class MarkReadSchema(BaseModel):
+    ids: list[int] | None = None
+
+
+class UnreadCountSchema(BaseModel):
+    count: int
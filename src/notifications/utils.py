@@ -0,0 +1,268 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import async_session_maker
+from src.notifications import crud
+from src.notifications.schemas import EventSchema, EventType
+from src.redis_client import redis_manager
+
+if TYPE_CHECKING:
+    from redis.asyncio.client import PubSub
+
+logger = logging.getLogger(__name__)
+
+"""
+Счетчик непрочитанных уведомлений - хэш Redis c числом и версией, c которой он заполнен из БД.
+
+Перед записью в БД изменяющий путь увеличивает версию пользователя, после записи
+применяет к счетчику изменение скриптом UNREAD_COUNTER_SCRIPT. Счетчик, заполненный до
+увеличения версии, посчитан без этой записи и изменяется; заполненный позже мог уже
+ее учесть, поэтому удаляется и при следующем чтении заполняется заново.
+Заполнение (UNREAD_FILL_SCRIPT) не выполняется, если версия изменилась во время подсчета в БД.
+"""
+UNREAD_COUNTER_SCRIPT = """
+local counter = redis.call('HMGET', KEYS[1], 'count', 'version')
+if not counter[1] then
+    return nil
+end
+if tonumber(counter[2]) < tonumber(ARGV[2]) then
+    return redis.call('HINCRBY', KEYS[1], 'count', ARGV[1])
+end
+redis.call('DEL', KEYS[1])
+return nil
+"""
+UNREAD_FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] or redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'count', ARGV[1], 'version', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def _channel(user_id: str | uuid.UUID) -> str:
+    return f"notifications:{user_id}"
+
+
+def format_sse(event: EventSchema) -> str:
+    """Событие в формате Server-Sent Events."""
+    return f"event: {event.type.value}\ndata: {event.model_dump_json()}\n\n"
+
+
+async def publish_event(
+    recipient_id: str | uuid.UUID,
+    event_type: EventType,
+    team_id: str | uuid.UUID,
+    user_id: str | uuid.UUID,
+) -> None:
+    """
+    Публикация события для пользователя в Redis.
+    Ошибка публикации не должна ломать уже выполненное действие, поэтому только логируется.
+    """
+    event = EventSchema(
+        type=event_type,
+        team_id=team_id,
+        user_id=user_id,
+        created_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+    )
+    notification_writer.add(recipient_id, event)
+    try:
+        await redis_manager.client.publish(_channel(recipient_id), event.model_dump_json())
+    except Exception:  # noqa: BLE001
+        logger.warning("could not publish %s event", event_type.value, exc_info=True)
+
+
+class NotificationHub:
+    """
+    Доставка событий из Redis pub/sub подключенным к процессу клиентам.
+
+    Каждый процесс держит одно соединение pub/sub и подписан только на каналы
+    пользователей, подключенных к нему, поэтому событие, опубликованное любым
+    процессом, доходит до клиента независимо от того, каким процессом он обслуживается.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._listeners: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._pubsub: "PubSub | None" = None
+        self._reader_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, user_id: str | uuid.UUID) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        channel = _channel(user_id)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = redis_manager.client.pubsub(ignore_subscribe_messages=True)
+            if not self._listeners[channel]:
+                await self._pubsub.subscribe(channel)
+            self._listeners[channel].add(queue)
+            if self._reader_task is None:
+                self._reader_task = asyncio.create_task(self._read())
+        return queue
+
+    async def unsubscribe(self, user_id: str | uuid.UUID, queue: asyncio.Queue) -> None:
+        channel = _channel(user_id)
+        async with self._lock:
+            self._listeners[channel].discard(queue)
+            if not self._listeners[channel]:
+                del self._listeners[channel]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        """Цикл проверяет задачу: redis-py может поглотить отмену во время ожидания сообщения."""
+        while self._reader_task is not None:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except Exception:  # noqa: BLE001
+                logger.warning("notifications pubsub connection failed", exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                continue
+            event = EventSchema.model_validate_json(message["data"])
+            for queue in self._listeners.get(message["channel"], ()):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning("notifications queue is full, event %s dropped", event.type.value)
+
+    async def stop(self) -> None:
+        if (reader_task := self._reader_task) is not None:
+            self._reader_task = None
+            reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await reader_task
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        self._listeners.clear()
+
+
+notification_hub = NotificationHub(settings.NOTIFICATIONS_QUEUE_SIZE)
+
+
+def _unread_key(user_id: str | uuid.UUID) -> str:
+    return f"notifications:unread-count:{user_id}"
+
+
+def _unread_version_key(user_id: str | uuid.UUID) -> str:
+    return f"notifications:unread-version:{user_id}"
+
+
+async def begin_unread_changes(user_ids: Iterable[str | uuid.UUID]) -> dict[str, int]:
+    """
+    Увеличение версий счетчиков перед записью в БД, возвращает новые версии.
+    При ошибке Redis возвращается пустой словарь: счетчики тогда будут сброшены.
+    """
+    user_ids = [str(user_id) for user_id in user_ids]
+    try:
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.incr(_unread_version_key(user_id))
+                pipe.expire(_unread_version_key(user_id), settings.NOTIFICATIONS_UNREAD_TTL)
+            results = await pipe.execute()
+    except Exception:  # noqa: BLE001
+        logger.warning("could not reserve unread counters versions", exc_info=True)
+        return {}
+    return dict(zip(user_ids, results[::2]))
+
+
+async def change_unread_counters(deltas: Mapping[str | uuid.UUID, int], versions: Mapping[str, int]) -> None:
+    """
+    Изменение счетчиков непрочитанных уведомлений нескольких пользователей за один запрос
+    после записи в БД; versions - результат begin_unread_changes перед записью.
+    """
+    script = redis_manager.script(UNREAD_COUNTER_SCRIPT)
+    async with redis_manager.client.pipeline(transaction=False) as pipe:
+        for user_id, delta in deltas.items():
+            version = versions.get(str(user_id), 0)
+            await script(keys=[_unread_key(user_id)], args=[delta, version], client=pipe)
+        await pipe.execute()
+
+
+async def get_unread_count(
+    user_id: uuid.UUID,
+    session: AsyncSession,
+) -> int:
+    """
+    Число непрочитанных уведомлений из Redis, при отсутствии счетчика - из БД c сохранением в Redis.
+    Сессия должна читать из основной БД: значение реплики может отставать.
+    """
+    key, version_key = _unread_key(user_id), _unread_version_key(user_id)
+    if (count := await redis_manager.client.hget(key, "count")) is not None:
+        return int(count)
+    version = await redis_manager.client.get(version_key) or "0"
+    count = await crud.count_unread(user_id, session)
+    await redis_manager.script(UNREAD_FILL_SCRIPT)(
+        keys=[key, version_key],
+        args=[count, version, settings.NOTIFICATIONS_UNREAD_TTL],
+    )
+    return count
+
+
+class NotificationWriter:
+    """
+    Запись уведомлений в БД пачками фоновой задачей, вне обработки запроса.
+    Пачка записывается по истечении flush_interval или при наборе batch_size уведомлений.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add(self, recipient_id: str | uuid.UUID, event: EventSchema) -> None:
+        self._buffer.append({
+            "recipient_id": uuid.UUID(str(recipient_id)),
+            "type": event.type.value,
+            "team_id": event.team_id,
+            "user_id": event.user_id,
+            "created_at": event.created_at,
+        })
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._task is not None:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            deltas = Counter(notification["recipient_id"] for notification in batch)
+            versions = await begin_unread_changes(deltas)
+            try:
+                async with async_session_maker() as session:
+                    await crud.save_notifications(batch, session)
+                await change_unread_counters(deltas, versions)
+            except Exception:  # noqa: BLE001
+                logger.warning("could not save %d notifications", len(batch), exc_info=True)
+
+    async def stop(self) -> None:
+        """Остановка фоновой задачи c записью оставшихся уведомлений."""
+        if (task := self._task) is not None:
+            self._task = None
+            self._wakeup.set()
+            await task
+
+
+notification_writer = NotificationWriter(settings.NOTIFICATIONS_BATCH_SIZE, settings.NOTIFICATIONS_FLUSH_INTERVAL)
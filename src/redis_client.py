@@ -0,0 +1,123 @@
+import time
+from collections.abc import Mapping
+
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
+
+from src.config import settings
+from src.metrics import REDIS_COMMAND_DURATION
+
+"""Продление и снятие блокировки, только если она все еще принадлежит владельцу: KEYS[1] - ключ, ARGV[1] - значение."""
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline Redis, замеряющий время выполнения всей пачки команд."""
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        started_at = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels(command="PIPELINE").observe(time.perf_counter() - started_at)
+
+
+class InstrumentedRedis(AsyncRedis):
+    """Клиент Redis, замеряющий время выполнения команд."""
+
+    async def execute_command(self, *args, **options):  # noqa: ANN002, ANN003
+        started_at = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(command=str(args[0]).upper()).observe(time.perf_counter() - started_at)
+
+    def pipeline(
+        self,
+        transaction: bool = True,
+        shard_hint: str | None = None,
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class RedisManager:
+    """
+    Клиент Redis c пулом соединений, которым владеет lifespan приложения.
+    Клиент создается при старте приложения (или при первом обращении,
+    если приложение запущено без lifespan) и закрывается при остановке.
+    """
+
+    def __init__(self) -> None:
+        self._client: InstrumentedRedis | None = None
+        self._scripts: dict[str, AsyncScript] = {}
+
+    def _create_client(self) -> InstrumentedRedis:
+        pool = BlockingConnectionPool.from_url(
+            url=settings.db_url_redis,
+            db=0,
+            decode_responses=True,
+            max_connections=settings.REDIS_POOL_SIZE,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        return InstrumentedRedis(connection_pool=pool)
+
+    @property
+    def client(self) -> InstrumentedRedis:
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    async def connect(self) -> None:
+        """Создание клиента при старте приложения."""
+        _ = self.client
+
+    async def close(self) -> None:
+        """Закрытие клиента и всех соединений пула при остановке приложения."""
+        if self._client is not None:
+            await self._client.aclose(close_connection_pool=True)
+            self._client = None
+            self._scripts.clear()
+
+    def script(self, source: str) -> AsyncScript:
+        """Lua-скрипт, зарегистрированный на текущем клиенте (вызывается через EVALSHA)."""
+        if source not in self._scripts:
+            self._scripts[source] = self.client.register_script(source)
+        return self._scripts[source]
+
+    async def consume(self, key: str) -> str | None:
+        """Атомарное получение и удаление одноразового ключа (GETDEL)."""
+        return await self.client.getdel(key)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        """Получение значений нескольких ключей за один запрос."""
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def set_many(self, mapping: Mapping[str, str | int], ex: int | None = None) -> None:
+        """Запись нескольких ключей c общим временем жизни за один запрос."""
+        if not mapping:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ex)
+            await pipe.execute()
+
+
+redis_manager = RedisManager()
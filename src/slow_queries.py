@@ -0,0 +1,187 @@
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Connection, event
+from sqlalchemy.engine import ExceptionContext, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+"""
+Журнал медленных запросов к БД.
+
+Запросы дольше SLOW_QUERY_THRESHOLD_MS записываются в Redis вместе c маршрутом,
+типами параметров (без значений) и длительностью. Для доли
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE читающих запросов в фоне снимается
+EXPLAIN (ANALYZE, BUFFERS) c теми же параметрами на свободном соединении пула;
+литералы в условиях плана заменяются на "?", чтобы значения параметров не попадали в журнал.
+"""
+
+_current_scope: contextvars.ContextVar[Scope | None] = contextvars.ContextVar("slow_query_scope", default=None)
+_MODIFYING_STATEMENT = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b", re.IGNORECASE)
+"""Строковые и числовые литералы в выражениях плана."""
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![\w.$])-?\d+(?:\.\d+)?(?![\w.])")
+PLAN_EXPRESSION_FIELDS = frozenset({
+    "Filter", "Join Filter", "One-Time Filter", "Index Cond", "Recheck Cond", "TID Cond",
+    "Hash Cond", "Merge Cond", "Cache Key", "Output", "Sort Key", "Presorted Key", "Group Key",
+})
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Типы параметров запроса без значений: их достаточно, чтобы понять форму запроса."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def current_route() -> str | None:
+    """Метод и шаблон пути маршрута, который выполняет запрос."""
+    if (scope := _current_scope.get()) is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method', scope['type'].upper())} {getattr(route, 'path', scope['path'])}"
+
+
+def is_explainable(statement: str) -> bool:
+    """EXPLAIN ANALYZE выполняет запрос, поэтому снимается только для читающих запросов."""
+    return statement.lstrip().upper().startswith(("SELECT", "WITH")) and not _MODIFYING_STATEMENT.search(statement)
+
+
+def redact_plan(plan: Any, expression: bool = False) -> Any:
+    """План EXPLAIN c литералами в выражениях, замененными на "?"."""
+    if isinstance(plan, dict):
+        return {key: redact_plan(value, key in PLAN_EXPRESSION_FIELDS) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [redact_plan(item, expression) for item in plan]
+    if expression and isinstance(plan, str):
+        return _PLAN_LITERAL.sub("?", plan)
+    return plan
+
+
+def has_idle_connection(engine: AsyncEngine) -> bool:
+    """EXPLAIN не должен ждать соединение вместе c запросами пользователей, когда пул занят."""
+    checkedin = getattr(engine.sync_engine.pool, "checkedin", None)
+    return checkedin is None or checkedin() > 0
+
+
+class SlowQueryLog:
+    """Запись медленных запросов движков БД, к которым журнал подключен через attach."""
+
+    KEY = "slow-queries"
+    SKIP_OPTION = "slow_query_log_skip"
+
+    def __init__(self, threshold_ms: float, sample_rate: float, size: int) -> None:
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.size = size
+        self._tasks: set[asyncio.Task] = set()
+
+    def attach(self, engine: AsyncEngine) -> None:
+        if not self.threshold:
+            return
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def start_timer(
+            conn: Connection, _cursor: Any, _statement: str, _parameters: Any,
+            _context: ExecutionContext, _executemany: bool,
+        ) -> None:
+            conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def check_duration(
+            conn: Connection, _cursor: Any, statement: str, parameters: Any,
+            context: ExecutionContext, executemany: bool,
+        ) -> None:
+            duration = time.perf_counter() - conn.info["slow_query_started_at"].pop()
+            if duration < self.threshold or context.execution_options.get(self.SKIP_OPTION):
+                return
+            self.record(engine, statement, parameters, duration, executemany)
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def drop_timer(exception_context: ExceptionContext) -> None:
+            """Запрос c ошибкой не доходит до after_cursor_execute, его время снимается со стека здесь."""
+            conn = exception_context.connection
+            if conn is not None and (started_at := conn.info.get("slow_query_started_at")):
+                started_at.pop()
+
+    def record(self, engine: AsyncEngine, statement: str, parameters: Any, duration: float, executemany: bool) -> None:
+        entry = {
+            "statement": statement,
+            "route": current_route(),
+            "parameters": f"executemany x{len(parameters)}" if executemany else parameters_shape(parameters),
+            "duration_ms": round(duration * 1000, 2),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        logger.warning("slow query %.1f ms on %s: %s", entry["duration_ms"], entry["route"], statement)
+        explain = (
+            not executemany and is_explainable(statement) and random.random() < self.sample_rate  # noqa: S311
+            and engine is not None and has_idle_connection(engine)
+        )
+        task = asyncio.get_running_loop().create_task(
+            self._store(entry, engine if explain else None, parameters),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, statement: str, parameters: Any) -> Any:
+        """EXPLAIN (ANALYZE, BUFFERS) в транзакции, которая откатывается."""
+        async with engine.connect() as conn:
+            await conn.execution_options(**{self.SKIP_OPTION: True})
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS}")
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            await conn.rollback()
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+    async def _store(self, entry: dict, engine: AsyncEngine | None, parameters: Any) -> None:
+        try:
+            if engine is not None and has_idle_connection(engine):
+                entry["plan"] = redact_plan(await self._explain(engine, entry["statement"], parameters))
+        except Exception:  # noqa: BLE001
+            logger.warning("EXPLAIN of slow query failed", exc_info=True)
+        try:
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                pipe.lpush(self.KEY, json.dumps(entry, default=str))
+                pipe.ltrim(self.KEY, 0, self.size - 1)
+                await pipe.execute()
+        except Exception:  # noqa: BLE001
+            logger.warning("slow query was not stored", exc_info=True)
+
+    async def recent(self, limit: int) -> list[dict]:
+        """Последние медленные запросы, новые первыми."""
+        return [json.loads(entry) for entry in await redis_manager.client.lrange(self.KEY, 0, limit - 1)]
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    settings.SLOW_QUERY_LOG_SIZE,
+)
+
+
+class SlowQueryRouteMiddleware:
+    """Делает scope запроса доступным журналу: маршрут появляется в нем после роутинга."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
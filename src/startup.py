@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.auth import utils as auth_utils
+from src.auth.auth_handler import REFRESH_FAMILY_CHECK_SCRIPT
+from src.auth.models import AuthUser
+from src.config import settings
+from src.database import async_session_maker
+from src.find.models import TeamPreview
+from src.redis_client import redis_manager
+from src.team.models import Team, TeamTags, team_members_table
+from src.user_profile.models import UserContacts, UserHobbies, UserProfile
+
+logger = logging.getLogger(__name__)
+
+"""
+Горячие запросы приложения.
+Их выполнение при старте заполняет кэш скомпилированных запросов SQLAlchemy
+и кэш подготовленных запросов asyncpg на каждом открытом соединении.
+"""
+_NIL_ID = uuid.UUID(int=0)
+HOT_QUERIES = (
+    select(AuthUser).where(AuthUser.id == _NIL_ID),
+    select(AuthUser).where(AuthUser.email == ""),
+    select(AuthUser).where(AuthUser.username == ""),
+    select(Team, TeamPreview.owner_username, TeamPreview.tags)
+    .join(TeamPreview, TeamPreview.team_id == Team.id)
+    .options(selectinload(Team.members))
+    .where(Team.id.in_([_NIL_ID])),
+    select(TeamPreview).where(TeamPreview.owner == _NIL_ID).order_by(TeamPreview.team_deadline_at, TeamPreview.team_id),
+    select(Team).where(Team.id == _NIL_ID),
+    select(TeamTags).where(TeamTags.team_id == _NIL_ID),
+    select(team_members_table).where(team_members_table.c.team_id == _NIL_ID),
+    select(UserProfile, UserContacts, UserHobbies, AuthUser.username)
+    .join(UserContacts, UserContacts.user_id == UserProfile.user_id)
+    .join(UserHobbies, UserHobbies.user_id == UserProfile.user_id)
+    .join(AuthUser, AuthUser.id == UserProfile.user_id)
+    .where(UserProfile.user_id.in_([_NIL_ID])),
+)
+
+
+def warm_up_keys() -> None:
+    """Загрузка и разбор ключей JWT."""
+    auth_utils.get_private_key()
+    auth_utils.get_public_key()
+
+
+async def _warm_up_db_connection() -> None:
+    async with async_session_maker() as session:
+        for query in HOT_QUERIES:
+            await session.execute(query)
+
+
+async def warm_up_database() -> None:
+    """Открытие минимального числа соединений c БД и прогрев горячих запросов."""
+    connections = min(settings.WARMUP_DB_CONNECTIONS, settings.db_pool_limits[0]) if settings.DB_POOL_SIZE else 0
+    await asyncio.gather(*(_warm_up_db_connection() for _ in range(connections)))
+
+
+async def warm_up_redis() -> None:
+    """Открытие минимального числа соединений c Redis и загрузка Lua-скриптов."""
+    if not settings.WARMUP_REDIS_CONNECTIONS:
+        return
+    client = redis_manager.client
+    await asyncio.gather(*(client.ping() for _ in range(settings.WARMUP_REDIS_CONNECTIONS)))
+    await client.script_load(REFRESH_FAMILY_CHECK_SCRIPT)
+
+
+async def warm_up() -> None:
+    """
+    Фаза прогрева при старте приложения.
+    Ошибка прогрева не останавливает запуск: соединения будут открыты при первых запросах.
+    """
+    started_at = time.perf_counter()
+    for name, phase in (
+        ("keys", warm_up_keys),
+        ("database", warm_up_database),
+        ("redis", warm_up_redis),
+    ):
+        phase_started_at = time.perf_counter()
+        try:
+            result = phase()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:  # noqa: BLE001
+            logger.warning("warm-up phase %s failed", name, exc_info=True)
+            continue
+        logger.info("warm-up phase %s: %.3fs", name, time.perf_counter() - phase_started_at)
+    logger.info("warm-up finished: %.3fs", time.perf_counter() - started_at)
@@ -0,0 +1,99 @@
+"""
+Замер времени запуска приложения.
+
+Запуск: python -m src.startup_benchmark [--top 15] [--path /find/teams_list]
+Выводит время импорта модулей (python -X importtime) и время от старта
+процесса uvicorn до первого ответа 200.
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from src.config import BASE_DIR, settings
+
+
+def _write(line: str = "") -> None:
+    sys.stdout.write(f"{line}\n")
+
+
+def measure_import_time(top: int) -> None:
+    """Время импорта модулей при импорте src.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],  # noqa: S603
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((int(self_us), int(cumulative_us), name.strip()))
+
+    total_us = max(cumulative for _, cumulative, _ in modules)
+    _write(f"import src.main: {total_us / 1000:.1f} ms")
+    _write()
+    _write(f"top {top} modules by self time:")
+    _write(f"{'self, ms':>10} {'cumulative, ms':>15}  module")
+    for self_us, cumulative_us, name in sorted(modules, reverse=True)[:top]:
+        _write(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>15.1f}  {name}")
+    _write()
+    _write("project modules:")
+    _write(f"{'self, ms':>10} {'cumulative, ms':>15}  module")
+    for self_us, cumulative_us, name in modules:
+        if name.startswith("src."):
+            _write(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>15.1f}  {name}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_time_to_first_ok(path: str, timeout: float) -> None:
+    """Время от запуска процесса uvicorn до первого ответа 200 (включая lifespan и прогрев)."""
+    port = _free_port()
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],  # noqa: S603
+        cwd=BASE_DIR,
+    )
+    try:
+        while time.perf_counter() - started_at < timeout:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}{path}", timeout=timeout)
+            except httpx.TransportError:
+                time.sleep(0.01)
+                continue
+            if response.status_code == httpx.codes.OK:
+                _write(f"time to first 200 on {path}: {(time.perf_counter() - started_at) * 1000:.1f} ms")
+                return
+            _write(f"{path} responded {response.status_code}, retrying")
+            time.sleep(0.1)
+        _write(f"no 200 on {path} in {timeout} s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер времени запуска приложения.")
+    parser.add_argument("--top", type=int, default=15, help="число самых медленных модулей в отчете")
+    parser.add_argument("--path", default=f"/{settings.SECRET_PATH}", help="эндпоинт для проверки первого ответа")
+    parser.add_argument("--timeout", type=float, default=30.0, help="максимальное время ожидания, c")
+    args = parser.parse_args()
+
+    measure_import_time(args.top)
+    _write()
+    measure_time_to_first_ok(args.path, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
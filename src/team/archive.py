@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import os
+
+from src.config import settings
+from src.database import async_session_maker
+from src.redis_client import redis_manager
+from src.team import crud
+
+logger = logging.getLogger(__name__)
+
+
+class TeamArchiver:
+    """
+    Периодический перенос команд c истекшим сроком в архив.
+    При запуске в несколько процессов задачу за интервал выполняет
+    только тот процесс, который первым захватил блокировку в Redis.
+    """
+
+    LOCK_KEY = "team-archive:lock"
+
+    def __init__(self, interval: int, batch_size: int) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """Архивация всех просроченных команд пачками, возвращает число перенесенных команд."""
+        if not await redis_manager.client.set(self.LOCK_KEY, os.getpid(), nx=True, ex=self.interval):
+            return 0
+        archived = 0
+        async with async_session_maker() as session:
+            while count := await crud.archive_expired_teams(session, batch_size=self.batch_size):
+                archived += count
+                if count < self.batch_size:
+                    break
+        if archived:
+            logger.info("%d expired teams archived", archived)
+        return archived
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:  # noqa: BLE001
+                logger.warning("team archival failed", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self.interval:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+team_archiver = TeamArchiver(settings.TEAM_ARCHIVE_INTERVAL, settings.TEAM_ARCHIVE_BATCH_SIZE)
@@ -1,51 +1,119 @@
+import datetime
 import uuid
+from collections import defaultdict
+from typing import Any
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy import JSON, DateTime, Row, ScalarSelect, String, and_, delete, func, insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from src.auth.crud import get_user_by_id
+from src.auth.models import AuthUser
 from src.auth.schemas import ResponseSchema, UserSchema
+from src.config import settings
 from src.find.crud import get_team_data
-from src.team.models import Team, TeamTags, application_to_join_table, team_members_table
-from src.team.schemas import ApplicationSchema, CreateTeamSchema, MemberSchema
+from src.loaders import as_uuid, get_loaders
+from src.notifications.schemas import EventType
+from src.notifications.utils import publish_event
+from src.team.models import (
+    Team,
+    TeamArchive,
+    TeamTags,
+    TeamTagsArchive,
+    application_to_join_archive_table,
+    application_to_join_table,
+    team_members_archive_table,
+    team_members_table,
+)
+from src.team.schemas import (
+    ApplicationSchema,
+    ArchivedTeamSchema,
+    CreateTeamSchema,
+    MemberSchema,
+    TeamSchema,
+    TeamTagsSchema,
+)
+
+
+def _team_members_subquery(team_id: Any) -> ScalarSelect:
+    """Участники команды одним JSON-массивом, чтобы собрать команду в том же запросе."""
+    member = aliased(AuthUser)
+    return (
+        select(func.coalesce(
+            func.json_agg(func.json_build_object(
+                "id", member.id,
+                "username", member.username,
+                "email", member.email,
+                "verified", member.verified,
+            )),
+            literal([], JSON),
+            type_=JSON,
+        ))
+        .select_from(team_members_table)
+        .join(member, member.id == team_members_table.c.user_id)
+        .where(team_members_table.c.team_id == team_id)
+        .scalar_subquery()
+    )
+
+
+def _build_team_from_row(row: Row) -> TeamSchema:
+    return TeamSchema(
+        id=row.id,
+        owner=row.owner,
+        owner_name=row.username,
+        title=row.title,
+        type_team=row.type_team,
+        number_of_members=row.number_of_members,
+        team_description=row.team_description,
+        team_deadline_at=row.team_deadline_at,
+        team_city=row.team_city,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        members=[UserSchema(**member) for member in row.members],
+        tags=TeamTagsSchema(**{tag: getattr(row, tag) for tag in TeamTagsSchema.model_fields}),
+    )
+
+
+def _team_values(team_data: CreateTeamSchema) -> dict:
+    return team_data.model_dump(exclude={"tags"})
 
 
 async def create_team(
     team_data: CreateTeamSchema,
     session: AsyncSession,
     user: UserSchema,
-) -> ResponseSchema:
-    """Создание команды."""
-    stmt_for_team = insert(Team).values({
-        "owner": user.id,
-        "title": team_data.title,
-        "type_team": team_data.type_team,
-        "number_of_members": team_data.number_of_members,
-        "team_description": team_data.team_description,
-        "team_deadline_at": team_data.team_deadline_at,
-        "team_city": team_data.team_city,
-    }).returning(Team.id)
-
-    new_team_id = (await session.execute(stmt_for_team)).scalar_one_or_none()
-
-    stmt_for_team_tags = insert(TeamTags).values({
-        "team_id": new_team_id,
-        "tag1": team_data.tags.tag1,
-        "tag2": team_data.tags.tag2,
-        "tag3": team_data.tags.tag3,
-        "tag4": team_data.tags.tag4,
-        "tag5": team_data.tags.tag5,
-        "tag6": team_data.tags.tag6,
-        "tag7": team_data.tags.tag7,
-    })
-    await session.execute(stmt_for_team_tags)
-
-    await session.commit()
-    return ResponseSchema(
-        status_code=status.HTTP_201_CREATED,
-        detail="team created",
+) -> TeamSchema:
+    """Создание команды и ее тегов одним запросом, возвращает созданную команду."""
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    new_team = (
+        insert(Team)
+        .values({**_team_values(team_data), "id": uuid.uuid4(), "owner": user.id, "created_at": now, "updated_at": now})
+        .returning(*Team.__table__.c)
+        .cte("new_team")
+    )
+    tags = team_data.tags.model_dump()
+    new_tags = (
+        insert(TeamTags)
+        .from_select(
+            ["id", "team_id", *tags],
+            select(literal(uuid.uuid4()), new_team.c.id, *(literal(value, String) for value in tags.values())),
+        )
+        .returning(*TeamTags.__table__.c)
+        .cte("new_tags")
     )
+    query = (
+        select(
+            new_team,
+            AuthUser.username,
+            *(new_tags.c[tag] for tag in tags),
+            literal([], JSON).label("members"),
+        )
+        .join(new_tags, new_tags.c.team_id == new_team.c.id)
+        .join(AuthUser, AuthUser.id == new_team.c.owner)
+    )
+    team = _build_team_from_row((await session.execute(query)).one())
+    await session.commit()
+    return team
 
 
 async def update_team(
@@ -53,47 +121,56 @@ async def update_team(
     update_data: CreateTeamSchema,
     session: AsyncSession,
     user: UserSchema,
-) -> ResponseSchema:
-    """Обновление команды."""
-    stmt_for_team = (
+) -> TeamSchema:
+    """
+    Обновление команды и ее тегов одним запросом, возвращает обновленную команду.
+    По результату того же запроса: команды нет - 404, пользователь не владелец - 403.
+    """
+    updated_team = (
         update(Team)
+        .where(Team.id == team_id, Team.owner == user.id)
         .values({
-            "title": update_data.title,
-            "type_team": update_data.type_team,
-            "number_of_members": update_data.number_of_members,
-            "team_description": update_data.team_description,
-            "team_deadline_at": update_data.team_deadline_at,
-            "team_city": update_data.team_city,
+            **_team_values(update_data),
+            "updated_at": datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
         })
-        .where(and_(
-            Team.id == team_id,
-            Team.owner == user.id,
-        ))
-        .returning(Team)
+        .returning(*Team.__table__.c)
+        .cte("updated_team")
     )
-    await session.execute(stmt_for_team)
-
-    stmt_for_team_tags = (
+    tags = update_data.tags.model_dump()
+    updated_tags = (
         update(TeamTags)
-        .values({
-            "tag1": update_data.tags.tag1,
-            "tag2": update_data.tags.tag2,
-            "tag3": update_data.tags.tag3,
-            "tag4": update_data.tags.tag4,
-            "tag5": update_data.tags.tag5,
-            "tag6": update_data.tags.tag6,
-            "tag7": update_data.tags.tag7,
-        })
-        .where(and_(
-            TeamTags.team_id == team_id,
-        ))
+        .where(TeamTags.team_id == updated_team.c.id)
+        .values(tags)
+        .returning(*TeamTags.__table__.c)
+        .cte("updated_tags")
     )
-    await session.execute(stmt_for_team_tags)
-    await session.commit()
-    return ResponseSchema(
-        status_code=status.HTTP_200_OK,
-        detail="team is updated",
+    existing_team = select(Team.id).where(Team.id == team_id).subquery("existing_team")
+    query = (
+        select(
+            existing_team.c.id.label("existing_id"),
+            updated_team,
+            AuthUser.username,
+            *(updated_tags.c[tag] for tag in tags),
+            _team_members_subquery(updated_team.c.id).label("members"),
+        )
+        .select_from(existing_team)
+        .outerjoin(updated_team, updated_team.c.id == existing_team.c.id)
+        .outerjoin(updated_tags, updated_tags.c.team_id == updated_team.c.id)
+        .outerjoin(AuthUser, AuthUser.id == updated_team.c.owner)
     )
+    row = (await session.execute(query)).one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="there is no such team",
+        )
+    if row.id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="no access",
+        )
+    await session.commit()
+    return _build_team_from_row(row)
 
 
 async def delete_team(
@@ -128,9 +205,7 @@ async def get_members_list(
     session: AsyncSession,
 ) -> list[MemberSchema]:
     """Получение список участников команды."""
-    query = select(Team).where(Team.id == team_id)
-    result = await session.execute(query)
-    team_data = result.scalar_one_or_none()
+    team_data = await get_loaders(session).teams.load(as_uuid(team_id))
     query = select(team_members_table).where(team_members_table.c.team_id == team_id)
     result = await session.execute(query)
     members_without_name = result.all()
@@ -140,16 +215,15 @@ async def get_members_list(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="no access",
         ) from None
-    members = []
-    for member in members_without_name:
-        username = (await get_user_by_id(member[0], session)).username
-        member_data = MemberSchema(
+    users = await get_loaders(session).users.load_many(member[0] for member in members_without_name)
+    return [
+        MemberSchema(
             team_id=member[1],
             user_id=member[0],
-            username=username,
+            username=member_user.username,
         )
-        members.append(member_data)
-    return members
+        for member, member_user in zip(members_without_name, users)
+    ]
 
 
 async def get_application_list(
@@ -158,9 +232,8 @@ async def get_application_list(
     session: AsyncSession,
 ) -> list[ApplicationSchema]:
     """Получение заявок на вступление в команду."""
-    query = select(Team).where(Team.id == team_id)
-    result = await session.execute(query)
-    if result.scalar_one_or_none().owner == user.id:
+    team_data = await get_loaders(session).teams.load(as_uuid(team_id))
+    if team_data.owner == user.id:
         query = select(application_to_join_table).where(application_to_join_table.c.team_id == team_id)
         result = await session.execute(query)
     else:
@@ -186,15 +259,16 @@ async def move_comrade_into_team(
         await _delete_application(comrade_id, team_id, session)
 
         await session.commit()
-        return ResponseSchema(
-            status_code=status.HTTP_200_OK,
-            detail="comrade added into team",
-        )
     except Exception:  # noqa: BLE001
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="invalid data",
         ) from None
+    await publish_event(comrade_id, EventType.APPLICATION_ACCEPTED, team_id, comrade_id)
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        detail="comrade added into team",
+    )
 
 
 async def remove_application_of_comrade(
@@ -205,16 +279,16 @@ async def remove_application_of_comrade(
     """Отклонить заявку пользователя на вступление в команду."""
     try:
         await _delete_application(comrade_id, team_id, session)
-
-        return ResponseSchema(
-            status_code=status.HTTP_200_OK,
-            detail="comrade's application rejected",
-        )
     except Exception:  # noqa: BLE001
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="invalid data",
         ) from None
+    await publish_event(comrade_id, EventType.APPLICATION_REJECTED, team_id, comrade_id)
+    return ResponseSchema(
+        status_code=status.HTTP_200_OK,
+        detail="comrade's application rejected",
+    )
 
 
 async def _delete_application(
@@ -240,23 +314,122 @@ async def exclude_comrade_from_team(
     session: AsyncSession,
 ) -> ResponseSchema:
     """Исключить пользователя из команды."""
-    query = select(Team).where(Team.id == team_id)
-    result = await session.execute(query)
-    if result.scalar_one_or_none().owner == user_id:
+    team_data = await get_loaders(session).teams.load(as_uuid(team_id))
+    if team_data.owner == user_id:
         stmt = delete(team_members_table).where(
             and_(
                 team_members_table.c.user_id == comrade_id,
                 team_members_table.c.team_id == team_id,
             ),
         )
-        await session.execute(stmt)
+        result = await session.execute(stmt)
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="no access",
         ) from None
     await session.commit()
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="there is no such user in the team",
+        ) from None
+    await publish_event(comrade_id, EventType.MEMBER_EXCLUDED, team_id, comrade_id)
     return ResponseSchema(
         status_code=status.HTTP_200_OK,
         detail="comrade excluded",
     )
+
+
+async def archive_expired_teams(
+    session: AsyncSession,
+    today: datetime.date | None = None,
+    batch_size: int = settings.TEAM_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Перенос в архив пачки команд, срок набора в которые истек, вместе c тегами,
+    участниками и заявками. Сообщения чата не архивируются и удаляются вместе c командой.
+    Возвращает число перенесенных команд.
+    """
+    query = (
+        select(Team.id)
+        .where(Team.team_deadline_at < (today or datetime.date.today()))
+        .order_by(Team.team_deadline_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    team_ids = (await session.execute(query)).scalars().all()
+    if not team_ids:
+        return 0
+
+    archived_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    team_columns = [column.name for column in Team.__table__.columns]
+    await session.execute(
+        insert(TeamArchive).from_select(
+            [*team_columns, "archived_at"],
+            select(*Team.__table__.columns, literal(archived_at, DateTime)).where(Team.id.in_(team_ids)),
+        ),
+    )
+    await session.execute(
+        insert(TeamTagsArchive).from_select(
+            ["team_id", *TeamTagsSchema.model_fields],
+            select(TeamTags.team_id, *(TeamTags.__table__.c[tag] for tag in TeamTagsSchema.model_fields))
+            .where(TeamTags.team_id.in_(team_ids)),
+        ),
+    )
+    await session.execute(
+        insert(team_members_archive_table).from_select(
+            ["user_id", "team_id"],
+            select(team_members_table).where(team_members_table.c.team_id.in_(team_ids)),
+        ),
+    )
+    await session.execute(
+        insert(application_to_join_archive_table).from_select(
+            ["user_id", "team_id", "cover_letter"],
+            select(application_to_join_table).where(application_to_join_table.c.team_id.in_(team_ids)),
+        ),
+    )
+    await session.execute(delete(Team).where(Team.id.in_(team_ids)))
+    await session.commit()
+    return len(team_ids)
+
+
+async def get_archived_teams(
+    user: UserSchema,
+    session: AsyncSession,
+) -> list[ArchivedTeamSchema]:
+    """Получение архивных команд пользователя."""
+    query = (
+        select(TeamArchive, TeamTagsArchive)
+        .outerjoin(TeamTagsArchive, TeamTagsArchive.team_id == TeamArchive.id)
+        .where(TeamArchive.owner == user.id)
+        .order_by(TeamArchive.archived_at.desc())
+    )
+    teams = (await session.execute(query)).all()
+
+    members = defaultdict(list)
+    if teams:
+        query = select(team_members_archive_table).where(
+            team_members_archive_table.c.team_id.in_([team.id for team, _ in teams]),
+        )
+        for user_id, team_id in await session.execute(query):
+            members[team_id].append(user_id)
+
+    return [
+        ArchivedTeamSchema(
+            id=team.id,
+            owner=team.owner,
+            title=team.title,
+            type_team=team.type_team,
+            number_of_members=team.number_of_members,
+            team_description=team.team_description,
+            team_deadline_at=team.team_deadline_at,
+            team_city=team.team_city,
+            created_at=team.created_at,
+            updated_at=team.updated_at,
+            archived_at=team.archived_at,
+            members=members[team.id],
+            tags=TeamTagsSchema(**{tag: getattr(tags, tag, None) for tag in TeamTagsSchema.model_fields}),
+        )
+        for team, tags in teams
+    ]
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String, Table
+from sqlalchemy import Column, ForeignKey, Index, String, Table
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -11,6 +11,7 @@ team_members_table = Table(
     Base.metadata,
     Column("user_id", ForeignKey("auth_user.id", ondelete="CASCADE"), primary_key=True),
     Column("team_id", ForeignKey("team.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_team_members_team", "team_id"),
 )
 
 application_to_join_table = Table(
@@ -19,6 +20,7 @@ application_to_join_table = Table(
     Column("user_id", ForeignKey("auth_user.id", ondelete="CASCADE"), primary_key=True),
     Column("team_id", ForeignKey("team.id", ondelete="CASCADE"), primary_key=True),
     Column("cover_letter", String, nullable=True),
+    Index("ix_application_to_join_team", "team_id"),
 )
 
 
@@ -43,6 +45,7 @@ class Team(Base):
     team_deadline_at: Mapped[datetime.date] = mapped_column(
         nullable=False,
         default=datetime.date.today,
+        index=True,
     )
 
     team_city: Mapped[str] = mapped_column(nullable=False, default="Интернет")
@@ -83,3 +86,61 @@ class TeamTags(Base):
     tag5: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
     tag6: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
     tag7: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+
+
+"""
+Архив команд, срок набора в которые истек.
+Команды переносятся сюда фоновой задачей вместе c тегами, участниками и заявками,
+чтобы рабочие таблицы и списки содержали только активные команды.
+"""
+team_members_archive_table = Table(
+    "team_members_archive",
+    Base.metadata,
+    Column("user_id", ForeignKey("auth_user.id", ondelete="CASCADE"), primary_key=True),
+    Column("team_id", ForeignKey("team_archive.id", ondelete="CASCADE"), primary_key=True),
+)
+
+application_to_join_archive_table = Table(
+    "application_to_join_archive",
+    Base.metadata,
+    Column("user_id", ForeignKey("auth_user.id", ondelete="CASCADE"), primary_key=True),
+    Column("team_id", ForeignKey("team_archive.id", ondelete="CASCADE"), primary_key=True),
+    Column("cover_letter", String, nullable=True),
+)
+
+
+class TeamArchive(Base):
+    """Модель архивной команды"""
+    __tablename__ = "team_archive"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    owner: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("auth_user.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    title: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    type_team: Mapped[str] = mapped_column(nullable=False)
+    number_of_members: Mapped[int] = mapped_column(nullable=False)
+    team_description: Mapped[str] = mapped_column(nullable=False)
+    team_deadline_at: Mapped[datetime.date] = mapped_column(nullable=False)
+    team_city: Mapped[str] = mapped_column(nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+
+
+class TeamTagsArchive(Base):
+    __tablename__ = "team_tags_archive"
+
+    team_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("team_archive.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tag1: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag2: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag3: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag4: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag5: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag6: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
+    tag7: Mapped[str] = mapped_column(String(length=50), nullable=True, default=None)
@@ -6,9 +6,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.auth_handler import current_user
 from src.auth.schemas import ResponseSchema, UserSchema
-from src.database import get_async_session
+from src.database import get_async_session, get_read_async_session
+from src.idempotency import IdempotentRequest, idempotency
 from src.team import crud
-from src.team.schemas import ApplicationSchema, CreateTeamSchema, MemberSchema
+from src.team.schemas import ApplicationSchema, ArchivedTeamSchema, CreateTeamSchema, MemberSchema, TeamSchema
 
 team_router = APIRouter(
     prefix="/team",
@@ -25,20 +26,21 @@ a также за управление командой.
 
 @team_router.post(
     "/create",
-    response_model=ResponseSchema,
+    response_model=TeamSchema,
     status_code=status.HTTP_201_CREATED,
 )
 async def create_team(
     team_data: CreateTeamSchema,
     session: Annotated[AsyncSession, Depends(get_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
-) -> ResponseSchema:
-    return await crud.create_team(team_data, session, user)
+    idempotent: Annotated[IdempotentRequest, Depends(idempotency)],
+) -> TeamSchema:
+    return await idempotent.save(await crud.create_team(team_data, session, user))
 
 
 @team_router.patch(
     "/change/{team_id}",
-    response_model=ResponseSchema,
+    response_model=TeamSchema,
     status_code=status.HTTP_200_OK,
 )
 async def update_team(
@@ -46,7 +48,7 @@ async def update_team(
     update_data: CreateTeamSchema,
     session: Annotated[AsyncSession, Depends(get_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
-) -> ResponseSchema:
+) -> TeamSchema:
     return await crud.update_team(team_id, update_data, session, user)
 
 
@@ -63,6 +65,19 @@ async def delete_team(
     return await crud.delete_team(team_id, session, user)
 
 
+@team_router.get(
+    "/archived",
+    response_model=list[ArchivedTeamSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_archived_teams(
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    user: Annotated[UserSchema, Depends(current_user)],
+) -> list[ArchivedTeamSchema]:
+    """Получение архивных команд пользователя, срок набора в которые истек."""
+    return await crud.get_archived_teams(user, session)
+
+
 @team_router.get(
     "/members_list",
     response_model=list[MemberSchema],
@@ -70,7 +85,7 @@ async def delete_team(
 )
 async def get_members(
     team_id: str,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
 ) -> list[MemberSchema]:
     """Получение списка всех заявок на вступление в команду пользователя."""
@@ -84,7 +99,7 @@ async def get_members(
 )
 async def get_applications(
     team_id: str,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
 ) -> list[ApplicationSchema]:
     """Получение списка всех заявок на вступление в команду пользователя."""
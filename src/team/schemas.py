@@ -43,6 +43,22 @@ class TeamSchema(BaseModel):
     tags: TeamTagsSchema
 
 
+class ArchivedTeamSchema(BaseModel):
+    id: uuid.UUID
+    owner: uuid.UUID
+    title: str
+    type_team: str
+    number_of_members: int
+    team_description: str
+    team_deadline_at: datetime.date
+    team_city: str
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    archived_at: datetime.datetime
+    members: list[uuid.UUID]
+    tags: TeamTagsSchema
+
+
 class MemberSchema(BaseModel):
     team_id: str | uuid.UUID
     user_id: str | uuid.UUID
@@ -0,0 +1,141 @@
+import asyncio
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import anyio
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+from src.config import settings
+from src.user_profile.thumbnails import InvalidImageError, make_thumbnails
+
+
+class AvatarProcessor:
+    """
+    Пул процессов для декодирования изображений и создания миниатюр.
+    Пул создается при первой загрузке в каждом процессе приложения,
+    поэтому обработка изображений не занимает event loop.
+    """
+
+    def __init__(self) -> None:
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def make_thumbnails(self, source: Path) -> dict[int, str]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.AVATAR_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, make_thumbnails, str(source), str(settings.MEDIA_ROOT), settings.avatar_sizes,
+            )
+        except InvalidImageError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="invalid image",
+            ) from None
+
+    async def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+avatar_processor = AvatarProcessor()
+
+
+class FilePartCollector:
+    """Колбэки парсера multipart: собирает данные части c файлом из поля field_name."""
+
+    def __init__(self, field_name: str) -> None:
+        self.field_name = field_name.encode()
+        self.found = False
+        self._header_field = b""
+        self._in_file = False
+        self._chunks: list[bytes] = []
+
+    @property
+    def callbacks(self) -> dict:
+        return {
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field = data[start:end].lower()
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        if self._header_field == b"content-disposition":
+            _, disposition = parse_options_header(data[start:end])
+            self._in_file = disposition.get(b"name") == self.field_name and b"filename" in disposition
+            self.found = self.found or self._in_file
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._chunks.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+
+def _check_upload_size(size: int) -> None:
+    if size > settings.AVATAR_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="file is too large",
+        )
+
+
+async def _write_upload(request: Request, parser: MultipartParser, collector: FilePartCollector, path: Path) -> int:
+    size = 0
+    async with await anyio.open_file(path, "wb") as file:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if data := collector.take():
+                size += len(data)
+                _check_upload_size(size)
+                await file.write(data)
+    parser.finalize()
+    return size
+
+
+async def receive_upload(request: Request, field_name: str = "file") -> Path:
+    """
+    Потоковое чтение файла из multipart-запроса во временный файл.
+    Тело читается кусками и сразу пишется на диск, в памяти держится только текущий кусок;
+    файл больше AVATAR_MAX_SIZE прерывает загрузку c ошибкой 413.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="multipart/form-data expected",
+        )
+    temp_dir = settings.MEDIA_ROOT / "tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = temp_dir / f"{uuid.uuid4()}.upload"
+    collector = FilePartCollector(field_name)
+    parser = MultipartParser(params[b"boundary"], collector.callbacks)
+    try:
+        size = await _write_upload(request, parser, collector, temp_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    if not collector.found or not size:
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file is missing",
+        )
+    return temp_path
@@ -2,16 +2,78 @@ import uuid
 from datetime import datetime, timezone
 
 from fastapi import HTTPException, Response, status
-from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy import exists, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth import crud as auth_crud
+from src.auth.crud import schedule_user_deletion
+from src.auth.deletion import account_deleter
 from src.auth.models import AuthUser
 from src.auth.schemas import ResponseSchema, UserSchema
-from src.team.models import Team, TeamTags, team_members_table
-from src.team.schemas import TeamSchema
+from src.find.crud import build_team_preview
+from src.find.models import TeamPreview
+from src.find.schemas import TeamPreviewSchema
+from src.team.models import team_members_table
 from src.user_profile.models import UserContacts, UserHobbies, UserProfile
-from src.user_profile.schemas import UpdateProfileSchema, UserContactsSchema, UserHobbiesSchema, UserProfileSchema
+from src.user_profile.schemas import (
+    AvatarSchema,
+    ProfileBatchSchema,
+    UpdateProfileSchema,
+    UserContactsSchema,
+    UserHobbiesSchema,
+    UserProfileSchema,
+)
+
+
+def build_user_profile(
+    user_profile: UserProfile,
+    result_contacts: UserContacts,
+    result_hobbies: UserHobbies,
+    username: str,
+) -> UserProfileSchema:
+    user_contacts = UserContactsSchema(
+        email=result_contacts.email,
+        vk=result_contacts.vk,
+        telegram=result_contacts.telegram,
+        discord=result_contacts.discord,
+        other=result_contacts.other,
+    )
+    user_hobbies = UserHobbiesSchema(
+        lifestyle1=result_hobbies.lifestyle1,
+        lifestyle2=result_hobbies.lifestyle2,
+        lifestyle3=result_hobbies.lifestyle3,
+        sport1=result_hobbies.sport1,
+        sport2=result_hobbies.sport2,
+        sport3=result_hobbies.sport3,
+        work1=result_hobbies.work1,
+        work2=result_hobbies.work2,
+        work3=result_hobbies.work3,
+    )
+    return UserProfileSchema(
+        id=user_profile.id,
+        user_id=user_profile.user_id,
+        username=username,
+        image_path=user_profile.image_path,
+        contacts=user_contacts,
+        description=user_profile.description,
+        hobbies=user_hobbies,
+    )
+
+
+async def get_user_profiles(
+    user_ids: list[uuid.UUID],
+    session: AsyncSession,
+) -> dict[uuid.UUID, UserProfileSchema]:
+    """Профили пользователей c контактами, увлечениями и именем одним запросом."""
+    query = (
+        select(UserProfile, UserContacts, UserHobbies, AuthUser.username)
+        .join(UserContacts, UserContacts.user_id == UserProfile.user_id)
+        .join(UserHobbies, UserHobbies.user_id == UserProfile.user_id)
+        .join(AuthUser, AuthUser.id == UserProfile.user_id)
+        .where(UserProfile.user_id.in_(user_ids))
+    )
+    result = await session.execute(query)
+    return {row[0].user_id: build_user_profile(*row) for row in result}
 
 
 async def get_user_profile(
@@ -19,44 +81,7 @@ async def get_user_profile(
     session: AsyncSession,
 ) -> UserProfileSchema | None:
     try:
-        query_for_profile = select(UserProfile).where(UserProfile.user_id == user_id)
-        result_profile = await session.execute(query_for_profile)
-        user_profile = result_profile.scalar_one_or_none()
-        if user_profile is None:
-            return None
-
-        query_for_contacts = select(UserContacts).where(UserContacts.user_id == user_id)
-        result_contacts = (await session.execute(query_for_contacts)).scalar_one_or_none()
-        user_contacts = UserContactsSchema(
-            email=result_contacts.email,
-            vk=result_contacts.vk,
-            telegram=result_contacts.telegram,
-            discord=result_contacts.discord,
-            other=result_contacts.other,
-        )
-        query_for_hobbies = select(UserHobbies).where(UserHobbies.user_id == user_id)
-        result_hobbies = (await session.execute(query_for_hobbies)).scalar_one_or_none()
-        user_hobbies = UserHobbiesSchema(
-            lifestyle1=result_hobbies.lifestyle1,
-            lifestyle2=result_hobbies.lifestyle2,
-            lifestyle3=result_hobbies.lifestyle3,
-            sport1=result_hobbies.sport1,
-            sport2=result_hobbies.sport2,
-            sport3=result_hobbies.sport3,
-            work1=result_hobbies.work1,
-            work2=result_hobbies.work2,
-            work3=result_hobbies.work3,
-        )
-        username = (await auth_crud.get_user_by_id(user_id, session)).username
-        return UserProfileSchema(
-            id=user_profile.id,
-            user_id=user_profile.user_id,
-            username=username,
-            image_path=user_profile.image_path,
-            contacts=user_contacts,
-            description=user_profile.description,
-            hobbies=user_hobbies,
-        )
+        return (await get_user_profiles([user_id], session)).get(user_id)
     except Exception:  # noqa: BLE001
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -64,6 +89,67 @@ async def get_user_profile(
         ) from None
 
 
+async def get_profiles_data(
+    user_ids: list[uuid.UUID],
+    session: AsyncSession,
+) -> ProfileBatchSchema:
+    """Получение нескольких профилей, отсутствующие профили перечисляются в missing."""
+    profiles = await get_user_profiles(user_ids, session)
+    return ProfileBatchSchema(
+        profiles=[profiles[user_id] for user_id in user_ids if user_id in profiles],
+        missing=[user_id for user_id in user_ids if user_id not in profiles],
+    )
+
+
+async def get_user_profiles_fields(
+    user_ids: list[uuid.UUID],
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> dict[uuid.UUID, dict]:
+    """
+    Профили пользователей только c выбранными полями.
+    Контакты, увлечения и имя присоединяются к запросу, только если они запрошены.
+    """
+    related = {"contacts": (UserContacts, UserContactsSchema), "hobbies": (UserHobbies, UserHobbiesSchema)}
+    query = select(UserProfile.user_id).where(UserProfile.user_id.in_(user_ids))
+    for field in fields:
+        if field in related:
+            model, schema = related[field]
+            query = (
+                query.add_columns(*(getattr(model, name) for name in schema.model_fields))
+                .join(model, model.user_id == UserProfile.user_id)
+            )
+        elif field == "username":
+            query = query.add_columns(AuthUser.username).join(AuthUser, AuthUser.id == UserProfile.user_id)
+        else:
+            query = query.add_columns(getattr(UserProfile, field))
+    profiles = {}
+    for user_id, *row in await session.execute(query):
+        values = iter(row)
+        profile_data = {}
+        for field in fields:
+            if field in related:
+                schema = related[field][1]
+                profile_data[field] = schema(**{name: next(values) for name in schema.model_fields})
+            else:
+                profile_data[field] = next(values)
+        profiles[user_id] = profile_data
+    return profiles
+
+
+async def get_profiles_data_fields(
+    user_ids: list[uuid.UUID],
+    fields: tuple[str, ...],
+    session: AsyncSession,
+) -> dict:
+    """Получение выбранных полей нескольких профилей, отсутствующие профили перечисляются в missing."""
+    profiles = await get_user_profiles_fields(user_ids, fields, session)
+    return {
+        "profiles": [profiles[user_id] for user_id in user_ids if user_id in profiles],
+        "missing": [user_id for user_id in user_ids if user_id not in profiles],
+    }
+
+
 async def create_user_profile(
     user: UserSchema,
     session: AsyncSession,
@@ -98,132 +184,123 @@ async def change_user_profile(
     user: UserSchema,
     session: AsyncSession,
 ) -> ResponseSchema:
-    from src.auth.crud import get_user
-
-    user_data = await get_user(updated_data.username, session)
-    if user_data and user_data.id != user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="user with that name already exists",
+    """
+    Частичное изменение профиля одним запросом.
+    Записываются только переданные поля и только в тех таблицах, где значения действительно
+    отличаются; updated_at пользователя меняется, только если что-то изменилось.
+    Занятое имя пользователя определяется по уникальному индексу.
+    """
+    data = {key: value for key, value in updated_data.model_dump(exclude_unset=True).items() if value is not None}
+    sections = {
+        UserProfile: {key: data[key] for key in ("image_path", "description") if key in data},
+        UserContacts: data.get("contacts", {}),
+        UserHobbies: data.get("hobbies", {}),
+    }
+    changed = []
+    for model, values in sections.items():
+        if values:
+            stmt = (
+                update(model)
+                .where(
+                    model.user_id == user.id,
+                    or_(*(getattr(model, key).is_distinct_from(value) for key, value in values.items())),
+                )
+                .values(values)
+                .returning(model.user_id)
+                .cte(f"{model.__tablename__}_update")
+            )
+            changed.append(exists(stmt.select()))
+    user_values = {"updated_at": datetime.now(timezone.utc).replace(tzinfo=None)}
+    if "username" in data:
+        user_values["username"] = data["username"]
+        changed.append(AuthUser.username != data["username"])
+    if changed:
+        stmt_user = (
+            update(AuthUser)
+            .where(AuthUser.id == user.id, or_(*changed))
+            .values(user_values)
+            .returning(AuthUser.id)
+            .cte("auth_user_update")
         )
-    stmt_user = update(AuthUser).values({
-        "username": updated_data.username,
-        "updated_at": datetime.now(timezone.utc).replace(tzinfo=None),
-    }).where(
-        AuthUser.id == user.id,
-    )
-    stmt_profile = update(UserProfile).values({
-        "image_path": updated_data.image_path,
-        "description": updated_data.description,
-    }).where(and_(
-        UserProfile.user_id == user.id,
-    ))
-    stmt_contacts = update(UserContacts).values({
-        "vk": updated_data.contacts.vk,
-        "telegram": updated_data.contacts.telegram,
-        "discord": updated_data.contacts.discord,
-        "other": updated_data.contacts.other,
-    }).where(and_(
-        UserContacts.user_id == user.id,
-    ))
-    stmt_hobbies = update(UserHobbies).values({
-        "lifestyle1": updated_data.hobbies.lifestyle1,
-        "lifestyle2": updated_data.hobbies.lifestyle2,
-        "lifestyle3": updated_data.hobbies.lifestyle3,
-        "sport1": updated_data.hobbies.sport1,
-        "sport2": updated_data.hobbies.sport2,
-        "sport3": updated_data.hobbies.sport3,
-        "work1": updated_data.hobbies.work1,
-        "work2": updated_data.hobbies.work2,
-        "work3": updated_data.hobbies.work3,
-    }).where(and_(
-        UserHobbies.user_id == user.id,
-    ))
-    await session.execute(stmt_user)
-    await session.execute(stmt_profile)
-    await session.execute(stmt_contacts)
-    await session.execute(stmt_hobbies)
-    await session.commit()
+        try:
+            await session.execute(select(stmt_user.c.id))
+            await session.commit()
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="user with that name already exists",
+            ) from None
     return ResponseSchema(
         status_code=status.HTTP_200_OK,
         detail="profile is updated",
     )
 
 
+async def update_avatar(
+    thumbnails: dict[int, str],
+    user: UserSchema,
+    session: AsyncSession,
+) -> AvatarSchema:
+    """Замена аватара одним UPDATE, когда все миниатюры уже записаны на диск."""
+    image_path = thumbnails[max(thumbnails)]
+    stmt = update(UserProfile).values({"image_path": image_path}).where(UserProfile.user_id == user.id)
+    await session.execute(stmt)
+    await session.commit()
+    return AvatarSchema(image_path=image_path, thumbnails=thumbnails)
+
+
 async def delete_user_profile(
     user: UserSchema,
     session: AsyncSession,
     response: Response,
 ) -> ResponseSchema:
+    """
+    Удаление аккаунта: вход запрещается сразу, токены отзываются,
+    a данные пользователя и его команд удаляет фоновая задача.
+    """
     user_profile = await get_user_profile(user.id, session)
     if user_profile is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="there is no such user or profile",
         )
-    stmt_profile = delete(UserProfile).where(
-        and_(UserProfile.id == user_profile.id, UserProfile.user_id == user.id),
-    )
-    stmt_user = delete(AuthUser).where(AuthUser.id == user.id)
-    stmt_contacts = delete(UserContacts).where(UserContacts.user_id == user.id)
-    stmt_hobbies = delete(UserHobbies).where(UserHobbies.user_id == user.id)
-    await session.execute(stmt_contacts)
-    await session.execute(stmt_hobbies)
-    await session.execute(stmt_profile)
-    await session.execute(stmt_user)
-    await session.commit()
+    await schedule_user_deletion(user.id, session)
 
     from src.auth.auth_handler import AuthHandler
+    await AuthHandler.revoke_all_refresh_tokens(user.id)
     AuthHandler.delete_all_tokens(response)
+    account_deleter.wake()
 
     return ResponseSchema(
-        status_code=status.HTTP_200_OK,
-        detail="user and his profile deleted",
+        status_code=status.HTTP_202_ACCEPTED,
+        detail="user deletion scheduled",
     )
 
 
 async def get_teams_where_user_is_on(
     user_id: uuid.UUID,
     session: AsyncSession,
-) -> list[TeamSchema]:
+) -> list[TeamPreviewSchema]:
     """Получение команд, в которых состоит пользователь."""
-    query = select(team_members_table).where(team_members_table.c.user_id == user_id)
-    team_list = (await session.execute(query)).all()
-    teams = []
-    for _, team_id in team_list:
-        query = (
-            select(Team)
-            .where(Team.id == team_id)
-        )
-        team = (await session.execute(query)).scalar_one_or_none()
-        teams.append(team)
-    for team in teams:
-        query_for_tags = (
-            select(TeamTags)
-            .where(TeamTags.team_id == team.id)
-        )
-        res = await session.execute(query_for_tags)
-        team_tags = res.unique().scalar_one_or_none()
-        team.tags = team_tags
-    return teams
+    query = (
+        select(TeamPreview)
+        .join(team_members_table, team_members_table.c.team_id == TeamPreview.team_id)
+        .where(team_members_table.c.user_id == user_id)
+        .order_by(TeamPreview.team_deadline_at, TeamPreview.team_id)
+    )
+    result = await session.execute(query)
+    return [build_team_preview(preview) for preview in result.scalars()]
 
 
 async def get_user_teams(
     user_id: uuid.UUID,
     session: AsyncSession,
-) -> list[TeamSchema]:
+) -> list[TeamPreviewSchema]:
     """Получение команд пользователя."""
     query = (
-        select(Team)
-        .where(Team.owner == user_id)
+        select(TeamPreview)
+        .where(TeamPreview.owner == user_id)
+        .order_by(TeamPreview.team_deadline_at, TeamPreview.team_id)
     )
-    teams = (await session.execute(query)).scalars().all()
-    for team in teams:
-        query_for_tags = (
-            select(TeamTags)
-            .where(TeamTags.team_id == team.id)
-        )
-        res = await session.execute(query_for_tags)
-        team_tags = res.unique().scalar_one_or_none()
-        team.tags = team_tags
-    return teams
+    result = await session.execute(query)
+    return [build_team_preview(preview) for preview in result.scalars()]
@@ -10,7 +10,11 @@ class UserProfile(Base):
     """Модель профиля"""
     __tablename__ = "user_profile"
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("auth_user.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("auth_user.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     image_path: Mapped[str] = mapped_column(nullable=True)
     description: Mapped[str] = mapped_column(nullable=False)
 
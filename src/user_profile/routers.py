@@ -1,15 +1,19 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.auth_handler import current_user
 from src.auth.schemas import ResponseSchema, UserSchema
-from src.database import get_async_session
+from src.config import settings
+from src.database import get_async_session, get_read_async_session
+from src.fieldsets import fields_response, fieldset
 from src.find.schemas import TeamPreviewSchema
 from src.user_profile import crud
-from src.user_profile.schemas import UpdateProfileSchema, UserProfileSchema
+from src.user_profile.avatars import avatar_processor, receive_upload
+from src.user_profile.schemas import AvatarSchema, ProfileBatchSchema, UpdateProfileSchema, UserProfileSchema
 
 profile_router = APIRouter(
     prefix="/profile",
@@ -25,7 +29,7 @@ profile_router = APIRouter(
     status_code=status.HTTP_200_OK,
 )
 async def get_teams_i_am_on(
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
 ) -> list[TeamPreviewSchema]:
     """Получение списка команд, в которых состоит пользователь."""
@@ -38,13 +42,34 @@ async def get_teams_i_am_on(
     status_code=status.HTTP_200_OK,
 )
 async def get_my_teams(
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
     user: Annotated[UserSchema, Depends(current_user)],
 ) -> list[TeamPreviewSchema]:
     """Получение команд пользователя."""
     return await crud.get_user_teams(user.id, session)
 
 
+@profile_router.get(
+    "/batch",
+    response_model=ProfileBatchSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def profiles(
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
+    _: Annotated[UserSchema, Depends(current_user)],
+    fields: Annotated[tuple[str, ...] | None, Depends(fieldset(UserProfileSchema))],
+    ids: Annotated[list[uuid.UUID] | None, Query(max_length=settings.BATCH_MAX_IDS)] = None,
+) -> ProfileBatchSchema | JSONResponse:
+    """
+    Данные нескольких профилей за один запрос: /profile/batch?ids=<user_id>&ids=<user_id>.
+    Профили, которых нет, перечисляются в missing.
+    """
+    user_ids = list(dict.fromkeys(ids or []))
+    if fields:
+        return fields_response(await crud.get_profiles_data_fields(user_ids, fields, session))
+    return await crud.get_profiles_data(user_ids, session)
+
+
 @profile_router.get(
     "/{user_id}",
     response_model=UserProfileSchema,
@@ -52,16 +77,21 @@ async def get_my_teams(
 )
 async def profile(
     user_id: uuid.UUID,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
+    session: Annotated[AsyncSession, Depends(get_read_async_session)],
     _: Annotated[UserSchema, Depends(current_user)],
-) -> UserProfileSchema:
-    """Получение данных профиля пользователя."""
-    if (user_profile := await crud.get_user_profile(user_id, session)) is None:
+    fields: Annotated[tuple[str, ...] | None, Depends(fieldset(UserProfileSchema))],
+) -> UserProfileSchema | JSONResponse:
+    """Получение данных профиля пользователя, c fields=username,image_path - только перечисленных полей."""
+    if fields:
+        user_profile = (await crud.get_user_profiles_fields([user_id], fields, session)).get(user_id)
+    else:
+        user_profile = await crud.get_user_profile(user_id, session)
+    if user_profile is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="there is no such profile",
         )
-    return user_profile
+    return fields_response(user_profile) if fields else user_profile
 
 
 @profile_router.patch(
@@ -78,10 +108,39 @@ async def change_profile(
     return await crud.change_user_profile(updated_data, user, session)
 
 
+@profile_router.post(
+    "/avatar",
+    response_model=AvatarSchema,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={"requestBody": {"content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "properties": {"file": {"type": "string", "format": "binary"}},
+        "required": ["file"],
+    }}}}},
+)
+async def upload_avatar(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    user: Annotated[UserSchema, Depends(current_user)],
+) -> AvatarSchema:
+    """
+    Загрузка аватара: multipart/form-data c полем file, сохраняются миниатюры AVATAR_SIZES.
+    Соединение, взятое для проверки пользователя, возвращается в пул до приема файла
+    и берется снова только для короткого UPDATE.
+    """
+    await session.close()
+    source = await receive_upload(request)
+    try:
+        thumbnails = await avatar_processor.make_thumbnails(source)
+    finally:
+        source.unlink(missing_ok=True)
+    return await crud.update_avatar(thumbnails, user, session)
+
+
 @profile_router.delete(
     "/delete",
     response_model=ResponseSchema,
-    status_code=status.HTTP_200_OK,
+    status_code=status.HTTP_202_ACCEPTED,
 )
 async def delete_profile(
     session: Annotated[AsyncSession, Depends(get_async_session)],
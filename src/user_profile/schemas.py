@@ -36,9 +36,19 @@ class UserProfileSchema(BaseModel):
     hobbies: UserHobbiesSchema
 
 
-class UpdateProfileSchema(BaseModel):
-    username: str
+class ProfileBatchSchema(BaseModel):
+    profiles: list[UserProfileSchema]
+    missing: list[uuid.UUID]
+
+
+class AvatarSchema(BaseModel):
     image_path: str
-    contacts: UserContactsWithoutEmailSchema
-    description: str
-    hobbies: UserHobbiesSchema
+    thumbnails: dict[int, str]
+
+
+class UpdateProfileSchema(BaseModel):
+    username: str | None = None
+    image_path: str | None = None
+    contacts: UserContactsWithoutEmailSchema | None = None
+    description: str | None = None
+    hobbies: UserHobbiesSchema | None = None
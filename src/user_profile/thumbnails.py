@@ -0,0 +1,44 @@
+import hashlib
+import os
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+"""
+Обработка изображений в отдельном процессе.
+
+Модуль не импортирует настройки и модели, чтобы процессы пула запускались быстро.
+"""
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+def make_thumbnails(source: str, media_root: str, sizes: tuple[int, ...]) -> dict[int, str]:
+    """
+    Декодирование изображения и создание квадратных миниатюр в формате WebP.
+    Миниатюры сохраняются по хэшу содержимого: avatars/<2 символа хэша>/<хэш>.webp,
+    одинаковые миниатюры хранятся один раз. Возвращает пути относительно media_root.
+    """
+    try:
+        with Image.open(source) as original:
+            if original.format not in ALLOWED_FORMATS:
+                raise InvalidImageError
+            image = ImageOps.exif_transpose(original).convert("RGB")
+    except (OSError, Image.DecompressionBombError) as error:
+        raise InvalidImageError from error
+    thumbnails = {}
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        temp_path = Path(media_root) / "tmp" / f"{os.getpid()}-{size}.webp"
+        thumbnail.save(temp_path, "WEBP", quality=85)
+        digest = hashlib.sha256(temp_path.read_bytes()).hexdigest()
+        relative_path = f"avatars/{digest[:2]}/{digest}.webp"
+        target = Path(media_root) / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.replace(target)
+        thumbnails[size] = relative_path
+    return thumbnails
@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from src.config import settings
-from src.database import Base, get_async_session
+from src.database import Base, get_async_session, get_read_async_session
 from src.main import app
 
 if settings.TEST_DB_NAME:
@@ -35,6 +35,7 @@ async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 app.dependency_overrides[get_async_session] = override_get_async_session
+app.dependency_overrides[get_read_async_session] = override_get_async_session
 
 
 @pytest.fixture(autouse=True, scope="session")
@@ -4,7 +4,10 @@ from dirty_equals import IsStr, IsUUID
 from httpx import AsyncClient
 from starlette import status
 
+from src.auth.deletion import account_deleter
 from src.auth.schemas import UserSchema
+from src.team.crud import archive_expired_teams
+from tests.conftest import async_session_maker
 
 
 class TestAllFunctional:
@@ -23,7 +26,7 @@ class TestAllFunctional:
         4. Принятие заявок одним, отклонение заявки другим пользователем.
         5. Исключение пользователя из команды.
         6. Повторная заявка и прием пользователя в команду c последующим самостоятельным выходом из нее пользователя.
-        7. Изменение данных и удаление команды.
+        7. Изменение данных и удаление команды, архивация команды c истекшим сроком.
         8. Изменение и удаление профиля пользователя.
         """
 
@@ -58,7 +61,7 @@ class TestAllFunctional:
             "type_team": "lifestyle",
             "number_of_members": 8,
             "team_description": "First test team/",
-            "team_deadline_at": "2012-12-12",
+            "team_deadline_at": "2099-12-12",
             "team_city": "Интернет",
             "tags": {
                 "tag1": "test1",
@@ -74,13 +77,31 @@ class TestAllFunctional:
             "/team/create",
             json=team_data_1,
             cookies=user_1_cookies,
+            headers={"Idempotency-Key": "create-test-team-1"},
         )
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.json() == {
-            "status_code": 201,
-            "detail": "team created",
+        created_team_1 = response.json()
+        assert created_team_1 == {
+            "id": IsUUID,
+            "owner": str(register_user_1.id),
+            "owner_name": register_user_1.username,
+            **team_data_1,
+            "created_at": IsStr,
+            "updated_at": IsStr,
+            "members": [],
         }
 
+        """2.2. Повтор запроса создания команды c тем же Idempotency-Key не создает вторую команду."""
+        response = await async_client.post(
+            "/team/create",
+            json=team_data_1,
+            cookies=user_1_cookies,
+            headers={"Idempotency-Key": "create-test-team-1"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.headers["Idempotent-Replayed"] == "true"
+        assert response.json() == created_team_1
+
         """1.2. Авторизация второго пользователя."""
         user_data_2 = {
             "email": "test2",
@@ -106,13 +127,13 @@ class TestAllFunctional:
             "rstoken": response.cookies["rstoken"],
         }
 
-        """2.2. Создание команды вторым пользователем."""
+        """2.3. Создание команды вторым пользователем."""
         team_data_2 = {
             "title": "test_team_2",
             "type_team": "work",
             "number_of_members": 2,
             "team_description": "Second test team/",
-            "team_deadline_at": "2012-12-12",
+            "team_deadline_at": "2099-12-12",
             "team_city": "Интернет",
             "tags": {
                 "tag1": "test2",
@@ -130,25 +151,24 @@ class TestAllFunctional:
             cookies=user_2_cookies,
         )
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.json() == {
-            "status_code": 201,
-            "detail": "team created",
-        }
+        assert response.json()["title"] == "test_team_2"
+        assert response.json()["owner"] == str(register_user_2.id)
 
-        """2.3. Получение данных созданных команд."""
+        """2.4. Получение данных созданных команд."""
         response = await async_client.get(
             "/find/teams_list",
         )
         assert response.status_code == status.HTTP_200_OK
-        if response.json()[0]["title"] == "test_team_1":
-            team_data_1, team_data_2 = response.json()[0], response.json()[1]
-        else:
-            team_data_1, team_data_2 = response.json()[1], response.json()[2]
+        titles = [team["title"] for team in response.json()]
+        assert titles.count("test_team_1") == 1
+        teams = {team["title"]: team for team in response.json()}
+        team_data_1, team_data_2 = teams["test_team_1"], teams["test_team_2"]
         response = await async_client.get(
             f"/find/team/{team_data_1['id']}",
             cookies=user_1_cookies,
         )
         team_data_1 = response.json()
+        assert team_data_1 == created_team_1
 
         response = await async_client.get(
             f"/find/team/{team_data_2['id']}",
@@ -156,6 +176,59 @@ class TestAllFunctional:
         )
         team_data_2 = response.json()
 
+        """2.5. Получение данных нескольких команд и профилей одним запросом."""
+        missing_id = "00000000-0000-0000-0000-000000000000"
+        response = await async_client.get(
+            "/find/teams",
+            params={"ids": [team_data_1["id"], team_data_2["id"], missing_id]},
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "teams": [team_data_1, team_data_2],
+            "missing": [missing_id],
+        }
+
+        response = await async_client.get(
+            "/profile/batch",
+            params={"ids": [str(register_user_2.id), missing_id, str(register_user_1.id)]},
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [profile["username"] for profile in response.json()["profiles"]] == ["test2", "test1"]
+        assert response.json()["missing"] == [missing_id]
+
+        """2.6. Получение только выбранных полей команд и профиля."""
+        response = await async_client.get(
+            "/find/teams_list",
+            params={"fields": "id,title,team_city"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        team_fields = {"id": team_data_1["id"], "title": "test_team_1", "team_city": team_data_1["team_city"]}
+        assert team_fields in response.json()
+
+        response = await async_client.get(
+            f"/find/team/{team_data_1['id']}",
+            params={"fields": "title,members"},
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"title": team_data_1["title"], "members": team_data_1["members"]}
+
+        response = await async_client.get(
+            f"/profile/{register_user_1.id}",
+            params={"fields": "username"},
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"username": "test1"}
+
+        response = await async_client.get(
+            "/find/teams_list",
+            params={"fields": "id,password"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
         """3.1. Заявка второго пользователя на вступление в команду первого пользователя."""
         response = await async_client.post(
             "/find/join",
@@ -288,6 +361,14 @@ class TestAllFunctional:
             "detail": "comrade excluded",
         }
 
+        """5.2. Повторное исключение не найденного в команде пользователя."""
+        response = await async_client.post(
+            f"/team/exclude_comrade?comrade_id={register_user_1.id}&team_id={team_data_2['id']}",
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"detail": "there is no such user in the team"}
+
         """
         6.1. Повторная заявка и прием второго пользователя в команду первого
             c последующим самостоятельным выходом из нее пользователя.
@@ -362,16 +443,27 @@ class TestAllFunctional:
                 "tag7": None,
             },
         }
+        response = await async_client.patch(
+            f"/team/change/{team_data_2['id']}",
+            json=update_team_data,
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = await async_client.patch(
+            f"/team/change/{missing_id}",
+            json=update_team_data,
+            cookies=user_2_cookies,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
         response = await async_client.patch(
             f"/team/change/{team_data_2['id']}",
             json=update_team_data,
             cookies=user_2_cookies,
         )
         assert response.status_code == status.HTTP_200_OK
-        assert response.json() == {
-            "status_code": 200,
-            "detail": "team is updated",
-        }
+        updated_team_2 = response.json()
 
         """7.2. Проверка обновленных данных второй команды."""
         response = await async_client.get(
@@ -379,7 +471,8 @@ class TestAllFunctional:
             cookies=user_2_cookies,
         )
         assert response.status_code == status.HTTP_200_OK
-        assert response.json() == {
+        assert response.json() == updated_team_2
+        assert updated_team_2 == {
             "id": str(team_data_2["id"]),
             "owner": str(register_user_2.id),
             "owner_name": register_user_2.username,
@@ -424,6 +517,54 @@ class TestAllFunctional:
             "detail": "there is no such team",
         }
 
+        """7.5. Архивация первой команды после истечения срока набора."""
+        response = await async_client.patch(
+            f"/team/change/{team_data_1['id']}",
+            json={**team_data_1, "team_deadline_at": "2010-10-10"},
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        async with async_session_maker() as session:
+            assert await archive_expired_teams(session) == 1
+
+        response = await async_client.get(
+            "/find/teams_list",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert team_data_1["id"] not in [team["id"] for team in response.json()]
+
+        """7.6. Просмотр архивных команд владельцем."""
+        response = await async_client.get(
+            "/team/archived",
+            cookies=user_1_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {
+                "id": team_data_1["id"],
+                "owner": str(register_user_1.id),
+                "title": "test_team_1",
+                "type_team": "lifestyle",
+                "number_of_members": 8,
+                "team_description": "First test team/",
+                "team_deadline_at": "2010-10-10",
+                "team_city": "Интернет",
+                "created_at": IsStr,
+                "updated_at": IsStr,
+                "archived_at": IsStr,
+                "members": [],
+                "tags": {
+                    "tag1": "test1",
+                    "tag2": "1",
+                    "tag3": None,
+                    "tag4": None,
+                    "tag5": None,
+                    "tag6": None,
+                    "tag7": None,
+                },
+            },
+        ]
+
         """8.1. Изменение профиля пользователя."""
         update_team_data = {
             "username": "new_test_user_2_name",
@@ -490,19 +631,48 @@ class TestAllFunctional:
                 "work3": None,
             },
         }
+        profile_data = response.json()
+
+        """8.3. Частичное изменение профиля: меняется только описание."""
+        response = await async_client.patch(
+            "/profile/change",
+            json={"description": "Only description."},
+            cookies=user_2_cookies,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = await async_client.get(
+            f"/profile/{register_user_2.id}",
+            cookies=user_2_cookies,
+        )
+        assert response.json() == {**profile_data, "description": "Only description."}
 
-        """8.3. Удаление профиля пользователя."""
+        """8.4. Удаление профиля пользователя."""
         response = await async_client.delete(
             "/profile/delete",
             cookies=user_2_cookies,
         )
-        assert response.status_code == status.HTTP_200_OK
+        assert response.status_code == status.HTTP_202_ACCEPTED
         assert response.json() == {
-            "status_code": 200,
-            "detail": "user and his profile deleted",
+            "status_code": 202,
+            "detail": "user deletion scheduled",
         }
 
-        """8.4. Проверка отсутствия профиля пользователя."""
+        response = await async_client.get(
+            f"/profile/{register_user_2.id}",
+            cookies=user_2_cookies,
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await async_client.post(
+            "/auth/login",
+            json=user_data_2,
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        async with async_session_maker() as session:
+            assert await account_deleter.purge_user(register_user_2.id, session) > 0
+
+        """8.5. Проверка отсутствия профиля пользователя."""
         _ = await async_client.post(
             "/auth/login",
             json=user_data_1,
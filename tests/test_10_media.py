@@ -0,0 +1,65 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from src.compression import CompressionMiddleware
+from src.config import settings
+from src.media import media_router, parse_range
+
+
+def test_parse_range() -> None:
+    """Один диапазон байт разбирается, несколько диапазонов игнорируются, диапазон за концом файла - 416."""
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-5", 100) == (95, 99)
+    assert parse_range("bytes=0-1000", 100) == (0, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(HTTPException) as error:
+        parse_range("bytes=100-", 100)
+    assert error.value.headers == {"Content-Range": "bytes */100"}
+
+
+async def test_zerocopysend_through_compression(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Начало ответа уходит клиенту до zerocopysend и при включенном сжатии."""
+    content = b"image" * 1000
+    digest = hashlib.sha256(content).hexdigest()
+    file_path = tmp_path / "avatars" / digest[:2] / f"{digest}.webp"
+    file_path.parent.mkdir(parents=True)
+    file_path.write_bytes(content)
+    monkeypatch.setattr(settings, "MEDIA_ROOT", tmp_path)
+    monkeypatch.setattr(settings, "MEDIA_ACCEL_REDIRECT", "")
+
+    app = FastAPI()
+    app.include_router(media_router)
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    messages = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    path = f"/media/avatars/{digest[:2]}/{digest}.webp"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip, br")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    await app(scope, receive, send)
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.zerocopysend"]
+    assert messages[0]["status"] == 200
+    assert messages[1]["count"] == len(content)
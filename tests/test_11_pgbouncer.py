@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+
+from src.auth.models import AuthUser
+from src.config import settings
+from src.database import async_session_maker, create_db_engine, pgbouncer_connect_args
+
+
+def test_pgbouncer_connect_args() -> None:
+    """В режиме PgBouncer подготовленные запросы не кэшируются и получают уникальные имена."""
+    connect_args = pgbouncer_connect_args()
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert len({name_func() for _ in range(100)}) == 100
+
+
+@pytest.mark.skipif(not settings.TEST_PGBOUNCER_HOST, reason="TEST_PGBOUNCER_HOST is not set")
+async def test_queries_through_pgbouncer() -> None:
+    """
+    Параллельные транзакции c одинаковыми запросами через PgBouncer в режиме пула транзакций:
+    без уникальных имен подготовленных запросов они падают c DuplicatePreparedStatementError.
+    """
+    host, _, port = settings.TEST_PGBOUNCER_HOST.partition(":")
+    url = make_url(settings.db_url_postgresql).set(host=host, port=int(port or 6432))
+    pooled_engine = create_db_engine(url.render_as_string(hide_password=False), pgbouncer=True)
+
+    async def run_transactions(worker: int) -> list[int]:
+        results = []
+        for _ in range(20):
+            async with async_session_maker(bind=pooled_engine) as session:
+                await session.execute(select(AuthUser.id).where(AuthUser.username == f"pgbouncer-{worker}"))
+                results.append((await session.execute(text("SELECT :value"), {"value": worker})).scalar_one())
+                await session.commit()
+        return results
+
+    try:
+        results = await asyncio.gather(*(run_transactions(worker) for worker in range(20)))
+    finally:
+        await pooled_engine.dispose()
+    assert results == [[worker] * 20 for worker in range(20)]
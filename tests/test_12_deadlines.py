@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette import status
+
+from src.deadlines import RouteDeadline, pool_timeout_handler, query_canceled_handler
+
+
+class QueryCanceledError(Exception):
+    sqlstate = "57014"
+
+
+def create_app(finished: list[str], deadline: float = 0.05) -> FastAPI:
+    app = FastAPI()
+    app.add_exception_handler(DBAPIError, query_canceled_handler)
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+    @app.get("/slow", dependencies=[Depends(RouteDeadline(deadline))])
+    async def slow() -> dict:
+        await asyncio.sleep(1)
+        finished.append("slow")
+        return {}
+
+    @app.get("/fast", dependencies=[Depends(RouteDeadline(1))])
+    async def fast() -> dict:
+        finished.append("fast")
+        return {"status": "ok"}
+
+    @app.get("/statement_timeout")
+    async def statement_timeout() -> dict:
+        raise DBAPIError("SELECT pg_sleep(10)", None, QueryCanceledError())
+
+    @app.get("/pool_timeout")
+    async def pool_timeout() -> dict:
+        raise PoolTimeoutError
+
+    return app
+
+
+async def test_route_deadline() -> None:
+    """Обработка, не уложившаяся в бюджет, отменяется c ответом 504; быстрые запросы не затрагиваются."""
+    finished = []
+    async with AsyncClient(transport=ASGITransport(app=create_app(finished)), base_url="http://test") as client:
+        response = await client.get("/slow")
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert response.json() == {"detail": "request deadline exceeded"}
+
+        response = await client.get("/fast")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"status": "ok"}
+
+        assert (await client.get("/statement_timeout")).status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        response = await client.get("/pool_timeout")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+    await asyncio.sleep(0.05)
+    assert finished == ["fast"]
+
+
+async def test_route_deadline_client_disconnect() -> None:
+    """Отключение клиента отменяет обработку запроса, не дожидаясь бюджета."""
+    finished = []
+    messages = []
+    disconnect = asyncio.Event()
+
+    async def receive() -> dict:
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/slow",
+        "raw_path": b"/slow",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    request = asyncio.create_task(create_app(finished, deadline=10)(scope, receive, send))
+    await asyncio.sleep(0.01)
+    disconnect.set()
+    await asyncio.wait_for(request, 1)
+    assert finished == []
+    assert messages[0]["status"] == 499
@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.slow_queries import (
+    SlowQueryLog,
+    SlowQueryRouteMiddleware,
+    current_route,
+    is_explainable,
+    parameters_shape,
+    redact_plan,
+)
+
+
+def test_parameters_shape() -> None:
+    """В журнал попадают только типы параметров, без значений."""
+    assert parameters_shape((uuid.uuid4(), "secret", 10)) == ["UUID", "str", "int"]
+    assert parameters_shape({"email": "user@example.com"}) == {"email": "str"}
+
+
+def test_is_explainable() -> None:
+    """EXPLAIN ANALYZE снимается только для запросов, которые ничего не изменяют."""
+    assert is_explainable("SELECT team.id FROM team WHERE team.id = $1::UUID")
+    assert is_explainable("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_explainable("SELECT team.id FROM team FOR UPDATE SKIP LOCKED")
+    assert not is_explainable("WITH new_team AS (INSERT INTO team (id) VALUES ($1) RETURNING team.id) SELECT 1")
+    assert not is_explainable("DELETE FROM team WHERE team.id = $1::UUID")
+
+
+async def test_slow_query_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Медленный запрос записывается c шаблоном маршрута и формой параметров."""
+    stored = []
+
+    async def store(entry: dict, engine: object, _: object) -> None:
+        stored.append((entry, engine))
+
+    slow_query_log = SlowQueryLog(threshold_ms=100, sample_rate=0, size=10)
+    monkeypatch.setattr(slow_query_log, "_store", store)
+
+    app = FastAPI()
+    app.add_middleware(SlowQueryRouteMiddleware)
+
+    @app.get("/teams/{team_id}")
+    async def get_team(team_id: str) -> dict:
+        slow_query_log.record(None, "SELECT * FROM team WHERE id = $1", (team_id,), 0.25, executemany=False)
+        return {"route": current_route()}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/teams/1")
+    await asyncio.sleep(0)
+    assert response.json() == {"route": "GET /teams/{team_id}"}
+    [(entry, engine)] = stored
+    assert engine is None
+    assert entry["route"] == "GET /teams/{team_id}"
+    assert entry["parameters"] == ["str"]
+    assert entry["duration_ms"] == 250
+    assert current_route() is None
+
+
+def test_redact_plan() -> None:
+    """Литералы в условиях плана заменяются, имена и числа самого плана сохраняются."""
+    plan = [{"Plan": {
+        "Node Type": "Index Scan",
+        "Index Name": "ix_auth_user_email",
+        "Index Cond": "((email)::text = 'user@example.com'::text)",
+        "Total Cost": 8.3,
+        "Plans": [{"Node Type": "Seq Scan", "Filter": "((tag1)::text = 'sport'::text AND number_of_members > 10)"}],
+    }}]
+    assert redact_plan(plan) == [{"Plan": {
+        "Node Type": "Index Scan",
+        "Index Name": "ix_auth_user_email",
+        "Index Cond": "((email)::text = ?::text)",
+        "Total Cost": 8.3,
+        "Plans": [{"Node Type": "Seq Scan", "Filter": "((tag1)::text = ?::text AND number_of_members > ?)"}],
+    }}]
+
+
+def test_failed_statement_timer_is_dropped() -> None:
+    """Время запроса, завершившегося ошибкой, не остается в стеке соединения."""
+    engine = create_engine("sqlite://")
+    SlowQueryLog(threshold_ms=100, sample_rate=0, size=10).attach(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["slow_query_started_at"] == []
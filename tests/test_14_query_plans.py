@@ -0,0 +1,197 @@
+import contextlib
+import hashlib
+import json
+import uuid
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+from typing import Any
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.schemas import UserSchema
+from src.find import crud as find_crud
+from src.slow_queries import is_explainable
+from src.team import crud as team_crud
+from src.user_profile import crud as profile_crud
+from tests.conftest import async_session_maker, engine_test
+
+"""
+Регрессионные тесты планов горячих запросов.
+
+На заполненной БД для каждого запроса горячих эндпоинтов снимается EXPLAIN:
+тест падает, если план читает большую таблицу последовательным сканированием
+или его оценочная стоимость выше бюджета, - например, после миграции,
+удалившей индекс.
+"""
+
+USERS = 5000
+TEAMS = 5000
+MEMBERS_PER_TEAM = 4
+APPLICATIONS_PER_TEAM = 2
+"""Таблицы от стольких строк считаются большими: Seq Scan по ним - регрессия."""
+LARGE_TABLE_ROWS = 1000
+"""Бюджет оценочной стоимости одного запроса для выборки по ключу и для списка активных команд."""
+POINT_COST_BUDGET = 150
+LIST_COST_BUDGET = 2000
+
+SEED_STATEMENTS = (
+    f"""
+    INSERT INTO auth_user (id, username, email, hashed_password, verified, created_at, updated_at)
+    SELECT md5('plan-user-' || i)::uuid, 'plan-user-' || i, 'plan-user-' || i || '@example.com',
+           '\\x00'::bytea, true, now(), now()
+    FROM generate_series(1, {USERS}) AS i
+    """,
+    f"""
+    INSERT INTO team (id, owner, title, type_team, number_of_members, team_description,
+                      team_deadline_at, team_city, created_at, updated_at)
+    SELECT md5('plan-team-' || i)::uuid, md5('plan-user-' || (i % {USERS} + 1))::uuid, 'plan-team-' || i,
+           'sport', 10, 'description', current_date + (i % 90 + 1), 'Интернет', now(), now()
+    FROM generate_series(1, {TEAMS}) AS i
+    """,
+    f"""
+    INSERT INTO team_tags (id, team_id, tag1, tag2)
+    SELECT md5('plan-tags-' || i)::uuid, md5('plan-team-' || i)::uuid, 'football', 'running'
+    FROM generate_series(1, {TEAMS}) AS i
+    """,
+    f"""
+    INSERT INTO team_members (user_id, team_id)
+    SELECT md5('plan-user-' || ((i + j) % {USERS} + 1))::uuid, md5('plan-team-' || i)::uuid
+    FROM generate_series(1, {TEAMS}) AS i, generate_series(1, {MEMBERS_PER_TEAM}) AS j
+    """,
+    f"""
+    INSERT INTO application_to_join (user_id, team_id, cover_letter)
+    SELECT md5('plan-user-' || ((i + {MEMBERS_PER_TEAM} + j) % {USERS} + 1))::uuid, md5('plan-team-' || i)::uuid,
+           'cover letter'
+    FROM generate_series(1, {TEAMS}) AS i, generate_series(1, {APPLICATIONS_PER_TEAM}) AS j
+    """,
+    f"""
+    INSERT INTO user_profile (id, user_id, description)
+    SELECT md5('plan-profile-' || i)::uuid, md5('plan-user-' || i)::uuid, 'description'
+    FROM generate_series(1, {USERS}) AS i
+    """,
+    f"""
+    INSERT INTO user_contact (id, user_id, email)
+    SELECT md5('plan-contact-' || i)::uuid, md5('plan-user-' || i)::uuid, 'plan-user-' || i || '@example.com'
+    FROM generate_series(1, {USERS}) AS i
+    """,
+    f"""
+    INSERT INTO user_hobbies (id, user_id, sport1)
+    SELECT md5('plan-hobbies-' || i)::uuid, md5('plan-user-' || i)::uuid, 'football'
+    FROM generate_series(1, {USERS}) AS i
+    """,
+)
+
+
+def seed_id(name: str) -> uuid.UUID:
+    """Идентификатор строки, заполненной запросом md5('plan-...')::uuid."""
+    return uuid.UUID(hashlib.md5(name.encode()).hexdigest())
+
+
+@pytest.fixture()
+async def plan_dataset() -> AsyncGenerator[dict, None]:
+    async with engine_test.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement))
+        await conn.execute(text("ANALYZE"))
+    owner_number = 1 % USERS + 1
+    yield {
+        "team_id": seed_id("plan-team-1"),
+        "owner": UserSchema(
+            id=seed_id(f"plan-user-{owner_number}"),
+            username=f"plan-user-{owner_number}",
+            email=f"plan-user-{owner_number}@example.com",
+            verified=True,
+        ),
+    }
+    async with engine_test.begin() as conn:
+        await conn.execute(text("DELETE FROM auth_user WHERE username LIKE 'plan-user-%'"))
+
+
+@contextlib.contextmanager
+def captured_statements() -> Generator[list[tuple[str, Any]], None, None]:
+    """Запросы, выполненные тестовым движком внутри блока, c параметрами."""
+    statements = []
+
+    def capture(_conn: Any, _cursor: Any, statement: str, parameters: Any, _context: Any, _executemany: bool) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", capture)
+
+
+def plan_nodes(node: dict) -> Generator[dict, None, None]:
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def plan_problems(plan: dict, large_tables: set[str], allowed_seq_scans: set[str], cost_budget: float) -> list[str]:
+    problems = []
+    if (cost := plan["Total Cost"]) > cost_budget:
+        problems.append(f"estimated cost {cost} is above budget {cost_budget}")
+    for node in plan_nodes(plan):
+        table = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and table in large_tables and table not in allowed_seq_scans:
+            problems.append(f"Seq Scan on {table}")
+    return problems
+
+
+"""Горячие запросы: функция crud, бюджет стоимости и таблицы, которые она по смыслу читает целиком."""
+HOT_QUERIES: dict[str, tuple[Callable[[AsyncSession, dict], Awaitable], float, set[str]]] = {
+    "get_teams_list": (
+        lambda session, _: find_crud.get_teams_list(session),
+        LIST_COST_BUDGET,
+        {"team_preview"},
+    ),
+    "get_team_data": (
+        lambda session, data: find_crud.get_team_data(data["team_id"], session),
+        POINT_COST_BUDGET,
+        set(),
+    ),
+    "get_members_list": (
+        lambda session, data: team_crud.get_members_list(str(data["team_id"]), data["owner"], session),
+        POINT_COST_BUDGET,
+        set(),
+    ),
+    "get_application_list": (
+        lambda session, data: team_crud.get_application_list(str(data["team_id"]), data["owner"], session),
+        POINT_COST_BUDGET,
+        set(),
+    ),
+    "get_user_profile": (
+        lambda session, data: profile_crud.get_user_profile(data["owner"].id, session),
+        POINT_COST_BUDGET,
+        set(),
+    ),
+}
+
+
+async def test_hot_query_plans(plan_dataset: dict) -> None:
+    """Горячие запросы на большой БД используют индексы и укладываются в бюджет стоимости."""
+    async with engine_test.connect() as conn:
+        large_tables = set((await conn.execute(
+            text("SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= :rows"),
+            {"rows": LARGE_TABLE_ROWS},
+        )).scalars())
+    assert {"team", "team_members", "application_to_join", "user_profile"} <= large_tables
+
+    problems = {}
+    for name, (run_query, cost_budget, allowed_seq_scans) in HOT_QUERIES.items():
+        with captured_statements() as statements:
+            async with async_session_maker() as session:
+                assert await run_query(session, plan_dataset)
+        assert statements, name
+        async with engine_test.connect() as conn:
+            for statement, parameters in statements:
+                if not is_explainable(statement):
+                    continue
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar_one()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                if found := plan_problems(plan, large_tables, allowed_seq_scans, cost_budget):
+                    problems.setdefault(name, []).append({"statement": statement, "problems": found})
+    assert not problems, json.dumps(problems, indent=2, ensure_ascii=False)
@@ -0,0 +1,129 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.chat import crud
+from src.chat import utils as chat_utils
+from src.chat.schemas import ChatMessageSchema
+from src.chat.utils import ChatPersister
+from src.redis_client import redis_manager
+
+
+class FakeStreamClient:
+    def __init__(self, deliveries: dict[str, int]) -> None:
+        self.deliveries = deliveries
+        self.acked = []
+
+    async def xpending_range(self, *_: object) -> list[dict]:
+        return [
+            {"message_id": entry_id, "times_delivered": times_delivered}
+            for entry_id, times_delivered in self.deliveries.items()
+        ]
+
+    async def xack(self, _stream: str, _group: str, *entry_ids: str) -> int:
+        self.acked.extend(entry_ids)
+        return len(entry_ids)
+
+
+class _NullSession:
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+
+def make_entry(entry_id: str, team_id: uuid.UUID) -> tuple[str, dict]:
+    message = ChatMessageSchema(
+        id=uuid.uuid4(),
+        team_id=team_id,
+        user_id=uuid.uuid4(),
+        username="user",
+        text="text",
+        created_at=datetime.datetime(2024, 1, 1),
+    )
+    return entry_id, {"team_id": str(team_id), "data": message.model_dump_json()}
+
+
+async def test_poison_messages_do_not_block_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Сообщение c неверными данными или удаленной командой подтверждается и отбрасывается,
+    остальные сообщения пачки записываются; сообщение c временной ошибкой повторяется
+    до max_deliveries попыток.
+    """
+    deleted_team, broken_team, team = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    entries = [
+        make_entry("1-0", team),
+        ("2-0", {"team_id": str(team), "data": "{"}),
+        make_entry("3-0", deleted_team),
+        make_entry("4-0", broken_team),
+        ("5-0", {}),
+    ]
+    client = FakeStreamClient({"4-0": 1})
+    saved = []
+
+    async def save_messages(messages: list[ChatMessageSchema], _: object) -> None:
+        if len(messages) > 1 or messages[0].team_id == deleted_team:
+            raise IntegrityError("INSERT INTO chat_message", None, Exception("foreign key violation"))
+        if messages[0].team_id == broken_team:
+            raise ConnectionError
+        saved.extend(messages)
+
+    async def read_batch(_: bool) -> list[tuple[str, dict]]:
+        return entries
+
+    persister = ChatPersister(batch_size=10, max_deliveries=2, claim_idle_ms=60000)
+    monkeypatch.setattr(redis_manager, "_client", client)
+    monkeypatch.setattr(crud, "save_messages", save_messages)
+    monkeypatch.setattr(chat_utils, "async_session_maker", lambda: _NullSession())
+    monkeypatch.setattr(persister, "_read_batch", read_batch)
+
+    with pytest.raises(RuntimeError):
+        await persister.persist_batch(pending=True)
+    assert [message.team_id for message in saved] == [team]
+    assert client.acked == ["1-0", "2-0", "3-0", "5-0"]
+
+    client.acked.clear()
+    client.deliveries["4-0"] = 2
+    entries[:] = [entries[3]]
+    assert await persister.persist_batch(pending=True) == 1
+    assert client.acked == ["4-0"]
+
+
+async def test_idle_entries_of_dead_consumer_are_claimed(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Сообщения, прочитанные процессом без подтверждения, записывает другой процесс,
+    а участник группы без ожидающих сообщений удаляется.
+    """
+    stream = f"test:chat:{uuid.uuid4()}"
+    monkeypatch.setattr(chat_utils, "CHAT_STREAM_KEY", stream)
+    saved = []
+
+    async def save_messages(messages: list[ChatMessageSchema], _: object) -> None:
+        saved.extend(messages)
+
+    monkeypatch.setattr(crud, "save_messages", save_messages)
+    monkeypatch.setattr(chat_utils, "async_session_maker", lambda: _NullSession())
+    client = redis_manager.client
+    dead = ChatPersister(batch_size=10, max_deliveries=2, claim_idle_ms=0)
+    dead.consumer = "dead-consumer"
+    alive = ChatPersister(batch_size=10, max_deliveries=2, claim_idle_ms=0)
+    alive.consumer = "alive-consumer"
+    try:
+        await dead._create_group()
+        team = uuid.uuid4()
+        for entry_id, fields in (make_entry("1-0", team), make_entry("2-0", team)):
+            await client.xadd(stream, fields, id=entry_id)
+        assert len(await dead._read_batch(pending=False)) == 2
+
+        assert await alive.persist_batch(pending=True) == 2
+        assert [message.team_id for message in saved] == [team, team]
+        assert (await client.xpending(stream, chat_utils.CHAT_PERSIST_GROUP))["pending"] == 0
+
+        assert await alive.remove_idle_consumers() == ["dead-consumer"]
+        consumers = await client.xinfo_consumers(stream, chat_utils.CHAT_PERSIST_GROUP)
+        assert [consumer["name"] for consumer in consumers] == ["alive-consumer"]
+    finally:
+        await client.delete(stream)
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from src.config import BASE_DIR
+
+"""
+Размер пула воркеров gunicorn.
+
+gunicorn.conf.py выполняется в отдельном интерпретаторе, как в мастер-процессе,
+затем процесс форкается так же, как при запуске воркера, и воркер импортирует настройки.
+"""
+
+FORK_WORKER = textwrap.dedent("""
+    import os
+    import runpy
+    import sys
+    from types import SimpleNamespace
+
+    conf = runpy.run_path("gunicorn.conf.py")
+    assert "src.config" not in sys.modules
+    conf["pre_fork"](SimpleNamespace(num_workers=int(sys.argv[1])), None)
+    pid = os.fork()
+    if pid == 0:
+        from src.config import settings
+
+        print(settings.server_workers, *settings.db_pool_limits, flush=True)
+        os._exit(0)
+    os.waitpid(pid, 0)
+""")
+
+
+def run_master(workers: int, **env: str) -> subprocess.CompletedProcess:
+    environ = {name: value for name, value in os.environ.items() if name != "SERVER_WORKERS"}
+    environ.update(DB_MAX_CONNECTIONS="90", DB_POOL_SIZE="10", DB_MAX_OVERFLOW="10", **env)
+    return subprocess.run(
+        [sys.executable, "-c", FORK_WORKER, str(workers)],
+        cwd=BASE_DIR, env=environ, capture_output=True, text=True, timeout=60, check=False,
+    )
+
+
+def test_forked_worker_pool_size() -> None:
+    """Воркер видит число процессов из мастера, и пулы всех воркеров вместе укладываются в лимит."""
+    result = run_master(16)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["16", "5", "0"]
+
+    result = run_master(4)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["4", "10", "10"]
+
+
+def test_too_many_workers() -> None:
+    """Процессов больше, чем DB_MAX_CONNECTIONS, gunicorn не запускает."""
+    result = run_master(1, SERVER_WORKERS="91")
+    assert result.returncode != 0
+    assert "do not fit into DB_MAX_CONNECTIONS=90" in result.stderr
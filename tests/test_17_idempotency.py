@@ -0,0 +1,72 @@
+import asyncio
+import uuid
+from typing import Annotated
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.auth import utils as auth_utils
+from src.config import settings
+from src.idempotency import IdempotentReplay, IdempotentRequest, idempotency, idempotent_replay_handler
+
+"""Ключ Idempotency-Key на тестовом приложении c одним изменяющим эндпоинтом."""
+
+
+def make_app(calls: list[str], delay: float = 0.0) -> FastAPI:
+    router = APIRouter()
+
+    @router.post("/create", status_code=201)
+    async def create(idempotent: Annotated[IdempotentRequest, Depends(idempotency)]) -> dict:
+        calls.append("create")
+        await asyncio.sleep(delay)
+        return await idempotent.save({"number": len(calls)})
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
+    return app
+
+
+def access_token(user_id: uuid.UUID) -> str:
+    """Каждый вызов дает новый токен, как после обновления по refresh token."""
+    return auth_utils.encode_jwt({"sub": str(user_id), "type": settings.COOKIE_ACCESS_TOKEN_KEY, "jti": uuid.uuid4().hex})
+
+
+async def test_key_is_scoped_by_user_not_token() -> None:
+    """Повтор c обновленным access token получает сохраненный ответ, другой пользователь - свой."""
+    calls = []
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    user_id = uuid.uuid4()
+    async with AsyncClient(transport=ASGITransport(app=make_app(calls)), base_url="http://test") as client:
+        response = await client.post(
+            "/create", headers=key, cookies={settings.COOKIE_ACCESS_TOKEN_KEY: access_token(user_id)},
+        )
+        assert response.status_code == 201
+
+        response = await client.post(
+            "/create", headers=key, cookies={settings.COOKIE_ACCESS_TOKEN_KEY: access_token(user_id)},
+        )
+        assert response.headers["Idempotent-Replayed"] == "true"
+        assert response.json() == {"number": 1}
+
+        response = await client.post(
+            "/create", headers=key, cookies={settings.COOKIE_ACCESS_TOKEN_KEY: access_token(uuid.uuid4())},
+        )
+        assert "Idempotent-Replayed" not in response.headers
+    assert calls == ["create", "create"]
+
+
+async def test_lock_outlives_its_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Блокировка продлевается, пока запрос выполняется дольше IDEMPOTENCY_LOCK_TTL, и повтор его не выполняет."""
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_TTL", 1)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT", 10.0)
+    calls = []
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    async with AsyncClient(transport=ASGITransport(app=make_app(calls, delay=2.5)), base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/create", headers=key))
+        await asyncio.sleep(0.5)
+        retry = await client.post("/create", headers=key)
+        assert (await first).status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert calls == ["create"]
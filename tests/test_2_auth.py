@@ -1,11 +1,12 @@
 import asyncio
 
 import pytest
-from dirty_equals import IsInt, IsUUID
+from dirty_equals import IsInt, IsStr, IsUUID
 from httpx import AsyncClient
 from starlette import status
 
 from src.auth import utils as auth_utils
+from src.auth.schemas import UserSchema
 
 
 @pytest.mark.skip  # noqa: PT023
@@ -147,3 +148,109 @@ class TestAuthUser:
         assert response.json() == {
             "detail": "could not refresh access token",
         }
+
+
+class TestRefreshTokenRotation:
+    """Тесты на ротацию и отзыв refresh_token."""
+
+    async def test_refresh_token_reuse(
+            self,
+            async_client: AsyncClient,
+            register_user_1: UserSchema,
+    ) -> None:
+        """Тест - повторное использование refresh_token отзывает все семейство токенов."""
+        response = await async_client.post(
+            "/auth/login",
+            json={"email": register_user_1.email, "password": "string"},
+        )
+        first_refresh_token = response.cookies["rstoken"]
+        assert auth_utils.decode_jwt(first_refresh_token) == {
+            "sub": str(register_user_1.id),
+            "type": "rstoken",
+            "jti": IsStr,
+            "fam": IsStr,
+            "iat_us": IsInt,
+            "exp": IsInt,
+            "iat": IsInt,
+        }
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": first_refresh_token},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        second_refresh_token = response.cookies["rstoken"]
+        assert (auth_utils.decode_jwt(second_refresh_token)["fam"]
+                == auth_utils.decode_jwt(first_refresh_token)["fam"])
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": first_refresh_token},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json() == {
+            "detail": "refresh token reuse detected",
+        }
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": second_refresh_token},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_refresh_token_after_logout(
+            self,
+            async_client: AsyncClient,
+            register_user_1: UserSchema,
+    ) -> None:
+        """Тест - refresh_token недействителен после выхода пользователя."""
+        response = await async_client.post(
+            "/auth/login",
+            json={"email": register_user_1.email, "password": "string"},
+        )
+        refresh_token = response.cookies["rstoken"]
+
+        response = await async_client.get(
+            "/auth/logout",
+            cookies={"rstoken": refresh_token},
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": refresh_token},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_login_right_after_logout_all(
+            self,
+            async_client: AsyncClient,
+            register_user_1: UserSchema,
+    ) -> None:
+        """Тест - refresh_token, выданный сразу после выхода на всех устройствах, действителен."""
+        response = await async_client.post(
+            "/auth/login",
+            json={"email": register_user_1.email, "password": "string"},
+        )
+        old_refresh_token = response.cookies["rstoken"]
+        response = await async_client.get("/auth/logout_all")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = await async_client.post(
+            "/auth/login",
+            json={"email": register_user_1.email, "password": "string"},
+        )
+        refresh_token = response.cookies["rstoken"]
+        assert auth_utils.decode_jwt(refresh_token)["iat"] - auth_utils.decode_jwt(old_refresh_token)["iat"] <= 1
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": refresh_token},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = await async_client.get(
+            "/auth/refresh",
+            cookies={"rstoken": old_refresh_token},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,82 @@
+import brotli
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from src.compression import CompressionMiddleware, choose_encoding
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/teams")
+async def teams() -> list[dict]:
+    return [{"title": "test_team", "team_city": "Интернет"}] * 100
+
+
+@app.get("/team")
+async def team() -> dict:
+    return {"title": "test_team"}
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding: str, expected: str | None) -> None:
+    """Тест выбора кодировки по заголовку Accept-Encoding."""
+    assert choose_encoding(accept_encoding) == expected
+
+
+class TestCompressionMiddleware:
+    """Тесты сжатия ответов."""
+
+    async def test_compressed_response(self) -> None:
+        """Тест - большой ответ сжимается, повторный ответ отдается из кэша сжатых тел."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/teams", headers={"Accept-Encoding": "br"})
+            assert response.status_code == status.HTTP_200_OK
+            assert response.headers["content-encoding"] == "br"
+            assert response.headers["vary"] == "Accept-Encoding"
+            assert len(response.json()) == 100
+
+            cached_response = await client.get("/teams", headers={"Accept-Encoding": "br"})
+            assert cached_response.json() == response.json()
+
+        middleware = app.middleware_stack.app
+        assert isinstance(middleware, CompressionMiddleware)
+        assert len(middleware.cache._items) == 1
+        assert brotli.decompress(next(iter(middleware.cache._items.values()))) == response.content
+
+    async def test_small_response_is_not_compressed(self) -> None:
+        """Тест - ответ меньше порога и ответ без Accept-Encoding не сжимаются."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/team", headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+
+            response = await client.get("/teams", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in response.headers
+
+
+async def test_start_is_sent_before_body_extensions() -> None:
+    """Тест - отложенное начало сжимаемого ответа уходит перед сообщением расширения ASGI вместо тела."""
+    messages = []
+
+    async def extension_app(_scope: dict, _receive: object, send: object) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.pathsend", "path": "/tmp/file.txt"})
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    middleware = CompressionMiddleware(extension_app)
+    await middleware({"type": "http", "headers": [(b"accept-encoding", b"gzip")]}, None, send)
+    assert [message["type"] for message in messages] == ["http.response.start", "http.response.pathsend"]
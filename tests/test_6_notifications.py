@@ -0,0 +1,26 @@
+import datetime
+import json
+import uuid
+
+from src.notifications.schemas import EventSchema, EventType
+from src.notifications.utils import format_sse
+
+
+def test_format_sse() -> None:
+    """Событие передается одним сообщением SSE c типом события."""
+    event = EventSchema(
+        type=EventType.APPLICATION_CREATED,
+        team_id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        created_at=datetime.datetime(2024, 1, 1),
+    )
+    message = format_sse(event)
+    assert message.endswith("\n\n")
+    event_line, data_line = message.strip().split("\n")
+    assert event_line == "event: application_created"
+    assert json.loads(data_line.removeprefix("data: ")) == {
+        "type": "application_created",
+        "team_id": str(event.team_id),
+        "user_id": str(event.user_id),
+        "created_at": "2024-01-01T00:00:00",
+    }
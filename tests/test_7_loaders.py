@@ -0,0 +1,40 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.loaders import DataLoader, get_loaders
+
+
+async def test_data_loader_batches_keys() -> None:
+    """Загрузки одного прохода event loop выполняются одним запросом без дублей ключей."""
+    batches = []
+
+    async def batch_load(keys: list[int]) -> dict[int, str]:
+        batches.append(keys)
+        return {key: str(key) for key in keys if key != 3}
+
+    loader = DataLoader(batch_load)
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3)) == ["1", "2", "1", None]
+    assert await loader.load_many([2, 4]) == ["2", "4"]
+    assert batches == [[1, 2, 3], [4]]
+    loader.clear()
+    assert await loader.load(1) == "1"
+    assert batches == [[1, 2, 3], [4], [1]]
+
+
+async def test_loaders_cleared_after_rollback() -> None:
+    """После rollback загрузчики запроса не отдают объекты, которые так и не были записаны."""
+    batches = []
+
+    async def batch_load(keys: list[int]) -> dict[int, str]:
+        batches.append(keys)
+        return {key: str(key) for key in keys}
+
+    session = AsyncSession()
+    loaders = get_loaders(session)
+    loaders.users = DataLoader(batch_load)
+    await session.begin()
+    assert await loaders.users.load(1) == "1"
+    await session.rollback()
+    assert await loaders.users.load(1) == "1"
+    assert batches == [[1], [1]]
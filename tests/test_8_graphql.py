@@ -0,0 +1,142 @@
+import hashlib
+import uuid
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+
+from src.auth.auth_handler import current_user
+from src.auth.schemas import UserSchema
+from src.config import settings
+from src.database import get_read_async_session
+from src.graphql_api.loaders import GraphQLLoaders
+from src.graphql_api.routers import graphql_router
+from src.graphql_api.schema import GraphQLContext, schema
+from src.redis_client import redis_manager
+from tests.conftest import async_session_maker, engine_test
+
+
+async def test_graphql_limits() -> None:
+    """Слишком глубокие и слишком сложные запросы отклоняются до выполнения."""
+    deep_query = "{ me { teams { members { teams { members { teams { members { id } } } } } } } }"
+    result = await schema.execute(deep_query)
+    assert any("exceeds maximum operation depth" in error.message for error in result.errors)
+
+    wide_query = "{ teamsList { members { ownedTeams { members { ownedTeams { id title } } } } } }"
+    result = await schema.execute(wide_query)
+    assert [error.message for error in result.errors] == ["Query complexity 422221 exceeds maximum 2000"]
+
+    """Стоимость страницы списка команд растет c first."""
+    paged_query = "{ teamsList(first: 100) { members { username email } } }"
+    result = await schema.execute(paged_query)
+    assert [error.message for error in result.errors] == ["Query complexity 2101 exceeds maximum 2000"]
+
+
+async def test_graphql_argument_limits() -> None:
+    """Страница списка команд и список id ограничены, как в REST."""
+    result = await schema.execute(f"{{ teamsList(first: {settings.GRAPHQL_MAX_PAGE_SIZE + 1}) {{ id }} }}")
+    assert [error.message for error in result.errors] == [
+        f"first must be between 1 and {settings.GRAPHQL_MAX_PAGE_SIZE}",
+    ]
+
+    ids = [str(uuid.uuid4()) for _ in range(settings.BATCH_MAX_IDS + 1)]
+    result = await schema.execute("query($ids: [UUID!]!) { teams(ids: $ids) { id } }", variable_values={"ids": ids})
+    assert [error.message for error in result.errors] == [
+        f"ids must contain no more than {settings.BATCH_MAX_IDS} items",
+    ]
+
+
+async def test_nested_lists_query_once_per_loader() -> None:
+    """Вложенные списки разрешаются одним запросом на загрузчик, сколько бы команд ни было в ответе."""
+    async with engine_test.begin() as conn:
+        await conn.execute(text("""
+            INSERT INTO auth_user (id, username, email, hashed_password, verified, created_at, updated_at)
+            SELECT md5('graphql-user-' || i)::uuid, 'graphql-user-' || i, 'graphql-user-' || i || '@example.com',
+                   '\\x00'::bytea, true, now(), now()
+            FROM generate_series(1, 6) AS i
+        """))
+        await conn.execute(text("""
+            INSERT INTO user_profile (id, user_id, description)
+            SELECT md5('graphql-profile-' || i)::uuid, md5('graphql-user-' || i)::uuid, 'description'
+            FROM generate_series(1, 6) AS i
+        """))
+        await conn.execute(text("""
+            INSERT INTO team (id, owner, title, type_team, number_of_members, team_description,
+                              team_deadline_at, team_city, created_at, updated_at)
+            SELECT md5('graphql-team-' || i)::uuid, md5('graphql-user-' || i)::uuid, 'graphql-team-' || i,
+                   'sport', 10, 'description', current_date + 30, 'Интернет', now(), now()
+            FROM generate_series(1, 3) AS i
+        """))
+        await conn.execute(text("""
+            INSERT INTO team_members (user_id, team_id)
+            SELECT md5('graphql-user-' || (i + 3))::uuid, md5('graphql-team-' || i)::uuid
+            FROM generate_series(1, 3) AS i
+        """))
+
+    statements = []
+
+    def capture(_conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        statements.append(statement)
+
+    query = """
+        { teamsList(first: 100) { id owner { username profile { description } } members { username } tags { tag1 } } }
+    """
+    user = UserSchema(id=uuid.uuid4(), username="graphql", email="graphql@example.com", verified=True)
+    event.listen(engine_test.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_session_maker() as session:
+            result = await schema.execute(query, context_value=GraphQLContext(user, GraphQLLoaders(session)))
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", capture)
+        async with engine_test.begin() as conn:
+            await conn.execute(text("DELETE FROM auth_user WHERE username LIKE 'graphql-user-%'"))
+
+    assert result.errors is None
+    teams = [team for team in result.data["teamsList"] if team["owner"]["username"].startswith("graphql-user-")]
+    assert len(teams) == 3
+    assert all(len(team["members"]) == 1 and team["owner"]["profile"] for team in teams)
+    """Список команд, владельцы, профили владельцев, участники и теги."""
+    assert len(statements) == 5
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.values[key] = value
+        return True
+
+    async def expire(self, key: str, _: int) -> bool:
+        return key in self.values
+
+
+async def test_persisted_query_round_trip(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Неизвестный хэш запрашивает текст запроса, после сохранения запрос выполняется по одному хэшу."""
+    monkeypatch.setattr(redis_manager, "_client", FakeRedis())
+    app = FastAPI()
+    app.include_router(graphql_router)
+    user = UserSchema(id=uuid.uuid4(), username="graphql", email="graphql@example.com", verified=True)
+    app.dependency_overrides[current_user] = lambda: user
+    app.dependency_overrides[get_read_async_session] = lambda: None
+
+    query = "{ __typename }"
+    persisted = {"persistedQuery": {"version": 1, "sha256Hash": hashlib.sha256(query.encode()).hexdigest()}}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/graphql", json={"extensions": persisted})
+        assert response.json()["errors"][0]["message"] == "PersistedQueryNotFound"
+
+        response = await client.post("/graphql", json={"query": query, "extensions": persisted})
+        assert response.json() == {"data": {"__typename": "Query"}}
+
+        response = await client.post("/graphql", json={"extensions": persisted})
+        assert response.json() == {"data": {"__typename": "Query"}}
+
+        wrong = {"persistedQuery": {"version": 1, "sha256Hash": "0" * 64}}
+        response = await client.post("/graphql", json={"query": query, "extensions": wrong})
+        assert response.status_code == 400
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.user_profile import routers
+from src.user_profile.thumbnails import InvalidImageError, make_thumbnails
+
+
+def test_make_thumbnails(tmp_path: Path) -> None:
+    """Миниатюры квадратные, хранятся по хэшу содержимого, повторная обработка дает те же пути."""
+    (tmp_path / "tmp").mkdir()
+    source = tmp_path / "source.png"
+    Image.new("RGB", (800, 500), "red").save(source)
+    thumbnails = make_thumbnails(str(source), str(tmp_path), (64, 256))
+    assert thumbnails == make_thumbnails(str(source), str(tmp_path), (64, 256))
+    for size, path in thumbnails.items():
+        with Image.open(tmp_path / path) as thumbnail:
+            assert thumbnail.size == (size, size)
+
+    source.write_bytes(b"not an image")
+    with pytest.raises(InvalidImageError):
+        make_thumbnails(str(source), str(tmp_path), (64,))
+
+
+async def test_upload_does_not_hold_connection(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Сессия запроса закрывается до приема файла, соединение нужно только для UPDATE."""
+    calls = []
+
+    class Session:
+        async def close(self) -> None:
+            calls.append("close")
+
+    async def receive_upload(_: object) -> Path:
+        calls.append("receive")
+        return tmp_path / "upload"
+
+    async def make_thumbnails(_: Path) -> dict[int, str]:
+        calls.append("thumbnails")
+        return {64: "avatar.png"}
+
+    async def update_avatar(thumbnails: dict[int, str], _user: object, _session: object) -> dict[int, str]:
+        calls.append("update")
+        return thumbnails
+
+    monkeypatch.setattr(routers, "receive_upload", receive_upload)
+    monkeypatch.setattr(routers.avatar_processor, "make_thumbnails", make_thumbnails)
+    monkeypatch.setattr(routers.crud, "update_avatar", update_avatar)
+    assert await routers.upload_avatar(None, Session(), None) == {64: "avatar.png"}
+    assert calls == ["close", "receive", "thumbnails", "update"]